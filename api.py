@@ -0,0 +1,307 @@
+"""
+HTTP API for the optimization pipeline.
+Exposes parse, score, enhance and render over the same `modules/*` functions
+as the Streamlit UI, plus asynchronous optimization jobs with polling and
+Server-Sent Events progress. One process serves many clients: blocking work
+runs on worker threads, so the event loop only shuffles requests.
+
+Run:
+    python api.py                      # API_PORT, default 8000
+    uvicorn api:app --port 8000
+
+Endpoints:
+    POST /parse             multipart `file` (.pdf/.docx)             -> {"text"}
+    POST /score             resume (`file` or `resume_text`) + `job_description` [+ `mode=ai`]
+    POST /enhance           resume + `job_description` [+ `?async=1`]  -> enhanced resume JSON
+    POST /render            JSON {"resume", "template", "formats"}     -> artifact URLs
+    POST /jobs              resume + `job_description` [+ `template`]  -> 202, full pipeline job
+    POST /jobs/multi        resume + `job_descriptions` (JSON list, or `---`-separated text) -> 202
+    GET  /jobs/{id}         job status; result and artifact URLs once done
+    GET  /jobs/{id}/events  SSE progress stream
+    GET  /artifacts/{id}/{name}, /artifacts/{id}/{variant}/{name}
+    GET  /health, /metrics
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import uuid
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from modules.document import ResumeDocument
+from modules.jobs import JobStore
+from modules.metrics import render_prometheus
+from modules.pipeline import (MULTI_JD_LIMIT, parse_upload, render_artifacts, run_multi_optimization,
+                              run_optimization, split_job_descriptions, submit_enhancement,
+                              wait_for_enhancement)
+from modules.scorer import calculate_ai_score, calculate_ats_score
+from modules.warmup import get_readiness, start_warmup
+
+API_OUTPUT_DIR = os.getenv("API_OUTPUT_DIR", os.path.join("output", "api"))
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+# Seconds between SSE keep-alive comments while a job is quiet
+SSE_HEARTBEAT = 15
+
+TEMPLATES = ('modern', 'professional', 'twocolumn')
+_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+_VARIANT_PATTERN = re.compile(r"^jd_[0-9]{1,2}$")
+
+jobs = JobStore(API_OUTPUT_DIR)
+
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ─── INPUTS ────────────────────────────────────────────────────
+async def _read_inputs(request):
+    """Fields from a JSON body or a multipart/urlencoded form; an uploaded `file` is parsed to text."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        try:
+            fields = await request.json()
+        except ValueError:
+            raise APIError(400, "Request body is not valid JSON.")
+        if not isinstance(fields, dict):
+            raise APIError(400, "Request body must be a JSON object.")
+        return fields
+
+    form = await request.form(max_part_size=MAX_UPLOAD_BYTES)
+    fields = {k: v for k, v in form.items() if isinstance(v, str)}
+    upload = form.get("file")
+    if upload is not None and not isinstance(upload, str):
+        data = await upload.read()
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise APIError(413, f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+        fields["resume_text"] = await _parse(upload.filename, data)
+    return fields
+
+async def _parse(filename, data):
+    try:
+        text = await run_in_threadpool(parse_upload, filename, io.BytesIO(data))
+    except ValueError as e:
+        raise APIError(415, str(e))
+    # The parsers report failures as text rather than raising
+    if text.startswith(("Error reading PDF", "Error reading DOCX")):
+        raise APIError(422, text)
+    return text
+
+def _require(fields, *names):
+    values = []
+    for name in names:
+        value = fields.get(name)
+        if not value or not str(value).strip():
+            raise APIError(400, f"Missing required field '{name}'.")
+        values.append(value)
+    return values
+
+def _template(fields):
+    template = fields.get("template") or "modern"
+    if template not in TEMPLATES:
+        raise APIError(400, f"Unknown template '{template}'. Choose one of: {', '.join(TEMPLATES)}.")
+    return template
+
+def _artifact_urls(request, owner_id, artifacts, variant=None):
+    if variant:
+        return {fmt: str(request.url_for("variant_artifact", owner_id=owner_id, variant=variant,
+                                         name=os.path.basename(path)))
+                for fmt, path in artifacts.items()}
+    return {fmt: str(request.url_for("artifact", owner_id=owner_id, name=os.path.basename(path)))
+            for fmt, path in artifacts.items()}
+
+# ─── ENDPOINTS ─────────────────────────────────────────────────
+async def health(request):
+    # Unhealthy until the warm-up has finished, like `modules.warmup --check` for the UI
+    state = get_readiness()
+    if state['status'] != 'ready':
+        return JSONResponse({"status": state['status']}, status_code=503)
+    return JSONResponse({"status": "ok"})
+
+async def metrics(request):
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+async def parse(request):
+    form = await request.form(max_part_size=MAX_UPLOAD_BYTES)
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        raise APIError(400, "Upload the resume as multipart field 'file'.")
+    data = await upload.read()
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise APIError(413, f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+    return JSONResponse({"text": await _parse(upload.filename, data)})
+
+async def score(request):
+    fields = await _read_inputs(request)
+    resume_text, job_desc = _require(fields, "resume_text", "job_description")
+    if fields.get("mode") == "ai":
+        value, missing = await run_in_threadpool(calculate_ai_score, resume_text, job_desc)
+    else:
+        value, missing = await run_in_threadpool(calculate_ats_score, resume_text, job_desc)
+    return JSONResponse({"score": value, "missing_keywords": sorted(missing)})
+
+def _enhance_job(job, resume_text, job_desc):
+    _, missing = calculate_ats_score(resume_text, job_desc)
+    key, ticket = submit_enhancement(resume_text, job_desc, missing)
+    ai_data = wait_for_enhancement(key, ticket)
+    if "error" in ai_data:
+        raise ValueError(f"AI Error: {ai_data['error']}")
+    return {"resume": ResumeDocument.from_dict(ai_data).to_dict()}
+
+async def enhance(request):
+    fields = await _read_inputs(request)
+    resume_text, job_desc = _require(fields, "resume_text", "job_description")
+    if request.query_params.get("async") in ("1", "true"):
+        return _accepted(request, jobs.submit("enhance", _enhance_job, resume_text, job_desc))
+    try:
+        result = await run_in_threadpool(_enhance_job, None, resume_text, job_desc)
+    except ValueError as e:
+        raise APIError(502, str(e))
+    return JSONResponse(result)
+
+async def render(request):
+    fields = await _read_inputs(request)
+    try:
+        resume = ResumeDocument.from_dict(fields.get("resume"))
+    except ValueError as e:
+        raise APIError(400, str(e))
+    formats = fields.get("formats") or ["draft", "pdf", "docx"]
+    if not isinstance(formats, list) or not set(formats) <= {"draft", "pdf", "docx"}:
+        raise APIError(400, "formats must be a list of 'draft', 'pdf' and 'docx'.")
+    render_id = uuid.uuid4().hex[:16]
+    output_dir = os.path.join(API_OUTPUT_DIR, render_id)
+    artifacts, errors = await run_in_threadpool(render_artifacts, resume, _template(fields), output_dir, formats)
+    return JSONResponse({"artifacts": _artifact_urls(request, render_id, artifacts), "errors": errors})
+
+def _optimize_job(job, raw_text, job_desc, template):
+    def progress(step, done=False, **data):
+        job.emit('progress', step=step, state='done' if done else 'started', **data)
+
+    result = run_optimization(raw_text, job_desc, template, job.output_dir, progress=progress)
+    result["resume"] = result["resume"].to_dict()
+    return result
+
+def _accepted(request, job):
+    return JSONResponse({
+        "job_id": job.id,
+        "status_url": str(request.url_for("job_status", job_id=job.id)),
+        "events_url": str(request.url_for("job_events", job_id=job.id)),
+    }, status_code=202)
+
+async def submit_job(request):
+    fields = await _read_inputs(request)
+    resume_text, job_desc = _require(fields, "resume_text", "job_description")
+    return _accepted(request, jobs.submit("optimize", _optimize_job, resume_text, job_desc, _template(fields)))
+
+def _optimize_multi_job(job, raw_text, job_descs, template):
+    def progress(step, done=False, **data):
+        job.emit('progress', step=step, state='done' if done else 'started', **data)
+
+    report = run_multi_optimization(raw_text, job_descs, template, job.output_dir, progress=progress)
+    variants = []
+    for variant in report['variants']:
+        variant = {k: v for k, v in variant.items() if k != 'job_desc'}
+        variant['resume'] = variant['resume'].to_dict() if variant['resume'] else None
+        variants.append(variant)
+    return {'variants': variants, 'artifacts': {'report': report['report_path']}}
+
+async def submit_multi_job(request):
+    fields = await _read_inputs(request)
+    resume_text, job_descs = _require(fields, "resume_text", "job_descriptions")
+    if isinstance(job_descs, str):
+        job_descs = split_job_descriptions(job_descs)
+    if not isinstance(job_descs, list) or not all(isinstance(jd, str) and jd.strip() for jd in job_descs):
+        raise APIError(400, "job_descriptions must be a list of non-empty strings.")
+    if len(job_descs) > MULTI_JD_LIMIT:
+        raise APIError(400, f"At most {MULTI_JD_LIMIT} job descriptions per job.")
+    return _accepted(request, jobs.submit("optimize_multi", _optimize_multi_job, resume_text, job_descs, _template(fields)))
+
+def _get_job(request):
+    job = jobs.get(request.path_params["job_id"])
+    if job is None:
+        raise APIError(404, "Unknown or expired job.")
+    return job
+
+async def job_status(request):
+    job = _get_job(request)
+    body = job.to_dict()
+    if job.status == "done":
+        result = dict(job.result)
+        if "artifacts" in result:
+            result["artifacts"] = _artifact_urls(request, job.id, result["artifacts"])
+        if "variants" in result:
+            # Variant files live in per-JD subdirectories of the job's directory
+            result["variants"] = [dict(v, artifacts=_artifact_urls(request, job.id, v['artifacts'], f"jd_{v['index'] + 1}"))
+                                  for v in result["variants"]]
+        body["result"] = result
+    return JSONResponse(body)
+
+async def job_events(request):
+    job = _get_job(request)
+
+    async def stream():
+        index, quiet = 0, 0.0
+        while True:
+            events = job.events_since(index)
+            for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            index += len(events)
+            if job.done and not job.events_since(index):
+                return
+            if await request.is_disconnected():
+                return
+            quiet = 0.0 if events else quiet + 0.25
+            if quiet >= SSE_HEARTBEAT:
+                quiet = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def artifact(request):
+    owner_id, name = request.path_params["owner_id"], request.path_params["name"]
+    variant = request.path_params.get("variant", "")
+    path = os.path.join(API_OUTPUT_DIR, owner_id, variant, os.path.basename(name))
+    if (not _ID_PATTERN.match(owner_id) or (variant and not _VARIANT_PATTERN.match(variant))
+            or not os.path.isfile(path)):
+        raise APIError(404, "Artifact not found.")
+    return FileResponse(path, filename=os.path.basename(name))
+
+async def _api_error(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=exc.status)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Same warm-up as the UI, so the first request doesn't pay for imports and templates
+    start_warmup()
+    yield
+
+app = Starlette(
+    lifespan=lifespan,
+    routes=[
+        Route("/health", health),
+        Route("/metrics", metrics),
+        Route("/parse", parse, methods=["POST"]),
+        Route("/score", score, methods=["POST"]),
+        Route("/enhance", enhance, methods=["POST"]),
+        Route("/render", render, methods=["POST"]),
+        Route("/jobs", submit_job, methods=["POST"]),
+        Route("/jobs/multi", submit_multi_job, methods=["POST"]),
+        Route("/jobs/{job_id}", job_status, name="job_status"),
+        Route("/jobs/{job_id}/events", job_events, name="job_events"),
+        Route("/artifacts/{owner_id}/{name}", artifact, name="artifact"),
+        Route("/artifacts/{owner_id}/{variant}/{name}", artifact, name="variant_artifact"),
+    ],
+    exception_handlers={APIError: _api_error},
+)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("API_PORT", "8000")))
@@ -1,23 +1,36 @@
 import streamlit as st
+import io
 import os
+import time
 from dotenv import load_dotenv
 
 import modules.ui as ui
-from modules.parser import extract_text_from_pdf, extract_text_from_docx
-from modules.enhancer import enhance_resume_content
-from modules.converter import convert_resume_data_to_text
-from modules.scorer import calculate_ats_score, calculate_ai_score
-from modules.generator import generate_resume_pdf, generate_resume_docx
+from modules.scorer import keyword_set
+from modules.editor import EditSession, time_edit
+from modules.warmup import start_warmup
+from modules.profiling import RunProfiler, is_enabled as profiling_enabled, prune_runs
+from modules.metrics import new_run_id, run_context, start_metrics_server
+
+# The parser, enhancer and generator (pdfminer, Gemini SDK, lxml, jinja2) are
+# imported where they are first used so the landing page paints without them.
 
 # Load environment variables
 load_dotenv()
 
+# Multi-JD runs write each variant's files here; only the newest runs are kept
+MULTI_OUTPUT_DIR = os.path.join("output", "multi")
+MULTI_KEEP_RUNS = 20
+
 # Verify API Key
 if not os.getenv("GEMINI_API_KEY"):
     st.error("⚠️ **Configuration Error**: `GEMINI_API_KEY` not found.")
     st.info("Please create a `.env` file with your valid API key to proceed.")
     st.stop()
 
+# No-ops when serve.py already started them; covers plain `streamlit run app.py`
+start_warmup()
+start_metrics_server()
+
 def main():
     ui.setup_page()
     ui.display_header()
@@ -30,7 +43,8 @@ def main():
     if 'ats_score_before' not in st.session_state: st.session_state.ats_score_before = None
     if 'ats_score_after' not in st.session_state: st.session_state.ats_score_after = None
     if 'pdf_path' not in st.session_state: st.session_state.pdf_path = None
-    if 'docx_path' not in st.session_state: st.session_state.docx_path = None
+    if 'pdf_future' not in st.session_state: st.session_state.pdf_future = None
+    if 'docx_file' not in st.session_state: st.session_state.docx_file = None
     if 'missing_keywords' not in st.session_state: st.session_state.missing_keywords = []
 
     # Main Interaction Flow
@@ -41,10 +55,9 @@ def main():
     if method == "Upload Resume":
         uploaded_file = ui.render_upload_form()
         if uploaded_file:
-            if uploaded_file.name.endswith(".pdf"):
-                raw_text = extract_text_from_pdf(uploaded_file)
-            elif uploaded_file.name.endswith(".docx"):
-                raw_text = extract_text_from_docx(uploaded_file)
+            from modules.pipeline import parse_upload
+            # Cached by file content, so reruns don't parse the same upload again
+            raw_text = parse_upload(uploaded_file.name, uploaded_file)
     else:
         raw_text = ui.render_manual_form()
 
@@ -59,7 +72,16 @@ def main():
             st.error("⚠️ Please upload a resume or fill in the manual details first.")
         elif not job_desc:
             st.error("⚠️ Please provide the Target Job Description.")
+        elif st.session_state.get('multi_jd'):
+            from modules.pipeline import MULTI_JD_LIMIT, split_job_descriptions
+
+            job_descs = split_job_descriptions(job_desc)
+            if len(job_descs) > MULTI_JD_LIMIT:
+                st.error(f"⚠️ Please paste at most {MULTI_JD_LIMIT} job descriptions.")
+            else:
+                process_multi(raw_text, job_descs, selected_template)
         else:
+            st.session_state.multi_report = None
             process_resume(raw_text, job_desc, selected_template)
 
     # Results Display
@@ -70,55 +92,201 @@ def main():
     ui.display_footer()
 
 def process_resume(raw_text, job_desc, selected_template):
-    with st.status("🚀 Optimizing your profile...", expanded=True) as status:
-        
-        # Step 1
-        st.write("**Step 1/4** — 📊 Analyzing initial ATS compatibility...")
-        score_before, missing = calculate_ats_score(raw_text, job_desc)
-        st.write(f"   ↳ Initial Score: **{score_before}%**")
-        
-        # Step 2
-        st.write("**Step 2/4** — 🤖 Optimizing content & keywords with AI...")
-        ai_data = enhance_resume_content(raw_text, job_desc, missing_keywords=missing)
-        
-        if "error" in ai_data:
+    from modules.pipeline import run_optimization
+    from modules.generator import generate_draft_pdf, submit_resume_pdf, build_resume_docx
+
+    # Opt-in via RESUME_PROFILE=1 or ?profile=1; a disabled profiler just times the stages
+    profiler = RunProfiler(enabled=profiling_enabled(st.query_params))
+    fname = ui.get_template_map().get(selected_template, "modern")
+
+    # Shown only while the request waits for the shared Gemini quota. Polling
+    # also lets Streamlit interrupt the wait on a rerun (e.g. a double click);
+    # the rerun then joins the enhancement that is still in flight.
+    queue_note = None
+
+    def show_progress(step, done=False, **data):
+        nonlocal queue_note
+        if step == 'analyze' and not done:
+            st.write("**Step 1/4** — 📊 Analyzing initial ATS compatibility...")
+        elif step == 'analyze':
+            st.write(f"   ↳ Initial Score: **{data['score_before']}%**")
+        elif step == 'enhance' and not done and 'queue_position' in data:
+            queue_note.caption(f"   ⏳ High demand — you are #{data['queue_position'] + 1} in the AI queue "
+                               f"(~{data['eta_seconds']:.0f}s)")
+        elif step == 'enhance' and not done:
+            st.write("**Step 2/4** — 🤖 Optimizing content & keywords with AI...")
+            queue_note = st.empty()
+        elif step == 'enhance':
+            queue_note.empty()
+        elif step == 'verify' and not done:
+            st.write("**Step 3/4** — 📈 Verifying improvements...")
+        elif step == 'render' and not done:
+            st.write("**Step 4/4** — 📄 Generating professional documents...")
+
+    def render(resume):
+        # Instant draft preview; the LaTeX render finishes in the background
+        return {
+            'draft': generate_draft_pdf(resume),
+            'pdf': submit_resume_pdf(resume, template_name=fname),
+            'docx': build_resume_docx(resume),
+        }, {}
+
+    # Spans of this run (including the background LaTeX render) share the profiler's run ID
+    with run_context(profiler.run_id), st.status("🚀 Optimizing your profile...", expanded=True) as status:
+        if profiler.enabled:
+            st.caption(f"🔬 Profiling run `{profiler.run_id}` → `{profiler.run_dir}`")
+
+        # Same pipeline as the API; only the progress display and the renderers differ
+        try:
+            result = run_optimization(raw_text, job_desc, fname, progress=show_progress,
+                                      stage=profiler.stage, render=render)
+        except ValueError as e:
             status.update(label="❌ Optimization Failed", state="error", expanded=True)
-            st.error(f"AI Error: {ai_data['error']}")
+            st.error(str(e))
             st.stop()
-        
-        # Step 3
-        st.write("**Step 3/4** — 📈 Verifying improvements...")
-        enhanced_text = convert_resume_data_to_text(ai_data)
-        score_after, _ = calculate_ats_score(enhanced_text, job_desc)
-        
-        # Step 4
-        st.write("**Step 4/4** — 📄 Generating professional documents...")
-        try:
-            template_map = ui.get_template_map()
-            fname = template_map.get(selected_template, "modern")
-            
-            pdf_path = generate_resume_pdf(ai_data, template_name=fname)
-            docx_path = generate_resume_docx(ai_data)
-            
-            # Update Session State
-            st.session_state.ats_score_before = score_before
-            st.session_state.ats_score_after = score_after
-            st.session_state.missing_keywords = missing
-            st.session_state.keywords_added = ai_data.get('keywords_added', [])
-            st.session_state.keywords_skipped = ai_data.get('keywords_skipped', [])
-            st.session_state.pdf_path = pdf_path
-            st.session_state.docx_path = docx_path
-            st.session_state.resume_data = ai_data
-            
-            status.update(label="✅ Optimization Complete!", state="complete", expanded=False)
-            st.success("🎉 Resume optimized successfully! Scroll down to see results.")
-            st.rerun()
-
         except Exception as e:
             status.update(label="❌ Generation Failed", state="error", expanded=True)
             st.error(f"Document generation error: {str(e)}")
+            return
+
+        resume = result['resume']
+        artifacts = result['artifacts']
+        # Later edits re-score per section and rebuild only stale artifacts
+        edit_session = EditSession(resume, keyword_set(job_desc), template_name=fname)
+        edit_session.mark_rendered('draft', 'docx', 'latex')
+
+        # Update Session State
+        store_result(resume, job_desc, result['score_before'], result['score_after'], result['missing_keywords'],
+                     artifacts['draft'], artifacts['pdf'], artifacts['docx'], edit_session)
+
+        status.update(label="✅ Optimization Complete!", state="complete", expanded=False)
+        st.success("🎉 Resume optimized successfully! Scroll down to see results.")
+        st.rerun()
+
+def store_result(resume, job_desc, score_before, score_after, missing, pdf_path, pdf_future, docx_file, edit_session):
+    """Makes one optimized resume the one shown in the report, editor and coach."""
+    st.session_state.ats_score_before = score_before
+    st.session_state.ats_score_after = score_after
+    st.session_state.missing_keywords = missing
+    st.session_state.keywords_added = resume.keywords_added
+    st.session_state.keywords_skipped = resume.keywords_skipped
+    st.session_state.pdf_path = pdf_path
+    st.session_state.pdf_future = pdf_future
+    st.session_state.docx_file = docx_file
+    st.session_state.resume_data = resume
+    st.session_state.job_desc = job_desc
+    st.session_state.edit_session = edit_session
+    st.session_state.last_edit = None
+
+def process_multi(raw_text, job_descs, selected_template):
+    """Tailors the resume to every pasted JD: parsed once, enhanced concurrently, compared side by side."""
+    from modules.pipeline import run_multi_optimization
+
+    fname = ui.get_template_map().get(selected_template, "modern")
+    run_id = new_run_id()
+    # Timestamped so pruning by name keeps the newest runs
+    output_dir = os.path.join(MULTI_OUTPUT_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{run_id}")
+    total = len(job_descs)
+
+    with run_context(run_id), st.status(f"🚀 Tailoring your resume to {total} roles...", expanded=True) as status:
+        steps = {'analyze': "**Step 1/4** — 📊 Scoring your resume against every role...",
+                 'enhance': "**Step 2/4** — 🤖 Optimizing content & keywords for each role...",
+                 'verify': "**Step 3/4** — 📈 Verifying improvements...",
+                 'render': "**Step 4/4** — 📄 Generating documents for every role..."}
+        bar = st.empty()
+
+        def progress(step, done=False, **data):
+            if step == 'enhance' and 'completed' in data:
+                bar.progress(data['completed'] / data['total'], text=f"{data['completed']}/{data['total']} roles optimized")
+            elif not done:
+                st.write(steps[step])
+            elif step == 'enhance':
+                bar.empty()
+
+        try:
+            report = run_multi_optimization(raw_text, job_descs, fname, output_dir, progress=progress)
+        except ValueError as e:
+            status.update(label="❌ Optimization Failed", state="error", expanded=True)
+            st.error(str(e))
+            st.stop()
+        prune_runs(MULTI_OUTPUT_DIR, keep=MULTI_KEEP_RUNS)
+
+        variants = report['variants']
+        ready = [v for v in variants if not v['error']]
+        if not ready:
+            status.update(label="❌ Optimization Failed", state="error", expanded=True)
+            st.error(f"AI Error: {variants[0]['error']}")
+            st.stop()
+
+        with open(report['report_path'], "rb") as f:
+            report_csv = f.read()
+        st.session_state.multi_report = {'variants': variants, 'csv': report_csv, 'template': fname}
+        # Open the best match first
+        best = max(ready, key=lambda v: v['score_after'])
+        st.session_state.multi_jd_selected = best['index']
+        load_variant(best['index'])
+
+        failed = len(variants) - len(ready)
+        status.update(label=f"✅ Optimized for {len(ready)} of {total} roles!", state="complete", expanded=bool(failed))
+        st.rerun()
+
+def load_variant(index):
+    """Shows one role's tailored resume in the report below the comparison."""
+    report = st.session_state.multi_report
+    variant = report['variants'][index]
+    # The editor mutates its resume; the comparison keeps the variant as generated
+    resume = variant['resume'].copy()
+    artifacts = variant['artifacts']
+    docx_file = None
+    if 'docx' in artifacts:
+        with open(artifacts['docx'], "rb") as f:
+            docx_file = io.BytesIO(f.read())
+
+    edit_session = EditSession(resume, keyword_set(variant['job_desc']), template_name=report['template'])
+    edit_session.mark_rendered('draft', 'docx', 'latex')
+    store_result(resume, variant['job_desc'], variant['score_before'], edit_session.scorer.score,
+                 variant['missing_keywords'], artifacts.get('pdf') or artifacts.get('draft'), None,
+                 docx_file, edit_session)
+
+def resolve_final_pdf():
+    """Swaps the draft preview for the LaTeX render once it has finished."""
+    future = st.session_state.pdf_future
+    if future is None:
+        return
+    if not future.done():
+        c1, c2 = st.columns([0.8, 0.2])
+        c1.info("⏳ Showing a draft preview — the final LaTeX render is still in progress.")
+        c2.button("🔄 Refresh", use_container_width=True)
+        return
+    st.session_state.pdf_future = None
+    try:
+        # None means a newer edit superseded this render
+        st.session_state.pdf_path = future.result() or st.session_state.pdf_path
+    except Exception as e:
+        st.warning(f"Final render unavailable, keeping the draft PDF. {str(e)}")
+
+def on_section_edit(section):
+    """Applies a result edit: re-scores the changed section, then rebuilds stale artifacts."""
+    session = st.session_state.edit_session
+    value = ui.read_section_edit(session.resume, session.key, session.row_ids, section)
+    score, elapsed_ms = time_edit(session, section, value)
+    st.session_state.ats_score_after = score
+    st.session_state.last_edit = (section, elapsed_ms)
+    for name, artifact in session.rebuild().items():
+        st.session_state[name] = artifact
 
 def display_results():
+    report = st.session_state.get('multi_report')
+    if report:
+        ui.display_comparison(report['variants'], report['csv'], load_variant)
+    results_dashboard()
+    coach_chat()
+
+@st.fragment
+def results_dashboard():
+    """Preview, report and editor; edits and preview toggles rerun only this block."""
+    resolve_final_pdf()
+
     # 1. Preview
     if st.session_state.pdf_path:
         ui.display_pdf_preview(st.session_state.pdf_path)
@@ -132,13 +300,21 @@ def display_results():
         st.session_state.keywords_added,
         st.session_state.keywords_skipped,
         st.session_state.pdf_path,
-        st.session_state.docx_path,
+        st.session_state.docx_file,
         filename_prefix=candidate_name
     )
+
+    if st.session_state.get('edit_session'):
+        session = st.session_state.edit_session
+        ui.render_resume_editor(session.resume, session.key, session.row_ids, on_section_edit,
+                                st.session_state.get('last_edit'))
     
     with st.expander("🔍 View Raw Analysis Data"):
-        st.json(st.session_state.resume_data)
+        st.json(st.session_state.resume_data.to_dict())
 
+@st.fragment
+def coach_chat():
+    """Career Coach; a chat turn reruns only this block."""
     # 3. AI Chat
     st.markdown('<div class="gradient-divider"></div>', unsafe_allow_html=True)
 
@@ -155,8 +331,11 @@ def display_results():
     if 'chat_session' not in st.session_state:
         st.session_state.chat_session = FeedbackChat()
     
-    context = st.session_state.resume_data if st.session_state.resume_data else "No resume processed yet."
-    st.session_state.chat_session.render_chat_ui(str(context), "Career advice based on the optimization.")
+    st.session_state.chat_session.render_chat_ui(
+        st.session_state.resume_data,
+        st.session_state.get('job_desc') or "Career advice based on the optimization.",
+        st.session_state.missing_keywords,
+    )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
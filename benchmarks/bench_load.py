@@ -0,0 +1,485 @@
+"""
+Concurrent-session load test.
+Starts the app under `streamlit run` with Gemini stubbed (fixed, configurable
+latency) and drives N simultaneous browser sessions over Streamlit's
+websocket protocol. Each session opens the page, uploads a corpus resume,
+pastes a JD, clicks "Optimize Resume" and asks the coach a few questions.
+
+For each concurrency level it reports throughput, client-side p50/p95/p99
+per step, server-side p50/p95/p99 per pipeline stage (from the /metrics
+histograms) and the server's CPU and RSS over time: pick the replica count
+from the highest level whose optimize p95 is still acceptable.
+
+The sessions share one server process, as real users of one container do
+(one Streamlit process, one Gemini quota scheduler, one set of pools).
+
+Needs the `websockets` client on top of requirements.txt:
+    pip install "websockets>=12"
+
+Usage:
+    python benchmarks/bench_load.py --sessions 1 4 8 16 --llm-latency-ms 2000
+    python benchmarks/bench_load.py --save load.json
+    # An already running server (real Gemini calls; CPU/RSS need its PID)
+    python benchmarks/bench_load.py --url http://localhost:8501 --metrics-url http://localhost:9100/metrics --pid 1234
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from corpus import generate_jd, generate_resume, generate_resume_pages
+
+STEPS = ("open", "upload", "optimize", "chat", "session")
+QUESTIONS = (
+    "How should I rewrite my summary for this role?",
+    "Give me tips to make my experience bullets stronger.",
+    "Suggest a better ordering for my skills section.",
+)
+# Server-side histograms reported per level, by the label they are split on
+HISTOGRAMS = (('resume_stage_duration_seconds', 'stage'), ('resume_llm_queue_wait_seconds', 'task'))
+
+# ─── SERVER ────────────────────────────────────────────────────
+def serve(port, metrics_port, latency_ms, seed, pages):
+    """Runs the app in this process with the LLM stub installed (like serve.py)."""
+    os.environ.setdefault("GEMINI_API_KEY", "stub")
+    os.chdir(os.path.dirname(ROOT))
+
+    from bench_pipeline import _StubModel, install_llm_stub
+    from modules.metrics import start_metrics_server
+    from modules.warmup import start_warmup
+    from streamlit.web import cli as stcli
+
+    install_llm_stub(latency_ms)
+    _StubModel.payload = json.dumps(generate_resume(seed, max(1, pages * 3)))
+    start_warmup()
+    start_metrics_server(metrics_port)
+    sys.argv = ["streamlit", "run", "app.py", f"--server.port={port}", "--server.headless=true",
+                "--browser.gatherUsageStats=false", "--server.fileWatcherType=none"]
+    sys.exit(stcli.main())
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(latency_ms, seed, pages, timeout=60):
+    """Launches `serve` in a subprocess; returns (process, base_url, metrics_url) once it is healthy."""
+    import requests
+
+    port, metrics_port = _free_port(), _free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", f"--port={port}", f"--metrics-port={metrics_port}",
+         f"--llm-latency-ms={latency_ms}", f"--seed={seed}", f"--pages={pages}"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/_stcore/health", timeout=1).ok:
+                return process, base_url, f"http://127.0.0.1:{metrics_port}/metrics"
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Server did not become healthy within {timeout}s")
+
+# ─── BROWSER SESSION ───────────────────────────────────────────
+class BrowserSession:
+    """
+    One browser tab speaking Streamlit's websocket protocol: widget values are
+    resent with every rerun, as the frontend does, and a widget inside a
+    fragment reruns only that fragment.
+    """
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session_id = None
+        self.widgets = []   # (element type, label, widget id, fragment id)
+        self.states = {}    # widget id -> WidgetState resent on every rerun
+        self.errors = []
+
+    def __enter__(self):
+        import requests
+        from websockets.sync.client import connect
+
+        self.http = requests.Session()
+        # The health check sets the XSRF cookie that uploads have to echo back
+        self.http.get(f"{self.base_url}/_stcore/health", timeout=self.timeout).raise_for_status()
+        self._connection = connect(re.sub(r"^http", "ws", self.base_url) + "/_stcore/stream",
+                                   subprotocols=["streamlit"], max_size=None, open_timeout=self.timeout)
+        self.ws = self._connection.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._connection.__exit__(*exc_info)
+        self.http.close()
+
+    def _receive(self):
+        from streamlit.proto.Alert_pb2 import Alert
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = ForwardMsg()
+        msg.ParseFromString(self.ws.recv(timeout=self.timeout))
+        kind = msg.WhichOneof('type')
+        if kind == 'new_session':
+            self.session_id = msg.new_session.initialize.session_id
+        elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            element = msg.delta.new_element
+            element_type = element.WhichOneof('type')
+            proto = getattr(element, element_type) if element_type else None
+            if element_type == 'exception':
+                self.errors.append(proto.message)
+            elif element_type == 'alert' and proto.format == Alert.ERROR:
+                self.errors.append(proto.body)
+            elif getattr(proto, 'id', None):
+                entry = (element_type, getattr(proto, 'label', ''), proto.id, msg.delta.fragment_id)
+                self.widgets = [w for w in self.widgets if w[2] != proto.id] + [entry]
+        return msg
+
+    def _wait_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            msg = self._receive()
+            if msg.WhichOneof('type') == 'script_finished' and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return
+
+    def widget(self, element_type, label=""):
+        for entry in reversed(self.widgets):
+            if entry[0] == element_type and label in entry[1]:
+                return entry
+        raise LookupError(f"No {element_type} widget labelled '{label}' on the page")
+
+    def rerun(self, trigger=None, fragment_id=""):
+        """Reruns the script (or one fragment) with the current widget values plus a one-shot trigger."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.fragment_id = fragment_id
+        states = list(self.states.values()) + ([trigger] if trigger is not None else [])
+        msg.rerun_script.widget_states.widgets.extend(states)
+        self.ws.send(msg.SerializeToString())
+        self._wait_finished()
+
+    def open(self):
+        self.rerun()
+
+    def upload(self, label, name, data, mime):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id = self.widget('file_uploader', label)[2]
+        request = BackMsg()
+        request.file_urls_request.request_id = uuid.uuid4().hex
+        request.file_urls_request.file_names.append(name)
+        request.file_urls_request.session_id = self.session_id
+        self.ws.send(request.SerializeToString())
+        while True:
+            msg = self._receive()
+            if msg.WhichOneof('type') == 'file_urls_response' and \
+                    msg.file_urls_response.response_id == request.file_urls_request.request_id:
+                urls = msg.file_urls_response.file_urls[0]
+                break
+
+        upload_url = urls.upload_url if urls.upload_url.startswith("http") else self.base_url + urls.upload_url
+        response = self.http.put(upload_url, files={'file': (name, data, mime)}, timeout=self.timeout,
+                                 headers={'X-Xsrftoken': self.http.cookies.get('_streamlit_xsrf', '')})
+        response.raise_for_status()
+
+        state = WidgetState(id=widget_id)
+        info = state.file_uploader_state_value.uploaded_file_info.add()
+        info.file_id, info.name, info.size = urls.file_id, name, len(data)
+        info.file_urls.CopyFrom(urls)
+        self.states[widget_id] = state
+        self.rerun()
+
+    def type_text(self, element_type, label, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id = self.widget(element_type, label)[2]
+        self.states[widget_id] = WidgetState(id=widget_id, string_value=value)
+
+    def click(self, label):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        _, _, widget_id, fragment_id = self.widget('button', label)
+        self.rerun(WidgetState(id=widget_id, trigger_value=True), fragment_id)
+
+    def chat(self, message):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        _, _, widget_id, fragment_id = self.widget('chat_input')
+        trigger = WidgetState(id=widget_id)
+        trigger.chat_input_value.data = message
+        self.rerun(trigger, fragment_id)
+
+def run_session(base_url, fixture, job_desc, chat_turns, timeout):
+    """
+    One user's visit; returns {step: [seconds, ...]} and the errors shown to
+    the user. A visit only counts as a completed session when there are none.
+    """
+    timings = {step: [] for step in STEPS}
+    name, data = fixture
+    started = time.perf_counter()
+
+    def timed(step, fn, *args):
+        start = time.perf_counter()
+        fn(*args)
+        timings[step].append(time.perf_counter() - start)
+
+    session = BrowserSession(base_url, timeout)
+    try:
+        with session:
+            timed("open", session.open)
+            timed("upload", session.upload, "Upload your resume", name, data, "application/pdf")
+            session.type_text('text_area', "Paste the full job description", job_desc)
+            timed("optimize", session.click, "Optimize Resume")
+            for turn in range(chat_turns):
+                timed("chat", session.chat, QUESTIONS[turn % len(QUESTIONS)])
+        if not session.errors:
+            timings["session"].append(time.perf_counter() - started)
+    except Exception as e:
+        session.errors.append(f"{type(e).__name__}: {e}")
+    return timings, session.errors
+
+# ─── SERVER METRICS ────────────────────────────────────────────
+def read_process(pid):
+    """(CPU seconds incl. reaped children, RSS bytes) of a process, from /proc (Linux only)."""
+    with open(f"/proc/{pid}/stat") as f:
+        # Fields after the parenthesized command name; utime is the 14th field overall
+        fields = f.read().rsplit(")", 1)[1].split()
+    ticks = sum(int(v) for v in fields[11:15])
+    with open(f"/proc/{pid}/statm") as f:
+        pages = int(f.read().split()[1])
+    return ticks / os.sysconf("SC_CLK_TCK"), pages * os.sysconf("SC_PAGE_SIZE")
+
+class ResourceSampler(threading.Thread):
+    """Samples the server's CPU utilization and RSS every `interval` seconds."""
+
+    def __init__(self, pid, interval):
+        super().__init__(name="resource-sampler", daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._done = threading.Event()
+
+    def run(self):
+        start = time.monotonic()
+        last_wall, (last_cpu, _) = start, read_process(self.pid)
+        while not self._done.wait(self.interval):
+            try:
+                cpu, rss = read_process(self.pid)
+            except OSError:
+                return
+            now = time.monotonic()
+            self.samples.append({"t": round(now - start, 2),
+                                 "cpu_pct": round(100 * (cpu - last_cpu) / (now - last_wall), 1),
+                                 "rss_mb": round(rss / 2 ** 20, 1)})
+            last_wall, last_cpu = now, cpu
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.samples
+
+_SAMPLE_LINE = re.compile(r'^(\w+)_bucket\{(.*)\} (\S+)$')
+
+def scrape_histograms(metrics_url):
+    """Bucket counts from the Prometheus text: {(metric, label value): {le: cumulative count}}."""
+    import requests
+
+    histograms = {}
+    names = dict(HISTOGRAMS)
+    for line in requests.get(metrics_url, timeout=10).text.splitlines():
+        match = _SAMPLE_LINE.match(line)
+        if not match or match.group(1) not in names:
+            continue
+        labels = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2)))
+        key = (match.group(1), labels.get(names[match.group(1)], ''))
+        histograms.setdefault(key, {})[float(labels['le'])] = float(match.group(3))
+    return histograms
+
+def bucket_quantile(buckets, q):
+    """Prometheus-style histogram_quantile: linear interpolation inside the bucket holding q."""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]]
+    if total <= 0:
+        return None
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for bound in bounds:
+        if buckets[bound] >= rank:
+            if bound == float('inf'):
+                return lower  # beyond the largest finite bucket
+            return lower + (bound - lower) * (rank - below) / max(buckets[bound] - below, 1e-9)
+        lower, below = bound, buckets[bound]
+    return lower
+
+def histogram_deltas(before, after):
+    """Observations made between two scrapes."""
+    return {key: {le: count - before.get(key, {}).get(le, 0.0) for le, count in buckets.items()}
+            for key, buckets in after.items()}
+
+# ─── REPORT ────────────────────────────────────────────────────
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def summarize(samples):
+    if not samples:
+        return None
+    return {"n": len(samples), "p50": percentile(samples, 0.5), "p95": percentile(samples, 0.95),
+            "p99": percentile(samples, 0.99), "max": max(samples), "mean": statistics.fmean(samples)}
+
+def print_level(level):
+    print(f"\n── {level['sessions']} concurrent sessions ── {level['completed']} completed, "
+          f"{level['failed']} failed in {level['wall_s']:.1f}s → {level['sessions_per_min']:.1f} sessions/min, "
+          f"{level['optimizations_per_min']:.1f} optimizations/min")
+    print(f"{'client step':<34} {'n':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for step, stats in level["steps"].items():
+        if stats:
+            print(f"{step:<34} {stats['n']:>5} " + " ".join(f"{stats[k]:>8.2f}s" for k in ('p50', 'p95', 'p99', 'max')))
+    if level["stages"]:
+        print(f"{'server histogram (bucketed)':<34} {'n':>5} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for name, stats in level["stages"].items():
+            print(f"{name:<34} {stats['n']:>5} " + " ".join(f"{stats[k]:>8.3f}s" for k in ('p50', 'p95', 'p99')))
+    if level["resources"]:
+        cpu = [s["cpu_pct"] for s in level["resources"]]
+        rss = [s["rss_mb"] for s in level["resources"]]
+        print(f"server CPU  mean {statistics.fmean(cpu):6.1f}%  peak {max(cpu):6.1f}%   "
+              f"RSS  start {rss[0]:7.1f} MB  peak {max(rss):7.1f} MB  end {rss[-1]:7.1f} MB")
+        # A coarse timeline; the full series is in the --save output
+        stride = max(1, len(level["resources"]) // 10)
+        print("  " + "  ".join(f"{s['t']:>5.1f}s {s['cpu_pct']:>5.0f}% {s['rss_mb']:>6.0f}MB"
+                               for s in level["resources"][::stride][:10]))
+    for error in level["errors"][:5]:
+        print(f"  error: {error}")
+
+def make_fixtures(seeds, count, pages):
+    """
+    A different resume for every session, never reused across levels, so
+    sessions don't share cache hits (reruns within a session still hit the
+    parse cache, as in production).
+    """
+    return [(f"resume_{seed}.pdf", generate_resume_pages(seed, pages)[1]) for seed in itertools.islice(seeds, count)]
+
+def run_level(base_url, metrics_url, pid, sessions, fixtures, job_desc, args):
+    """Runs `sessions` concurrent visits (started evenly over the ramp) and collects the results."""
+    before = scrape_histograms(metrics_url) if metrics_url else {}
+    sampler = ResourceSampler(pid, args.sample_interval) if pid else None
+    if sampler:
+        sampler.start()
+
+    def visit(i):
+        time.sleep(args.ramp_seconds * i / sessions)
+        return run_session(base_url, fixtures[i], job_desc, args.chat_turns, args.timeout)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(visit, range(sessions)))
+    wall = time.perf_counter() - start
+    resources = sampler.stop() if sampler else []
+
+    steps = {step: [] for step in STEPS}
+    errors = []
+    for timings, session_errors in results:
+        errors += session_errors
+        # A session that showed the user an error is failed; its steps don't count as throughput
+        if session_errors:
+            continue
+        for step, samples in timings.items():
+            steps[step] += samples
+
+    stages = {}
+    if metrics_url:
+        for (metric, label), buckets in sorted(histogram_deltas(before, scrape_histograms(metrics_url)).items()):
+            count = buckets.get(float('inf'), 0)
+            if count > 0:
+                name = label if metric == 'resume_stage_duration_seconds' else f"llm queue wait[{label}]"
+                stages[name] = {"n": int(count), **{f"p{int(q * 100)}": bucket_quantile(buckets, q)
+                                                    for q in (0.5, 0.95, 0.99)}}
+
+    completed = len(steps["session"])
+    return {
+        "sessions": sessions, "completed": completed, "failed": sessions - completed, "wall_s": wall,
+        "sessions_per_min": 60 * completed / wall, "optimizations_per_min": 60 * len(steps["optimize"]) / wall,
+        "steps": {step: summarize(samples) for step, samples in steps.items()},
+        "stages": stages, "resources": resources, "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8, 16], help="concurrency levels to run")
+    parser.add_argument("--llm-latency-ms", type=float, default=1500.0, help="simulated Gemini latency per call")
+    parser.add_argument("--pages", type=int, default=1, help="resume length of the upload fixtures")
+    parser.add_argument("--jd-words", type=int, default=400)
+    parser.add_argument("--chat-turns", type=int, default=2)
+    parser.add_argument("--ramp-seconds", type=float, default=0.0, help="spread session starts over this long")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="CPU/RSS sampling period (s)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-step timeout (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--metrics-url", help="its /metrics endpoint (METRICS_PORT), for per-stage percentiles")
+    parser.add_argument("--pid", type=int, help="its process ID, for CPU/RSS sampling")
+    parser.add_argument("--save", metavar="PATH", help="write all results (incl. the CPU/RSS series) as JSON")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--metrics-port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.metrics_port, args.llm_latency_ms, args.seed, args.pages)
+        return
+
+    job_desc = generate_jd(args.seed, args.jd_words)
+    seeds = iter(range(args.seed, args.seed + 1 + sum(args.sessions)))
+
+    process = None
+    if args.url:
+        base_url, metrics_url, pid = args.url.rstrip("/"), args.metrics_url, args.pid
+    else:
+        process, base_url, metrics_url = start_server(args.llm_latency_ms, args.seed, args.pages)
+        pid = process.pid
+    if pid and not os.path.exists(f"/proc/{pid}/stat"):
+        print("CPU/RSS sampling skipped: needs Linux /proc")
+        pid = None
+
+    levels = []
+    try:
+        # One untimed visit, so imports and the first pdflatex run don't land in the first level
+        run_session(base_url, make_fixtures(seeds, 1, args.pages)[0], job_desc, 1, args.timeout)
+        for sessions in args.sessions:
+            fixtures = make_fixtures(seeds, sessions, args.pages)
+            level = run_level(base_url, metrics_url, pid, sessions, fixtures, job_desc, args)
+            print_level(level)
+            levels.append(level)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+
+    if args.save:
+        report = {"meta": {k: v for k, v in vars(args).items() if k not in ('serve', 'port', 'metrics_port')},
+                  "levels": levels}
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.save}")
+
+if __name__ == "__main__":
+    main()
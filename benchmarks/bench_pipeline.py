@@ -0,0 +1,219 @@
+"""
+End-to-end pipeline benchmark.
+Times each stage (parse, score, enhance, convert, LaTeX render, DOCX build) on
+a seeded synthetic corpus of 1–30 page resumes and small to large JDs. Runs
+fully offline: Gemini is replaced by a stub that returns the corpus resume.
+
+Results can be saved as a JSON baseline and later compared against it; the
+comparison exits non-zero when a stage got slower than the threshold.
+
+Usage:
+    python benchmarks/bench_pipeline.py --save benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --compare benchmarks/baseline.json [--threshold 0.2]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # templates are resolved relative to the repo root
+
+import modules.llm
+from corpus import generate_jd, generate_resume_pages
+from modules.cache import MemoryCache, set_cache
+from modules.converter import convert_resume_data_to_text
+from modules.enhancer import enhance_resume_content
+from modules.generator import build_resume_docx, generate_resume_pdf, render_resume_tex
+from modules.parser import extract_text_from_docx, extract_text_from_pdf
+from modules.scorer import calculate_ats_score, extract_keywords
+
+STAGES = ("parse_pdf", "parse_docx", "keywords", "score", "enhance", "convert", "render_tex", "latex", "docx")
+
+# ─── LLM STUB ──────────────────────────────────────────────────
+class _StubResponse:
+    usage_metadata = None
+
+    def __init__(self, text):
+        self.text = text
+
+    def __iter__(self):
+        # A streamed response that arrives as a single chunk
+        yield self
+
+class _StubChat:
+    def __init__(self):
+        self.history = []
+
+    def send_message(self, content, stream=False, generation_config=None, request_options=None):
+        if _StubModel.latency:
+            time.sleep(_StubModel.latency)
+        return _StubResponse(_StubModel.chat_reply)
+
+class _StubModel:
+    """Answers every prompt with a fixed JSON payload (chat: a fixed reply) after an optional delay."""
+    payload = "{}"
+    chat_reply = "Lead your summary with the role's core stack and one measurable result."
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return _StubResponse(self.payload)
+
+    def start_chat(self, history=None):
+        return _StubChat()
+
+    @classmethod
+    def from_cached_content(cls, cached_content, **kwargs):
+        return cls()
+
+class _StubCachedContent:
+    def __init__(self, **kwargs):
+        self.name = "cachedContents/stub"
+
+    @classmethod
+    def create(cls, model, **kwargs):
+        return cls(**kwargs)
+
+class _StubGenAI:
+    GenerativeModel = _StubModel
+    caching = type("caching", (), {"CachedContent": _StubCachedContent})
+
+    @staticmethod
+    def configure(**kwargs):
+        pass
+
+def install_llm_stub(latency_ms=0.0):
+    """Routes modules.llm.get_genai() to the stub so no request leaves the machine."""
+    _StubModel.latency = latency_ms / 1000
+    modules.llm._genai = _StubGenAI
+
+# ─── MEASUREMENT ───────────────────────────────────────────────
+def time_calls(fn, runs):
+    """Returns per-call latencies in milliseconds, after one untimed warm-up call."""
+    fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def run_suite(seed, runs, pages, jd_words, stages):
+    results = {}
+
+    def record(key, fn, n=runs):
+        samples = time_calls(fn, n)
+        results[key] = {"median_ms": round(statistics.median(samples), 4),
+                        "min_ms": round(min(samples), 4), "n": len(samples)}
+        print(f"{key:<26} median {results[key]['median_ms']:10.3f} ms   min {results[key]['min_ms']:10.3f} ms")
+
+    jds = {words: generate_jd(seed + words, words) for words in jd_words}
+    mid_jd = jds[sorted(jds)[len(jds) // 2]]
+    has_latex = shutil.which("pdflatex") is not None
+    if "latex" in stages and not has_latex:
+        print("latex                      skipped: pdflatex not found on PATH")
+
+    for n in pages:
+        resume, pdf = generate_resume_pages(seed + n, n)
+        docx_bytes = build_resume_docx(resume).getvalue()
+        text = extract_text_from_pdf(io.BytesIO(pdf))
+        _StubModel.payload = json.dumps(resume)
+
+        if "parse_pdf" in stages:
+            record(f"parse_pdf[{n}p]", lambda: extract_text_from_pdf(io.BytesIO(pdf)))
+        if "parse_docx" in stages:
+            record(f"parse_docx[{n}p]", lambda: extract_text_from_docx(io.BytesIO(docx_bytes)))
+        if "keywords" in stages:
+            record(f"keywords[{n}p]", lambda: extract_keywords(text))
+        if "score" in stages:
+            for words, jd in jds.items():
+                record(f"score[{n}p,{words}w]", lambda: calculate_ats_score(text, jd))
+        if "enhance" in stages:
+            _, missing = calculate_ats_score(text, mid_jd)
+            record(f"enhance[{n}p]", lambda: enhance_resume_content(text, mid_jd, missing_keywords=missing))
+        if "convert" in stages:
+            record(f"convert[{n}p]", lambda: convert_resume_data_to_text(resume))
+        if "render_tex" in stages:
+            record(f"render_tex[{n}p]", lambda: render_resume_tex(resume))
+        if "latex" in stages and has_latex:
+            with tempfile.TemporaryDirectory() as out_dir:
+                # pdflatex is slow, so fewer runs are enough for a stable median
+                record(f"latex[{n}p]", lambda: generate_resume_pdf(resume, output_dir=out_dir), max(1, min(runs, 3)))
+        if "docx" in stages:
+            record(f"docx[{n}p]", lambda: build_resume_docx(resume))
+    return results
+
+# ─── BASELINE ──────────────────────────────────────────────────
+def compare(results, baseline, threshold, min_delta_ms):
+    """Prints a comparison table; returns the keys that regressed."""
+    regressions = []
+    print(f"\n{'stage':<26} {'baseline':>11} {'current':>11} {'change':>9}")
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<26} {'—':>11} {current['median_ms']:>9.3f}ms {'new':>9}")
+            continue
+        before, after = base["median_ms"], current["median_ms"]
+        change = (after - before) / before if before else 0.0
+        # Sub-millisecond stages jitter by more than any sane threshold
+        regressed = change > threshold and after - before > min_delta_ms
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<26} {before:>9.3f}ms {after:>9.3f}ms {change:>+8.1%}{flag}")
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 15, 30])
+    parser.add_argument("--jd-words", type=int, nargs="+", default=[100, 400, 1500])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated Gemini latency")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown ratio (default 0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    install_llm_stub(args.llm_latency_ms)
+    # A cache that keeps nothing: every run must do the work being measured
+    set_cache(MemoryCache(max_entries=0))
+    results = run_suite(args.seed, args.runs, args.pages, args.jd_words, args.stages)
+
+    if args.save:
+        report = {
+            "meta": {"seed": args.seed, "runs": args.runs, "python": platform.python_version(),
+                     "platform": platform.platform(), "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("seed") != args.seed:
+            print("Warning: baseline was recorded with a different seed; results are not comparable.")
+        regressions = compare(results, baseline["results"], args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\nFAIL: {len(regressions)} stage(s) regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nOK: no regressions")
+
+if __name__ == "__main__":
+    main()
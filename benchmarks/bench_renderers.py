@@ -0,0 +1,106 @@
+"""
+Renderer latency benchmark.
+Compares the pure-Python draft PDF engine against the LaTeX (pdflatex) render,
+and measures the Jinja2 render-to-TeX step and the DOCX build on their own.
+
+Usage:
+    python benchmarks/bench_renderers.py [--runs 20]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # templates are resolved relative to the repo root
+
+from modules.cache import MemoryCache, set_cache
+from modules.generator import render_draft_pdf, render_resume_tex, build_resume_docx, generate_resume_pdf
+
+SAMPLE_RESUME = {
+    "name": "Jordan Lee",
+    "email": "jordan.lee@example.com",
+    "phone": "+1 (555) 010-2030",
+    "linkedin": "linkedin.com/in/jordanlee",
+    "github": "github.com/jordanlee",
+    "summary": "Backend engineer with 6 years of experience building distributed data platforms in Python and Go, "
+               "focused on reliability, observability and cost-efficient cloud infrastructure.",
+    "experience": [
+        {
+            "title": "Senior Software Engineer",
+            "company": "Northwind Analytics",
+            "dates": "Jan 2021 – Present",
+            "bullets": [
+                "Led migration of batch ETL to streaming pipelines on Kafka, cutting data latency from 6h to 4 minutes.",
+                "Designed a multi-tenant REST API in FastAPI serving 2,000 requests/s at p99 under 80ms.",
+                "Mentored 4 engineers and introduced design reviews that halved production incidents.",
+            ],
+        },
+        {
+            "title": "Software Engineer",
+            "company": "Contoso Cloud",
+            "dates": "Jun 2018 – Dec 2020",
+            "bullets": [
+                "Built Terraform modules and CI/CD workflows used by 30+ services.",
+                "Reduced AWS spend by 22% through autoscaling and storage lifecycle policies.",
+            ],
+        },
+    ],
+    "projects": [
+        {
+            "name": "QueryLens",
+            "link": "github.com/jordanlee/querylens",
+            "description": "Open-source SQL query profiler with flame graphs; 1.2k GitHub stars.",
+        },
+    ],
+    "education": [
+        {"school": "University of Washington", "degree": "B.S. Computer Science", "year": "2018", "gpa": "3.8"},
+    ],
+    "skills": [
+        {"category": "Languages", "items": ["Python", "Go", "SQL", "TypeScript"]},
+        {"category": "Infrastructure", "items": "AWS, Kubernetes, Terraform, Kafka, PostgreSQL"},
+    ],
+}
+
+def time_calls(fn, runs):
+    """Returns per-call latencies in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, samples):
+    print(f"{label:<14} median {statistics.median(samples):9.2f} ms   "
+          f"min {min(samples):9.2f} ms   max {max(samples):9.2f} ms   (n={len(samples)})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    # A cache that keeps nothing: every run must render, not look up the last result
+    set_cache(MemoryCache(max_entries=0))
+    report("draft (python)", time_calls(lambda: render_draft_pdf(SAMPLE_RESUME), args.runs))
+    report("render tex", time_calls(lambda: render_resume_tex(SAMPLE_RESUME), args.runs))
+    report("docx", time_calls(lambda: build_resume_docx(SAMPLE_RESUME), args.runs))
+
+    if not shutil.which("pdflatex"):
+        print("latex          skipped: pdflatex not found on PATH")
+        return
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        # pdflatex is slow, so fewer runs are enough for a stable median
+        latex_runs = max(1, min(args.runs, 5))
+        try:
+            report("latex", time_calls(lambda: generate_resume_pdf(SAMPLE_RESUME, output_dir=out_dir), latex_runs))
+        except Exception as e:
+            print(f"latex          failed: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Cold-start benchmark.
+Imports each module in a fresh interpreter with `-X importtime` and reports the
+cumulative import time. Fails (exit code 1) when `app` takes longer than the
+budget to import, or when it pulls in a heavy dependency that should only be
+loaded on first use.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 600]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = (
+    "app",
+    "modules.ui",
+    "modules.scorer",
+    "modules.editor",
+    "modules.parser",
+    "modules.enhancer",
+    "modules.generator",
+    "modules.chat",
+)
+
+# Must not be imported before the first paint
+DEFERRED = ("google.generativeai", "pdfplumber", "docx", "jinja2", "pypdfium2")
+
+def import_profile(module):
+    """Imports a module in a fresh interpreter; returns {module name: cumulative µs}."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # app.py stops early without a key; any value is enough to import it
+    env.setdefault("GEMINI_API_KEY", "benchmark")
+    # The background warm-up imports everything on purpose; measure the import path only
+    env["WARMUP_DISABLED"] = "1"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        try:
+            timings[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header line
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "600")),
+                        help="maximum median import time of app.py (default: $STARTUP_BUDGET_MS or 600)")
+    args = parser.parse_args()
+
+    failures = []
+    for module in MODULES:
+        samples = []
+        for _ in range(args.runs):
+            timings = import_profile(module)
+            samples.append(timings.get(module, 0) / 1000)
+        print(f"{module:<18} median {statistics.median(samples):9.2f} ms   "
+              f"min {min(samples):9.2f} ms   max {max(samples):9.2f} ms   (n={len(samples)})")
+
+        if module == "app":
+            median = statistics.median(samples)
+            if median > args.budget_ms:
+                failures.append(f"app imports in {median:.0f} ms, budget is {args.budget_ms:.0f} ms")
+            eager = [name for name in DEFERRED if name in timings]
+            if eager:
+                failures.append(f"app imports deferred dependencies at startup: {', '.join(eager)}")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print(f"OK: app cold start within {args.budget_ms:.0f} ms budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Synthetic resume / job description corpus.
+Seeded, so the same arguments always produce the same documents. Resumes use
+the enhancer's JSON schema and are written out as PDF (draft engine) and DOCX
+files of a requested page count.
+
+Usage:
+    python benchmarks/corpus.py --out corpus/ [--seed 7] [--pages 1 5 15 30]
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SKILLS = (
+    "Python", "Go", "Java", "TypeScript", "SQL", "Rust", "Kotlin", "Scala", "C++", "Bash",
+    "AWS", "GCP", "Azure", "Kubernetes", "Docker", "Terraform", "Ansible", "Helm", "Linux",
+    "PostgreSQL", "MySQL", "Redis", "Kafka", "Spark", "Airflow", "Snowflake", "BigQuery", "dbt",
+    "FastAPI", "Django", "Flask", "React", "GraphQL", "gRPC", "REST", "Prometheus", "Grafana",
+    "PyTorch", "TensorFlow", "pandas", "NumPy", "scikit-learn", "MLflow", "Jenkins", "GitHub Actions",
+)
+VERBS = (
+    "Built", "Designed", "Led", "Migrated", "Automated", "Optimized", "Scaled", "Launched",
+    "Refactored", "Owned", "Introduced", "Reduced", "Improved", "Delivered", "Mentored",
+)
+OBJECTS = (
+    "streaming data pipelines", "a multi-tenant REST API", "the CI/CD platform", "observability dashboards",
+    "a feature store", "the billing service", "internal developer tooling", "batch ETL jobs",
+    "a recommendation engine", "search indexing", "the authentication service", "infrastructure as code",
+)
+OUTCOMES = (
+    "cutting latency by {n}%", "saving ${n}k per year", "serving {n}k requests per second",
+    "reducing incidents by {n}%", "for {n} engineering teams", "improving conversion by {n}%",
+)
+TITLES = ("Software Engineer", "Senior Software Engineer", "Data Engineer", "Backend Engineer",
+          "Platform Engineer", "Machine Learning Engineer", "Staff Engineer", "DevOps Engineer")
+COMPANIES = ("Northwind", "Contoso", "Fabrikam", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries")
+SCHOOLS = ("University of Washington", "Georgia Tech", "UT Austin", "TU Munich", "IIT Bombay")
+FILLER = (
+    "collaborate", "stakeholders", "ownership", "mission", "customers", "quality", "delivery",
+    "roadmap", "architecture", "reliability", "scalability", "security", "performance", "mentorship",
+    "product", "impact", "agile", "communication", "distributed", "systems", "cloud", "data",
+)
+
+def _bullet(rng):
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(SKILLS)} and {rng.choice(SKILLS)}, {outcome}."
+
+def _job(rng, year):
+    return {
+        "title": rng.choice(TITLES),
+        "company": f"{rng.choice(COMPANIES)} {rng.choice(('Labs', 'Cloud', 'Analytics', 'Systems'))}",
+        "dates": f"{year - rng.randint(1, 3)} – {year}",
+        "bullets": [_bullet(rng) for _ in range(rng.randint(3, 6))],
+    }
+
+def generate_resume(seed=0, jobs=3):
+    """Resume dict in the enhancer schema with `jobs` experience entries."""
+    rng = random.Random(seed)
+    first, last = rng.choice(("Alex", "Sam", "Priya", "Chen", "Maria")), rng.choice(("Lee", "Patel", "Garcia", "Kim"))
+    return {
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "phone": f"+1 555 {rng.randint(1000, 9999)}",
+        "linkedin": f"linkedin.com/in/{first.lower()}{last.lower()}",
+        "github": f"github.com/{first.lower()}{last.lower()}",
+        "summary": " ".join(_bullet(rng) for _ in range(3)),
+        "experience": [_job(rng, 2025 - 2 * i) for i in range(jobs)],
+        "projects": [
+            {"name": f"Project {i + 1}", "link": f"github.com/example/p{i + 1}", "description": _bullet(rng)}
+            for i in range(max(1, jobs // 3))
+        ],
+        "education": [{"school": rng.choice(SCHOOLS), "degree": "B.S. Computer Science",
+                       "year": str(2025 - 2 * jobs - 4), "gpa": f"3.{rng.randint(0, 9)}"}],
+        "skills": [
+            {"category": "Languages", "items": ", ".join(rng.sample(SKILLS[:10], 5))},
+            {"category": "Platforms", "items": ", ".join(rng.sample(SKILLS[10:], 8))},
+        ],
+    }
+
+def count_pdf_pages(pdf_bytes):
+    return pdf_bytes.count(b"/Type /Page") - pdf_bytes.count(b"/Type /Pages")
+
+def generate_resume_pages(seed=0, pages=1):
+    """
+    Resume dict that fills (at least) `pages` pages in the draft PDF layout.
+
+    Returns:
+        tuple: (resume dict, PDF bytes)
+    """
+    from modules.generator import render_draft_pdf
+
+    jobs = max(1, pages * 3)
+    while True:
+        resume = generate_resume(seed, jobs)
+        pdf = render_draft_pdf(resume)
+        if count_pdf_pages(pdf) >= pages:
+            return resume, pdf
+        jobs += 1
+
+def generate_jd(seed=0, words=300):
+    """Job description text of roughly `words` words."""
+    rng = random.Random(seed)
+    lines = [f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}", "", "Requirements:"]
+    count = 0
+    while count < words:
+        if rng.random() < 0.3:
+            sentence = f"- Experience with {rng.choice(SKILLS)}, {rng.choice(SKILLS)} or {rng.choice(SKILLS)}."
+        else:
+            sentence = "- " + " ".join(rng.choice(FILLER) for _ in range(rng.randint(6, 14))) + "."
+        lines.append(sentence)
+        count += len(sentence.split())
+    return "\n".join(lines)
+
+def write_corpus(out_dir, seed=0, pages=(1, 5, 15, 30), jd_words=(100, 400, 1500)):
+    """Writes resume PDFs/DOCXs and JDs to `out_dir`; returns the list of written paths."""
+    from modules.generator import build_resume_docx
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for n in pages:
+        resume, pdf = generate_resume_pages(seed + n, n)
+        for ext, payload in (("pdf", pdf), ("docx", build_resume_docx(resume).getvalue()),
+                             ("json", json.dumps(resume, indent=2).encode("utf-8"))):
+            path = os.path.join(out_dir, f"resume_{n}p.{ext}")
+            with open(path, "wb") as f:
+                f.write(payload)
+            written.append(path)
+    for words in jd_words:
+        path = os.path.join(out_dir, f"jd_{words}w.txt")
+        with io.open(path, "w", encoding="utf-8") as f:
+            f.write(generate_jd(seed + words, words))
+        written.append(path)
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 15, 30])
+    parser.add_argument("--jd-words", type=int, nargs="+", default=[100, 400, 1500])
+    args = parser.parse_args()
+    for path in write_corpus(args.out, args.seed, args.pages, args.jd_words):
+        print(path)
@@ -0,0 +1,194 @@
+"""
+Cache Module
+Shared cache for parsed uploads, LLM responses and rendered PDF/DOCX files,
+so replicas behind a load balancer reuse each other's work: a reload that
+lands on another replica is served from the cache instead of being redone.
+
+Backends (CACHE_BACKEND):
+    memory  in-process LRU, per replica (default)
+    sqlite  one SQLite file at CACHE_PATH, e.g. on a volume shared by the
+            replicas of one host (WAL mode needs a local filesystem, not NFS)
+    redis   any Redis-compatible server at CACHE_URL (Redis, Valkey, KeyDB)
+
+Keys are namespaced SHA-256 digests of their parts, so every replica derives
+the same key for the same input (unlike Python's per-process salted hash()).
+The namespace also selects the entry's TTL.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from modules.metrics import record_cache
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join("output", "cache.sqlite3"))
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+
+# Seconds an entry is kept, by key namespace
+TTLS = {
+    'parse': int(os.getenv("CACHE_TTL_PARSE", str(7 * 24 * 3600))),
+    'llm': int(os.getenv("CACHE_TTL_LLM", str(24 * 3600))),
+    'artifact': int(os.getenv("CACHE_TTL_ARTIFACT", str(24 * 3600))),
+}
+
+_backend = None
+_lock = threading.Lock()
+
+def make_key(namespace, *parts):
+    """Stable cache key: `<namespace>:<sha256 of the parts>` (str parts are UTF-8 encoded)."""
+    if namespace not in TTLS:
+        raise ValueError(f"Unknown cache namespace '{namespace}'.")
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b"\x00")
+    return f"{namespace}:{digest.hexdigest()}"
+
+# ─── BACKENDS ──────────────────────────────────────────────────
+class MemoryCache:
+    """Bounded LRU in this process."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+class SQLiteCache:
+    """Single-table SQLite store; one connection per thread."""
+
+    # Expired rows are swept every this many writes
+    PURGE_EVERY = 200
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        # Write counter shared by the request, render and scoring threads
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit; the timeout covers writes from other replicas holding the lock
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        conn = self._connect()
+        conn.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                     (key, sqlite3.Binary(value), time.time() + ttl))
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.PURGE_EVERY == 0
+        if purge:
+            conn.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+class RedisCache:
+    """Redis-compatible server; expiry is left to the server."""
+
+    def __init__(self, url=CACHE_URL):
+        # Optional dependency, only needed for this backend
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=ttl)
+
+    def delete(self, key):
+        self._client.delete(key)
+
+BACKENDS = {'memory': MemoryCache, 'sqlite': SQLiteCache, 'redis': RedisCache}
+
+def get_cache():
+    """The process-wide backend chosen by CACHE_BACKEND (in-process if it can't be set up)."""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                try:
+                    _backend = BACKENDS[CACHE_BACKEND]()
+                except Exception as e:
+                    print(f"⚠️ Cache backend '{CACHE_BACKEND}' unavailable ({e}); using the in-process cache.")
+                    _backend = MemoryCache()
+    return _backend
+
+def set_cache(backend):
+    """Replaces the process-wide backend (e.g. in benchmarks)."""
+    global _backend
+    with _lock:
+        _backend = backend
+
+# ─── ACCESS ────────────────────────────────────────────────────
+# A cache outage only costs hit rate: read and write errors are logged and
+# treated as misses.
+
+def fetch(key, name):
+    """Cached bytes for `key`, or None. `name` labels the hit/miss metric."""
+    try:
+        value = get_cache().get(key)
+    except Exception as e:
+        print(f"Cache read failed: {e}")
+        value = None
+    record_cache(name, value is not None)
+    return value
+
+def store(key, value):
+    """Caches bytes under `key` for its namespace's TTL."""
+    try:
+        get_cache().set(key, value, TTLS[key.split(':', 1)[0]])
+    except Exception as e:
+        print(f"Cache write failed: {e}")
+
+def fetch_json(key, name):
+    value = fetch(key, name)
+    return None if value is None else json.loads(value)
+
+def store_json(key, value):
+    store(key, json.dumps(value, ensure_ascii=False).encode('utf-8'))
@@ -1,19 +1,75 @@
-import google.generativeai as genai
 import streamlit as st
 import os
-from dotenv import load_dotenv
+import json
+import hashlib
+import threading
+import time
+from datetime import timedelta
+from modules.llm import SCHEDULER, estimate_tokens, get_genai
+from modules.metrics import increment, record_cache, record_llm_usage
+from modules.prompts import get_coach_system_prompt
+from modules.intents import answer_locally, get_hit_stats
+from modules.routing import ROUTER, ROUTES, STREAM_TIMEOUT, call_routed, open_stream
 
-# Load environment variables
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
+# Rough budget for prior turns resent with each message (~4 characters per token)
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKENS", "2000"))
 
-# Configure Gemini
-if api_key:
-    genai.configure(api_key=api_key)
+# ─── CONTEXT CACHE ─────────────────────────────────────────────
+# The Gemini API is stateless, so a system instruction is resent (and billed)
+# with every turn. Contexts big enough to qualify are stored once as an
+# explicit context cache instead, and each turn only references it.
+CHAT_CACHE_TTL = int(os.getenv("CHAT_CACHE_TTL", "1800"))
+# Gemini rejects context caches below a minimum size; smaller contexts stay inline
+CHAT_CACHE_MIN_TOKENS = int(os.getenv("CHAT_CACHE_MIN_TOKENS", "1024"))
+
+_context_caches = {}  # context key -> (CachedContent or None after a failure, expires_at)
+_context_caches_lock = threading.Lock()
+
+def _cached_model(genai, model_name, system_prompt, key):
+    """A model bound to a context cache of `system_prompt`, or None when it must be sent inline."""
+    if estimate_tokens(system_prompt) < CHAT_CACHE_MIN_TOKENS:
+        return None
+    now = time.time()
+    with _context_caches_lock:
+        entry = _context_caches.get(key)
+    # Leave a minute of margin so a cache doesn't expire between turns
+    if entry is not None and entry[1] > now + 60:
+        cached = entry[0]
+        record_cache('chat_context', cached is not None)
+    else:
+        record_cache('chat_context', False)
+        try:
+            cached = genai.caching.CachedContent.create(
+                model=f"models/{model_name}", system_instruction=system_prompt,
+                ttl=timedelta(seconds=CHAT_CACHE_TTL))
+        except Exception as e:
+            # Not every model supports caching; don't retry this context until it would have expired
+            print(f"Context cache unavailable for {model_name}: {e}")
+            cached = None
+        with _context_caches_lock:
+            for stale in [k for k, (_, expires) in _context_caches.items() if expires <= now]:
+                del _context_caches[stale]
+            _context_caches[key] = (cached, now + CHAT_CACHE_TTL)
+    if cached is None:
+        return None
+    return genai.GenerativeModel.from_cached_content(cached)
+
+def serialize_context(resume_data, missing_keywords=None):
+    """Compact JSON of the resume for the coach, with empty fields dropped."""
+    if hasattr(resume_data, 'to_dict'):
+        resume_data = resume_data.to_dict()
+    if not isinstance(resume_data, dict):
+        return str(resume_data or "No resume processed yet.")
+    context = {k: v for k, v in resume_data.items() if v and k not in ('keywords_added', 'keywords_skipped', 'raw')}
+    if missing_keywords:
+        context['missing_keywords'] = sorted(missing_keywords)[:30]
+    return json.dumps(context, separators=(',', ':'), ensure_ascii=False)
 
 class FeedbackChat:
     def __init__(self):
-        self.model = genai.GenerativeModel('gemini-flash-latest')
+        self.session = None
+        self.context_key = None
+        self.last_usage = None
 
     def get_chat_history(self):
         """Retrieves or initializes chat history from session state."""
@@ -25,39 +81,94 @@ class FeedbackChat:
         """Adds a message to the chat history."""
         self.get_chat_history().append({"role": role, "content": content})
 
-    def generate_response(self, user_query, resume_text, job_desc):
-        """
-        Generates a response from the AI based on the user's query and context.
+    def history_window(self, budget=HISTORY_TOKEN_BUDGET):
+        """Most recent completed turns that fit the token budget, oldest first."""
+        turns = []
+        used = 0
+        messages = list(self.get_chat_history())
+        # Skip the greeting and the pending query; the model only needs completed exchanges
+        if messages and messages[0]["role"] == "assistant":
+            messages = messages[1:]
+        if messages and messages[-1]["role"] == "user":
+            messages = messages[:-1]
+        # Walk back in user/assistant pairs so the window never starts mid-exchange
+        for i in range(len(messages) - 2, -1, -2):
+            user, reply = messages[i], messages[i + 1]
+            if user["role"] != "user" or reply["role"] != "assistant":
+                break
+            cost = estimate_tokens(user["content"]) + estimate_tokens(reply["content"])
+            if used + cost > budget:
+                break
+            used += cost
+            turns[:0] = [
+                {"role": "user", "parts": [user["content"]]},
+                {"role": "model", "parts": [reply["content"]]},
+            ]
+        return turns
+
+    def ensure_session(self, resume_data, job_desc, missing_keywords=None, model_name=None):
+        """Starts a model chat session, reusing it while the model and resume/JD context are unchanged."""
+        model_name = model_name or ROUTES['chat'][0]
+        context_json = serialize_context(resume_data, missing_keywords)
+        key = hashlib.sha256(f"{model_name}\x00{context_json}\x00{job_desc}".encode('utf-8')).hexdigest()
+        if self.session is None or key != self.context_key:
+            genai = get_genai()
+            system_prompt = get_coach_system_prompt(context_json, job_desc)
+            model = (_cached_model(genai, model_name, system_prompt, key)
+                     or genai.GenerativeModel(model_name, system_instruction=system_prompt))
+            self.session = model.start_chat()
+            self.context_key = key
+        return self.session
+
+    def stream_response(self, user_query, resume_data, job_desc, missing_keywords=None):
         """
-        # Build context
-        context = f"""
-        You are an expert AI Recruiter and Resume Coach. 
-        You are helping a candidate improve their resume for a specific job.
-        
-        CONTEXT:
-        RESUME CONTENT:
-        {resume_text}
-        
-        TARGET JOB DESCRIPTION:
-        {job_desc}
-        
-        USER QUERY:
-        {user_query}
-        
-        INSTRUCTIONS:
-        - Provide specific, actionable advice.
-        - Be encouraging but honest.
-        - Keep answers concise and relevant to the resume/JD provided.
-        - If the user asks about the ATS score, explain how to improve it based on the missing keywords (if you can infer them).
+        Streams the AI response to the user's query as text chunks.
+        The resume/JD context lives in the session's system instruction (a context
+        cache when it is large enough); each turn adds the query plus a
+        token-budgeted window of prior turns.
         """
-        
+        # Lookups like "what keywords am I missing?" are answered from the pipeline results
+        local_answer = answer_locally(user_query, st.session_state)
+        record_cache('coach_local_answer', local_answer is not None)
+        if local_answer is not None:
+            yield local_answer
+            return
+
         try:
-            response = self.model.generate_content(context)
-            return response.text
+            # The completed turns already in chat_history are the source of truth
+            window = self.history_window()
+            # The system instruction (resume and JD context) is sent with every turn too
+            system_prompt = get_coach_system_prompt(serialize_context(resume_data, missing_keywords), job_desc)
+            prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_query) + sum(
+                estimate_tokens(part) for turn in window for part in turn['parts'])
+            config = ROUTER.generation_config('chat', prompt_tokens)
+
+            def send(model_name, timeout):
+                session = self.ensure_session(resume_data, job_desc, missing_keywords, model_name)
+                session.history = window
+                return open_stream(lambda: session.send_message(
+                    user_query, stream=True, generation_config=config,
+                    request_options={'timeout': STREAM_TIMEOUT}), timeout)
+
+            # Chat has the lowest priority in the shared Gemini quota; a model that
+            # doesn't start streaming in time is swapped for a faster one
+            response = call_routed('chat', prompt_tokens, send, streamed=True)
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+            self.last_usage = getattr(response, 'usage_metadata', None)
+            record_llm_usage('chat', response)
+            if self.last_usage is not None:
+                SCHEDULER.settle(SCHEDULER.budget('chat', prompt_tokens), self.last_usage.total_token_count)
         except Exception as e:
-            return f"I'm sorry, I encountered an error: {str(e)}"
+            increment('resume_llm_errors_total', task='chat')
+            yield f"I'm sorry, I encountered an error: {str(e)}"
+
+    def generate_response(self, user_query, resume_data, job_desc, missing_keywords=None):
+        """Generates the complete response in one piece."""
+        return "".join(self.stream_response(user_query, resume_data, job_desc, missing_keywords))
 
-    def render_chat_ui(self, resume_text, job_desc):
+    def render_chat_ui(self, resume_data, job_desc, missing_keywords=None):
         """
         Renders the chat interface in Streamlit.
         """
@@ -82,31 +193,48 @@ class FeedbackChat:
             with st.chat_message("user"):
                 st.markdown(prompt)
 
-            # Generate AI response
+            # Stream the AI response as tokens arrive
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    response = self.generate_response(prompt, resume_text, job_desc)
-                    st.markdown(response)
-            
-            # Add AI message
+                response = st.write_stream(self.stream_response(prompt, resume_data, job_desc, missing_keywords))
+
+            # Add AI message; it is already on screen, so no rerun is needed
             st.session_state.chat_history.append({"role": "assistant", "content": response})
-            st.rerun()
 
-        # Download Button
+        stats = get_hit_stats()
+        if stats['total']:
+            st.caption(f"⚡ {stats['local']} of {stats['total']} questions answered instantly without an AI call ({stats['hit_rate']:.0%}).")
+
+        # Transcript export
         if len(st.session_state.chat_history) > 1:
             st.markdown("---")
-            col1, col2 = st.columns([0.8, 0.2])
-            with col2:
-                if st.button("📥 Download Chat PDF"):
-                    from modules.generator import generate_chat_pdf
-                    pdf_path = generate_chat_pdf(st.session_state.chat_history)
-                    if pdf_path:
-                        with open(pdf_path, "rb") as f:
-                            st.download_button(
-                                label="Please click here to download",
-                                data=f,
-                                file_name="Career_Coach_Chat.pdf",
-                                mime="application/pdf"
-                            )
-                    else:
-                        st.error("Failed to generate PDF. Check if LaTeX is installed.")
+            self.render_export_options()
+
+    def render_export_options(self):
+        """Markdown/JSON downloads are instant; the PDF is compiled in the background."""
+        from modules.generator import export_chat_markdown, export_chat_json, submit_chat_pdf
+
+        history = st.session_state.chat_history
+        col1, col2, col3 = st.columns(3)
+        col1.download_button("📝 Chat as Markdown", export_chat_markdown(history), "Career_Coach_Chat.md",
+                             "text/markdown", use_container_width=True)
+        col2.download_button("🧾 Chat as JSON", export_chat_json(history), "Career_Coach_Chat.json",
+                             "application/json", use_container_width=True)
+
+        with col3:
+            # The job is tied to the transcript length; new messages make it stale
+            job = st.session_state.get('chat_pdf_job')
+            if job and job[0] != len(history):
+                job = st.session_state.chat_pdf_job = None
+
+            if job is None and st.button("📥 Prepare Chat PDF", use_container_width=True):
+                job = st.session_state.chat_pdf_job = (len(history), submit_chat_pdf(history))
+
+            if job is not None and not job[1].done():
+                st.button("⏳ Preparing PDF… (refresh)", use_container_width=True)
+            elif job is not None:
+                try:
+                    with open(job[1].result(), "rb") as f:
+                        st.download_button("📥 Download Chat PDF", f.read(), "Career_Coach_Chat.pdf",
+                                           "application/pdf", use_container_width=True)
+                except Exception as e:
+                    st.error(f"Failed to generate PDF: {e}")
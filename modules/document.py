@@ -0,0 +1,174 @@
+"""
+Resume Document Module
+Typed, normalized representation of the enhanced resume.
+Validated once after enhancement; derived views (plain text, LaTeX-escaped
+fields, keyword sets) are computed lazily and reused by later stages.
+"""
+import hashlib
+import json
+
+CONTACT_FIELDS = ('name', 'email', 'phone', 'linkedin', 'github', 'website')
+
+# Entry fields per list section; everything is normalized to strings
+ENTRY_FIELDS = {
+    'experience': ('title', 'company', 'dates'),
+    'projects': ('name', 'link', 'description'),
+    'education': ('school', 'degree', 'year', 'gpa'),
+}
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ', '.join(_text(v) for v in value if v)
+    return str(value).strip()
+
+def _bullets(value):
+    """Bullets as a list of non-empty strings; a text blob is split per line."""
+    if isinstance(value, str):
+        value = value.splitlines()
+    if not isinstance(value, (list, tuple)):
+        return []
+    bullets = [_text(b).lstrip('-•* ').strip() for b in value]
+    return [b for b in bullets if b]
+
+def _entries(section, value):
+    if not isinstance(value, (list, tuple)):
+        return []
+    entries = []
+    for item in value:
+        if not isinstance(item, dict):
+            continue
+        entry = {field: _text(item.get(field)) for field in ENTRY_FIELDS[section]}
+        if section == 'experience':
+            entry['bullets'] = _bullets(item.get('bullets'))
+        if any(entry.values()):
+            entries.append(entry)
+    return entries
+
+def _skills(value):
+    """Skills as [{'category', 'items'}] with items joined into one string."""
+    if isinstance(value, dict):
+        value = [{'category': k, 'items': v} for k, v in value.items()]
+    if not isinstance(value, (list, tuple)):
+        return []
+    skills = []
+    for item in value:
+        if isinstance(item, dict):
+            skill = {'category': _text(item.get('category')), 'items': _text(item.get('items'))}
+        else:
+            skill = {'category': '', 'items': _text(item)}
+        if skill['items']:
+            skills.append(skill)
+    return skills
+
+def _skipped(value):
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [{'keyword': _text(v.get('keyword')), 'reason': _text(v.get('reason'))} if isinstance(v, dict) else _text(v)
+            for v in value if v]
+
+def normalize_field(field, value):
+    """`value` normalized the way ResumeDocument stores `field` (empty rows dropped)."""
+    if field in ENTRY_FIELDS:
+        return _entries(field, value)
+    if field == 'skills':
+        return _skills(value)
+    if field in CONTACT_FIELDS or field == 'summary':
+        return _text(value)
+    raise KeyError(field)
+
+class ResumeDocument:
+    """Validated resume with lazily cached derived views."""
+
+    __slots__ = CONTACT_FIELDS + (
+        'summary', 'experience', 'projects', 'education', 'skills',
+        'keywords_added', 'keywords_skipped',
+        '_dict', '_text', '_latex', '_tokens', '_fingerprint',
+    )
+
+    def __init__(self, **fields):
+        for field in CONTACT_FIELDS + ('summary',):
+            setattr(self, field, fields.get(field, ''))
+        for field in ('experience', 'projects', 'education', 'skills', 'keywords_added', 'keywords_skipped'):
+            setattr(self, field, fields.get(field, []))
+        self._dict = self._text = self._latex = self._tokens = self._fingerprint = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Validates and normalizes raw enhancer output in a single pass."""
+        if isinstance(data, cls):
+            return data
+        if not isinstance(data, dict):
+            raise ValueError("Resume data must be a JSON object.")
+        fields = {field: _text(data.get(field)) for field in CONTACT_FIELDS + ('summary',)}
+        for section in ENTRY_FIELDS:
+            fields[section] = _entries(section, data.get(section))
+        fields['skills'] = _skills(data.get('skills'))
+        fields['keywords_added'] = [k for k in (_text(v) for v in data.get('keywords_added') or []) if k]
+        fields['keywords_skipped'] = _skipped(data.get('keywords_skipped'))
+        return cls(**fields)
+
+    # Mapping-style access keeps templates and dict-based helpers working
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ and not key.startswith('_') else None
+        return value if value else default
+
+    def __getitem__(self, key):
+        if key not in self.__slots__ or key.startswith('_'):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return bool(self.get(key))
+
+    def update(self, field, value):
+        """Replaces one field with a normalized value and drops cached views."""
+        setattr(self, field, normalize_field(field, value))
+        self.invalidate()
+
+    def copy(self):
+        """Independent snapshot, e.g. for a background render."""
+        return ResumeDocument.from_dict(self.to_dict())
+
+    def invalidate(self):
+        """Drops cached views after a field has been edited in place."""
+        self._dict = self._text = self._latex = self._tokens = self._fingerprint = None
+
+    def to_dict(self):
+        """Plain dict in the enhancer schema (cached; treat as read-only)."""
+        if self._dict is None:
+            self._dict = {field: getattr(self, field) for field in self.__slots__ if not field.startswith('_')}
+        return self._dict
+
+    @property
+    def text(self):
+        """Plain text used for ATS scoring."""
+        if self._text is None:
+            from modules.converter import convert_resume_data_to_text
+            self._text = convert_resume_data_to_text(self.to_dict())
+        return self._text
+
+    @property
+    def latex(self):
+        """LaTeX-escaped copy of the fields for the Jinja templates."""
+        if self._latex is None:
+            from modules.generator import clean_structure
+            self._latex = clean_structure(self.to_dict())
+        return self._latex
+
+    @property
+    def tokens(self):
+        """ATS keyword set of the plain text."""
+        if self._tokens is None:
+            from modules.scorer import keyword_set
+            self._tokens = frozenset(keyword_set(self.text))
+        return self._tokens
+
+    @property
+    def fingerprint(self):
+        """Stable content hash, e.g. for caching rendered artifacts."""
+        if self._fingerprint is None:
+            canonical = json.dumps(self.to_dict(), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+            self._fingerprint = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return self._fingerprint
@@ -0,0 +1,160 @@
+"""
+Editor Module
+Keeps per-section keyword sets of the optimized resume so an edit re-scores
+only the changed section, and rebuilds just the artifacts whose input changed.
+"""
+import itertools
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+from modules.converter import SECTION_ORDER, contact_lines, section_lines
+from modules.document import normalize_field
+from modules.scorer import keyword_set
+
+# Quiet period before an edited resume is sent to pdflatex
+RENDER_DEBOUNCE_SECONDS = 2.0
+
+SECTIONS = ('contact',) + SECTION_ORDER
+# Sections edited as one widget per row
+ROW_SECTIONS = ('experience', 'projects', 'skills')
+
+class SectionScorer:
+    """
+    Incremental version of calculate_ats_score.
+
+    The resume text is the concatenation of its sections, so the resume's
+    keyword set is the union of the per-section sets. Counting in how many
+    sections each JD keyword appears lets a single section be swapped out
+    without re-reading the rest of the resume.
+    """
+
+    def __init__(self, resume, jd_keywords):
+        self.jd_keywords = frozenset(jd_keywords)
+        self.section_keywords = {}
+        self.counts = Counter()
+        for section in SECTIONS:
+            self.update(resume, section)
+
+    def _section_keywords(self, resume, section):
+        data = resume.to_dict()
+        lines = contact_lines(data) if section == 'contact' else section_lines(data, section)
+        # Only JD keywords can change the score
+        return frozenset(keyword_set("\n".join(lines))) & self.jd_keywords
+
+    def update(self, resume, section):
+        """Re-scores one section against the cached JD keywords."""
+        old = self.section_keywords.get(section, frozenset())
+        new = self._section_keywords(resume, section)
+        for keyword in old - new:
+            self.counts[keyword] -= 1
+            if not self.counts[keyword]:
+                del self.counts[keyword]
+        for keyword in new - old:
+            self.counts[keyword] += 1
+        self.section_keywords[section] = new
+
+    @property
+    def score(self):
+        if not self.jd_keywords:
+            return 0
+        return round(len(self.counts) / len(self.jd_keywords) * 100, 2)
+
+    @property
+    def missing(self):
+        return list(self.jd_keywords - self.counts.keys())
+
+class EditSession:
+    """Editable optimized resume with incremental scoring and artifact rebuilds."""
+
+    def __init__(self, resume, jd_keywords, template_name="modern"):
+        self.resume = resume
+        self.template_name = template_name
+        self.scorer = SectionScorer(resume, jd_keywords)
+        # Fixed per optimization run so widget keys don't leak between runs
+        self.key = resume.fingerprint[:10]
+        # Stable id per row, so widget state follows its row when an emptied one is dropped
+        self._row_counter = itertools.count()
+        self.row_ids = {section: [next(self._row_counter) for _ in resume[section]] for section in ROW_SECTIONS}
+        # Fingerprint each artifact was last built from
+        self.rendered = {}
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def apply(self, section, value):
+        """Applies an edit to one section and re-scores just that section. Returns the new score."""
+        if section in self.row_ids:
+            # Rows the document drops (emptied) take their ids with them
+            self.row_ids[section] = [row_id for row_id, row in zip(self.row_ids[section], value)
+                                     if normalize_field(section, [row])]
+        self.resume.update(section, value)
+        self.scorer.update(self.resume, section)
+        return self.scorer.score
+
+    def mark_rendered(self, *artifacts):
+        """Records artifacts that were built outside the session (e.g. by the pipeline)."""
+        for artifact in artifacts:
+            self.rendered[artifact] = self._artifact_key(artifact)
+
+    def _artifact_key(self, artifact):
+        if artifact == 'latex':
+            return (self.resume.fingerprint, self.template_name)
+        return self.resume.fingerprint
+
+    def rebuild(self):
+        """
+        Rebuilds only the stale artifacts.
+        The draft PDF and the DOCX are cheap and rebuilt right away; the LaTeX
+        render is debounced so a burst of edits compiles once.
+
+        Returns:
+            dict: Any of 'pdf_path', 'docx_file', 'pdf_future' that changed
+        """
+        from modules.generator import generate_draft_pdf, build_resume_docx
+
+        changed = {}
+        if self.rendered.get('draft') != self._artifact_key('draft'):
+            changed['pdf_path'] = generate_draft_pdf(self.resume)
+            self.mark_rendered('draft')
+        if self.rendered.get('docx') != self._artifact_key('docx'):
+            changed['docx_file'] = build_resume_docx(self.resume)
+            self.mark_rendered('docx')
+        if self.rendered.get('latex') != self._artifact_key('latex'):
+            changed['pdf_future'] = self._schedule_final_render()
+            self.mark_rendered('latex')
+        return changed
+
+    def _schedule_final_render(self):
+        """Debounced LaTeX render; a newer edit supersedes it (result None)."""
+        from modules.generator import submit_resume_pdf
+
+        with self._lock:
+            self.generation += 1
+            generation = self.generation
+        snapshot = self.resume.copy()
+        template_name = self.template_name
+        result = Future()
+
+        def forward(inner):
+            if inner.exception() is not None:
+                result.set_exception(inner.exception())
+            else:
+                result.set_result(inner.result())
+
+        def fire():
+            if generation != self.generation:
+                result.set_result(None)
+                return
+            submit_resume_pdf(snapshot, template_name=template_name).add_done_callback(forward)
+
+        timer = threading.Timer(RENDER_DEBOUNCE_SECONDS, fire)
+        timer.daemon = True
+        timer.start()
+        return result
+
+def time_edit(session, section, value):
+    """Applies an edit and returns (score, elapsed milliseconds)."""
+    start = time.perf_counter()
+    score = session.apply(section, value)
+    return score, (time.perf_counter() - start) * 1000
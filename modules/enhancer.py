@@ -1,35 +1,25 @@
-import google.generativeai as genai
-import os
 import json
-from dotenv import load_dotenv
+from modules.metrics import increment, record_llm_usage, traced
+from modules.parser import pre_extract
 from modules.prompts import get_enhancement_prompt
+from modules.routing import generate
 
-# Load environment variables
-load_dotenv()
-
-# Configure API
-api_key = os.getenv("GEMINI_API_KEY")
-if api_key:
-    genai.configure(api_key=api_key)
-
-def enhance_resume_content(original_text, job_description, missing_keywords=None):
+@traced("enhance_resume_content")
+def enhance_resume_content(original_text, job_description, missing_keywords=None, on_wait=None):
     """
     Enhances resume content using Gemini AI with intelligent keyword injection.
+    `on_wait(position, eta_seconds)` is called while the request is queued for quota.
     """
     try:
-        # Use Flash for speed/cost, fallback to Pro
-        try:
-            model = genai.GenerativeModel('gemini-flash-latest')
-        except:
-            model = genai.GenerativeModel('gemini-pro')
-        
+        # Contact details and education are read locally; only the rest goes to the model
+        known, free_text = pre_extract(original_text)
+
         # Get the centralized prompt
-        prompt = get_enhancement_prompt(original_text, job_description, missing_keywords)
-        
-        response = model.generate_content(
-            prompt,
-            generation_config={'response_mime_type': 'application/json'}
-        )
+        prompt = get_enhancement_prompt(free_text, job_description, missing_keywords, known_fields=known)
+
+        # The model and timeout are picked per call from the prompt size (see modules.routing)
+        response = generate('enhance', prompt, {'response_mime_type': 'application/json'}, on_wait=on_wait)
+        record_llm_usage('enhance', response)
         
         text = response.text
         # Clean up if the model adds markdown code blocks (even with mime type it sometimes happens)
@@ -41,6 +31,8 @@ def enhance_resume_content(original_text, job_description, missing_keywords=None
             clean_text = clean_text[:clean_text.rfind("}")+1]
             
         data = json.loads(clean_text)
+        # Values read from the resume win; an empty one never wipes the model's answer
+        data.update({field: value for field, value in known.items() if value or not data.get(field)})
         
         # Ensure default fields exist
         data.setdefault('keywords_added', [])
@@ -49,11 +41,13 @@ def enhance_resume_content(original_text, job_description, missing_keywords=None
         return data
         
     except json.JSONDecodeError as e:
+        increment('resume_llm_errors_total', task='enhance')
         return {
             "error": f"Failed to parse AI response as JSON: {str(e)}", 
             "raw": response.text if 'response' in locals() else "No response"
         }
     except Exception as e:
+        increment('resume_llm_errors_total', task='enhance')
         return {
             "error": f"Enhancement failed: {str(e)}", 
             "raw": str(e)
@@ -1,58 +1,99 @@
+import copy
+import functools
+import hashlib
+import io
+import json
 import os
+import shutil
 import subprocess
+import threading
 import jinja2
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from docx import Document as DocxDocument
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
+from modules.cache import fetch, make_key, store
+from modules.converter import SECTION_ORDER
+from modules.document import ResumeDocument
+from modules.metrics import bind_context, increment, record_cache, traced
+from modules.singleflight import SingleFlight
+
+# Background pool for final LaTeX renders (drafts are served meanwhile)
+_RENDER_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="latex-render")
+# Identical renders that are already running are joined instead of repeated
+_RENDER_FLIGHTS = SingleFlight(_RENDER_POOL, 'latex')
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "templates")
+# Compiled template bytecode is kept on disk so every worker process can reuse it
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join("output", ".jinja_cache"))
+
+_LATEX_ESCAPES = str.maketrans({
+    '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_',
+    '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}', '^': r'\^{}',
+    '\\': r'\textbackslash{}', '<': r'\textless{}', '>': r'\textgreater{}',
+})
 
 def escape_latex(text):
     """Escapes strings for LaTeX safety."""
     if not isinstance(text, str):
         return text
-    chars = {
-        '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_',
-        '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}', '^': r'\^{}',
-        '\\': r'\textbackslash{}', '<': r'\textless{}', '>': r'\textgreater{}',
-        "'": r"'", 
-    }
-    return "".join(chars.get(c, c) for c in text)
-
-def generate_resume_pdf(data, template_name="modern", output_dir="output"):
-    """Generates PDF from LaTeX template."""
-    
-    # Setup Jinja2 for LaTeX
-    template_loader = jinja2.FileSystemLoader(searchpath="./assets/templates")
-    latex_jinja_env = jinja2.Environment(
-        loader=template_loader,
+    return text.translate(_LATEX_ESCAPES)
+
+def _create_latex_env():
+    """Builds the Jinja2 environment with LaTeX-friendly delimiters."""
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(searchpath=TEMPLATE_DIR),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(JINJA_CACHE_DIR),
         block_start_string='\\BLOCK{', block_end_string='}',
         variable_start_string='\\VAR{', variable_end_string='}',
         comment_start_string='\\#{', comment_end_string='}',
         line_statement_prefix='%%', line_comment_prefix='%#',
         trim_blocks=True, autoescape=False,
     )
-    
+
+# Created once per process; templates are compiled on first load and cached
+LATEX_ENV = _create_latex_env()
+
+def precompile_templates():
+    """Loads every LaTeX template so the first render doesn't pay for compilation."""
+    return [LATEX_ENV.get_template(name) for name in LATEX_ENV.list_templates(extensions=["tex"])]
+
+precompile_templates()
+
+def get_latex_template(template_name):
+    """Returns a compiled template, falling back to the modern layout."""
     try:
-        template = latex_jinja_env.get_template(f"{template_name}.tex")
+        return LATEX_ENV.get_template(f"{template_name}.tex")
     except jinja2.TemplateNotFound:
-        template = latex_jinja_env.get_template('modern.tex')
+        return LATEX_ENV.get_template('modern.tex')
 
-    # Data Cleaning & Preparation
-    clean_data = {}
-    
-    def clean_structure(item):
-        if isinstance(item, list):
-            return [clean_structure(i) for i in item]
-        elif isinstance(item, dict):
-            return {k: clean_structure(v) for k, v in item.items()}
-        elif isinstance(item, str):
-            return escape_latex(item)
-        return item
+def clean_structure(item):
+    """Returns a LaTeX-escaped copy of nested resume data."""
+    if isinstance(item, list):
+        return [clean_structure(i) for i in item]
+    elif isinstance(item, dict):
+        return {k: clean_structure(v) for k, v in item.items()}
+    elif isinstance(item, str):
+        return item.translate(_LATEX_ESCAPES)
+    return item
+
+@traced("render_resume_tex")
+def render_resume_tex(data, template_name="modern"):
+    """Renders the resume data into LaTeX source."""
+    template = get_latex_template(template_name)
+
+    # Validated documents carry a cached, already normalized escaped view
+    if isinstance(data, ResumeDocument):
+        return template.render(**data.latex, today=date.today().strftime("%B %Y"))
 
+    # Data Cleaning & Preparation
     clean_data = clean_structure(data)
-    
+
     # Ensure skills format
     if 'skills' in clean_data:
         # Handle various formats AI might have returned
@@ -63,13 +104,14 @@ def generate_resume_pdf(data, template_name="modern", output_dir="output"):
             cleaned_skills.append(s)
         clean_data['skills'] = cleaned_skills
 
-    # Render LaTeX
-    rendered_tex = template.render(**clean_data, today=date.today().strftime("%B %Y"))
+    return template.render(**clean_data, today=date.today().strftime("%B %Y"))
 
+def compile_latex(rendered_tex, output_dir="output", job_name="resume"):
+    """Writes `<job_name>.tex` and compiles it with pdflatex, returning the PDF path."""
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         
-    tex_path = os.path.join(output_dir, "resume.tex")
+    tex_path = os.path.join(output_dir, f"{job_name}.tex")
     with open(tex_path, "w", encoding='utf-8') as f:
         f.write(rendered_tex)
 
@@ -88,16 +130,219 @@ def generate_resume_pdf(data, template_name="modern", output_dir="output"):
             # Only show first few lines of error to avoid overwhelming user
             if result.stdout:
                 error_msg += f"\nLast log: {result.stdout[-200:]}"
+            increment('resume_pdflatex_runs_total', result='failed')
             raise Exception(error_msg)
             
-        pdf_path = os.path.join(output_dir, "resume.pdf")
+        increment('resume_pdflatex_runs_total', result='ok')
+        pdf_path = os.path.join(output_dir, f"{job_name}.pdf")
         return pdf_path
         
     except FileNotFoundError:
+        increment('resume_pdflatex_runs_total', result='missing')
         raise Exception("System Error: 'pdflatex' not found. Please install a LaTeX distribution (TeX Live/MiKTeX).")
     except subprocess.TimeoutExpired:
+        increment('resume_pdflatex_runs_total', result='timeout')
         raise Exception("Timeout: PDF generation took too long.")
 
+# ─── ARTIFACT CACHE ────────────────────────────────────────────
+# Rendered files are stored in the shared cache by content, so any replica can
+# serve a PDF/DOCX that one of them has already built.
+
+@functools.lru_cache(maxsize=None)
+def _template_digest(template_name):
+    """Hash of the template source, so edited templates never serve stale PDFs."""
+    with open(get_latex_template(template_name).filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _artifact_key(kind, data, *parts):
+    if isinstance(data, ResumeDocument):
+        content = data.fingerprint
+    else:
+        content = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return make_key('artifact', kind, content, *parts)
+
+def _write_artifact(output_dir, filename, content):
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, filename)
+    # Written aside and swapped in, so a concurrent reader never sees half a file
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return path
+
+# ─── PER-DOCUMENT OUTPUT ───────────────────────────────────────
+# App sessions render into one directory per document (like the multi-JD
+# variant dirs), so two sessions never overwrite or serve each other's files.
+
+RENDER_DIR = os.getenv("RENDER_DIR", os.path.join("output", "renders"))
+RENDER_KEEP = int(os.getenv("RENDER_KEEP", "200"))
+
+def _prune_render_dirs():
+    """Drops the least recently used document dirs beyond RENDER_KEEP."""
+    try:
+        entries = [e for e in os.scandir(RENDER_DIR) if e.is_dir()]
+    except OSError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[RENDER_KEEP:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+def document_dir(data, template_name=None):
+    """Returns `RENDER_DIR/<fingerprint>[-<template>]` for a resume, creating it."""
+    name = ResumeDocument.from_dict(data).fingerprint[:16]
+    if template_name:
+        name = f"{name}-{template_name}"
+    path = os.path.join(RENDER_DIR, name)
+    if os.path.isdir(path):
+        os.utime(path)
+    else:
+        os.makedirs(path, exist_ok=True)
+        _prune_render_dirs()
+    return path
+
+@traced("generate_resume_pdf")
+def generate_resume_pdf(data, template_name="modern", output_dir=None):
+    """Generates PDF from LaTeX template (into the document's own dir by default)."""
+    if output_dir is None:
+        output_dir = document_dir(data, template_name)
+    # The templates print the current month, so it is part of the content
+    key = _artifact_key('pdf', data, _template_digest(template_name), date.today().strftime("%B %Y"))
+    cached = fetch(key, 'artifact_pdf')
+    if cached is not None:
+        return _write_artifact(output_dir, "resume.pdf", cached)
+
+    rendered_tex = render_resume_tex(data, template_name)
+    pdf_path = compile_latex(rendered_tex, output_dir, "resume")
+    with open(pdf_path, "rb") as f:
+        store(key, f.read())
+    return pdf_path
+
+def submit_resume_pdf(data, template_name="modern", output_dir=None):
+    """
+    Queues the LaTeX render in the background and returns a Future of the PDF path.
+    A render of the same content, template and output directory that is still
+    in flight is shared rather than compiled twice.
+    """
+    # A snapshot, so the key and the rendered content agree even if the caller
+    # keeps editing its document while the render waits for a worker
+    document = ResumeDocument.from_dict(data).copy()
+    if output_dir is None:
+        output_dir = document_dir(document, template_name)
+    key = (document.fingerprint, template_name, os.path.abspath(output_dir))
+    return _RENDER_FLIGHTS.submit(key, bind_context(generate_resume_pdf), document, template_name, output_dir)
+
+# ─── CHAT TRANSCRIPT EXPORT ────────────────────────────────────
+# Each message is turned into its TeX fragment once and cached, so a longer
+# transcript only renders the messages that are new since the last export.
+
+_CHAT_FRAGMENTS = OrderedDict()
+_CHAT_FRAGMENTS_MAX = 2048
+_chat_fragments_lock = threading.Lock()
+
+# Typographic characters the chat template's pdflatex setup can't take as UTF-8
+_CHAT_TEXT_MAP = str.maketrans({
+    '\u2013': '--', '\u2014': '---', '\u2018': '`', '\u2019': "'", '\u201c': '``', '\u201d': "''",
+    '\u2022': r'\textbullet{}', '\u2026': r'\ldots{}', '\u00a0': '~',
+})
+
+def _message_key(msg):
+    return hashlib.sha1(f"{msg['role']}\x00{msg['content']}".encode('utf-8')).hexdigest()
+
+def _chat_fragment(msg):
+    """Renders (or fetches) the TeX block for one chat message."""
+    key = _message_key(msg)
+    with _chat_fragments_lock:
+        fragment = _CHAT_FRAGMENTS.get(key)
+        if fragment is not None:
+            _CHAT_FRAGMENTS.move_to_end(key)
+    record_cache('chat_fragment', fragment is not None)
+    if fragment is not None:
+        return fragment
+
+    content = escape_latex(str(msg['content'])).translate(_CHAT_TEXT_MAP)
+    # Emoji and other symbols outside Latin-1 have no glyphs in the default fonts
+    content = "".join(c for c in content if ord(c) < 0x250)
+    fragment = LATEX_ENV.get_template('chat_message.tex').render(role=msg['role'], content=content)
+
+    with _chat_fragments_lock:
+        _CHAT_FRAGMENTS[key] = fragment
+        if len(_CHAT_FRAGMENTS) > _CHAT_FRAGMENTS_MAX:
+            _CHAT_FRAGMENTS.popitem(last=False)
+    return fragment
+
+# Transcripts get their own dir; only the newest CHAT_KEEP are kept
+CHAT_DIR = os.getenv("CHAT_DIR", os.path.join("output", "chat"))
+CHAT_KEEP = int(os.getenv("CHAT_KEEP", "100"))
+
+def _prune_chat_pdfs(output_dir):
+    """Removes every file (.tex/.pdf/.log/.aux) of the oldest transcripts beyond CHAT_KEEP."""
+    try:
+        entries = [e for e in os.scandir(output_dir) if e.name.startswith("chat_")]
+    except OSError:
+        return
+    jobs = {}
+    for entry in entries:
+        job_name = entry.name.split(".", 1)[0]
+        try:
+            jobs[job_name] = max(jobs.get(job_name, 0), entry.stat().st_mtime)
+        except OSError:
+            continue
+    for job_name in sorted(jobs, key=jobs.get, reverse=True)[CHAT_KEEP:]:
+        for entry in entries:
+            if entry.name.split(".", 1)[0] == job_name:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+@traced("generate_chat_pdf")
+def generate_chat_pdf(history, output_dir=None):
+    """
+    Compiles the chat transcript to PDF and returns the path; raises when
+    pdflatex fails. Transcripts are content-addressed, so an unchanged chat is
+    never recompiled. A new message still recompiles the whole transcript:
+    only the LaTeX fragments of earlier messages are reused.
+    """
+    if output_dir is None:
+        output_dir = CHAT_DIR
+    messages = [m for m in history if m.get('content')]
+    digest = hashlib.sha1("".join(_message_key(m) for m in messages).encode('utf-8')).hexdigest()[:16]
+    job_name = f"chat_{digest}"
+    pdf_path = os.path.join(output_dir, f"{job_name}.pdf")
+    cached = os.path.exists(pdf_path)
+    record_cache('chat_pdf', cached)
+    if cached:
+        os.utime(pdf_path)
+        return pdf_path
+
+    fragments = [_chat_fragment(m) for m in messages]
+    rendered_tex = LATEX_ENV.get_template('chat.tex').render(
+        fragments=fragments, today=date.today().strftime("%B %d, %Y"))
+    pdf_path = compile_latex(rendered_tex, output_dir, job_name)
+    _prune_chat_pdfs(output_dir)
+    return pdf_path
+
+def submit_chat_pdf(history, output_dir=None):
+    """Queues the transcript PDF in the background and returns a Future of its path."""
+    return _RENDER_POOL.submit(bind_context(generate_chat_pdf), [dict(m) for m in history], output_dir)
+
+def export_chat_markdown(history):
+    """Transcript as Markdown; needs no LaTeX."""
+    lines = ["# AI Career Coach - Conversation History", f"_{date.today().strftime('%B %d, %Y')}_", ""]
+    for msg in history:
+        speaker = "You" if msg['role'] == 'user' else "AI Coach"
+        lines += [f"### {speaker}", "", str(msg['content']), ""]
+    return "\n".join(lines)
+
+def export_chat_json(history):
+    """Transcript as JSON; needs no LaTeX."""
+    return json.dumps(
+        {"exported": date.today().isoformat(), "messages": [{"role": m['role'], "content": m['content']} for m in history]},
+        ensure_ascii=False, indent=2,
+    )
+
 def add_bottom_border(paragraph):
     """Helper to add bottom border to Word headings."""
     p = paragraph._p
@@ -111,30 +356,134 @@ def add_bottom_border(paragraph):
     pBdr.append(bottom)
     pPr.append(pBdr)
 
-def generate_resume_docx(data, output_dir="output"):
-    """Generates a professional Word document."""
+# ─── DOCX ENGINE ───────────────────────────────────────────────
+# The styled base document and one prototype of every repeated block are
+# built once with python-docx. Each render deep-copies the base and clones
+# the prototype XML, only swapping in the text.
+
+def _entry_table(doc, left_runs, right_run, right_italic=True):
+    """Two-column entry header: bold/italic runs left, detail right-aligned."""
+    table = doc.add_table(rows=1, cols=2)
+    table.autofit = False
+
+    c1 = table.cell(0, 0)
+    c1.width = Inches(5.5)
+    p1 = c1.paragraphs[0]
+    for text, bold, italic in left_runs:
+        run = p1.add_run(text)
+        run.bold, run.italic = bold, italic
+
+    c2 = table.cell(0, 1)
+    c2.width = Inches(2.0)
+    p2 = c2.paragraphs[0]
+    p2.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    p2.add_run(right_run).italic = right_italic
+    return table._tbl
+
+def _build_docx_base():
+    """Builds the styled base document and the prototype XML fragments."""
     doc = DocxDocument()
-    
+
     # Setup Page
     section = doc.sections[0]
     section.top_margin = Inches(0.5)
     section.bottom_margin = Inches(0.5)
     section.left_margin = Inches(0.5)
     section.right_margin = Inches(0.5)
-    
+
     style = doc.styles['Normal']
     font = style.font
     font.name = 'Times New Roman'
     font.size = Pt(11)
-    
+
+    protos = {}
+
     # Header
     name_para = doc.add_paragraph()
     name_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    name_run = name_para.add_run(data.get('name', 'Name'))
+    name_run = name_para.add_run('Name')
     name_run.bold = True
     name_run.font.size = Pt(24)
     name_run.font.name = 'Times New Roman'
-    
+    protos['name'] = name_para._p
+
+    contact_para = doc.add_paragraph('Contact')
+    contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    contact_para.paragraph_format.space_after = Pt(10)
+    protos['contact'] = contact_para._p
+
+    heading = doc.add_heading('SECTION', level=1)
+    run = heading.runs[0]
+    run.font.name = 'Times New Roman'
+    run.font.size = Pt(12)
+    run.font.color.rgb = RGBColor(0, 0, 0)
+    add_bottom_border(heading)
+    heading.paragraph_format.space_before = Pt(12)
+    heading.paragraph_format.space_after = Pt(6)
+    protos['heading'] = heading._p
+
+    protos['text'] = doc.add_paragraph('Text')._p
+
+    bullet = doc.add_paragraph('Bullet', style='List Bullet')
+    bullet.paragraph_format.space_after = Pt(0)
+    protos['bullet'] = bullet._p
+
+    proj_bullet = doc.add_paragraph('Description', style='List Bullet')
+    proj_bullet.paragraph_format.space_after = Pt(2)
+    protos['project_bullet'] = proj_bullet._p
+
+    protos['job'] = _entry_table(doc, [('Role', True, None), (' | Company', None, True)], 'Dates')
+    protos['project'] = _entry_table(doc, [('Project', True, None)], 'Link')
+    protos['school'] = _entry_table(doc, [('School', True, None)], 'Year', right_italic=None)
+
+    degree = doc.add_paragraph()
+    degree.add_run('Degree').italic = True
+    degree.add_run(' | GPA: 0')
+    degree.paragraph_format.space_after = Pt(6)
+    protos['degree'] = degree._p
+
+    skill = doc.add_paragraph()
+    skill.paragraph_format.space_after = Pt(0)
+    skill.add_run('Category: ').bold = True
+    skill.add_run('Items')
+    protos['skill'] = skill._p
+
+    # Detach the prototypes so the base body is empty apart from sectPr
+    for element in protos.values():
+        element.getparent().remove(element)
+    return doc, protos
+
+_DOCX_BASE = None
+
+def _get_docx_base():
+    """Loads the base document and prototypes once per process."""
+    global _DOCX_BASE
+    if _DOCX_BASE is None:
+        _DOCX_BASE = _build_docx_base()
+    return _DOCX_BASE
+
+def _clone(proto, *texts):
+    """Copies a prototype and fills its runs in order. A None text drops the run."""
+    element = copy.deepcopy(proto)
+    for t, text in zip(element.iter(qn('w:t')), texts):
+        if text is None:
+            run = t.getparent()
+            run.getparent().remove(run)
+        else:
+            t.text = str(text)
+            t.set('{http://www.w3.org/XML/1998/namespace}space', 'preserve')
+    return element
+
+@traced("build_resume_docx")
+def build_resume_docx(data):
+    """Generates a professional Word document and returns it as an in-memory BytesIO."""
+    base, protos = _get_docx_base()
+    doc = copy.deepcopy(base)
+    sect_pr = doc.element.body[-1]
+    add = sect_pr.addprevious
+
+    add(_clone(protos['name'], data.get('name', 'Name')))
+
     # Contact Info
     contact_parts = []
     for field in ['email', 'phone', 'linkedin', 'github', 'website']:
@@ -143,107 +492,278 @@ def generate_resume_docx(data, output_dir="output"):
             if field == 'linkedin' and 'linkedin' not in val.lower(): val = f"LinkedIn: {val}"
             if field == 'github' and 'github' not in val.lower(): val = f"GitHub: {val}"
             contact_parts.append(val)
-    
+
     if contact_parts:
-        contact_para = doc.add_paragraph(" | ".join(contact_parts))
-        contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        contact_para.paragraph_format.space_after = Pt(10)
-
-    def add_section(title):
-        p = doc.add_heading(title.upper(), level=1)
-        run = p.runs[0]
-        run.font.name = 'Times New Roman'
-        run.font.size = Pt(12)
-        run.font.color.rgb = RGBColor(0, 0, 0)
-        add_bottom_border(p)
-        p.paragraph_format.space_before = Pt(12)
-        p.paragraph_format.space_after = Pt(6)
+        add(_clone(protos['contact'], " | ".join(contact_parts)))
 
     # Summary
     if data.get('summary'):
-        add_section('Professional Summary')
-        doc.add_paragraph(data.get('summary'))
+        add(_clone(protos['heading'], 'PROFESSIONAL SUMMARY'))
+        add(_clone(protos['text'], data.get('summary')))
 
     # Experience
     if data.get('experience'):
-        add_section('Experience')
+        add(_clone(protos['heading'], 'EXPERIENCE'))
         for job in data.get('experience', []):
-            table = doc.add_table(rows=1, cols=2)
-            table.autofit = False
-            
-            c1 = table.cell(0, 0)
-            c1.width = Inches(5.5)
-            p1 = c1.paragraphs[0]
-            p1.add_run(f"{job.get('title', 'Role')}").bold = True
-            p1.add_run(f" | {job.get('company', 'Company')}").italic = True
-            
-            c2 = table.cell(0, 1)
-            c2.width = Inches(2.0)
-            p2 = c2.paragraphs[0]
-            p2.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            p2.add_run(job.get('dates', '')).italic = True
-            
+            add(_clone(protos['job'], job.get('title', 'Role'), f" | {job.get('company', 'Company')}", job.get('dates', '')))
             for bullet in job.get('bullets', []):
-                doc.add_paragraph(bullet, style='List Bullet').paragraph_format.space_after = Pt(0)
+                add(_clone(protos['bullet'], bullet))
 
     # Projects
     if data.get('projects'):
-        add_section('Projects')
+        add(_clone(protos['heading'], 'PROJECTS'))
         for proj in data.get('projects', []):
-            table = doc.add_table(rows=1, cols=2)
-            table.autofit = False
-            
-            c1 = table.cell(0, 0)
-            c1.width = Inches(5.5)
-            p1 = c1.paragraphs[0]
-            p1.add_run(proj.get('name', 'Project')).bold = True
-            
-            c2 = table.cell(0, 1)
-            c2.width = Inches(2.0)
-            p2 = c2.paragraphs[0]
-            p2.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            if proj.get('link'):
-                p2.add_run(proj.get('link')).italic = True
-
+            add(_clone(protos['project'], proj.get('name', 'Project'), proj.get('link') or None))
             if proj.get('description'):
-                doc.add_paragraph(proj.get('description'), style='List Bullet').paragraph_format.space_after = Pt(2)
+                add(_clone(protos['project_bullet'], proj.get('description')))
 
     # Education
     if data.get('education'):
-        add_section('Education')
+        add(_clone(protos['heading'], 'EDUCATION'))
         for edu in data.get('education', []):
-            table = doc.add_table(rows=1, cols=2)
-            c1 = table.cell(0,0)
-            c1.width = Inches(5.5)
-            c1.paragraphs[0].add_run(edu.get('school', '')).bold = True
-            
-            c2 = table.cell(0,1)
-            c2.width = Inches(2.0)
-            c2.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            c2.paragraphs[0].add_run(edu.get('year', ''))
-            
-            p = doc.add_paragraph()
-            p.add_run(edu.get('degree', '')).italic = True
-            if edu.get('gpa'):
-                p.add_run(f" | GPA: {edu.get('gpa')}")
-            p.paragraph_format.space_after = Pt(6)
+            add(_clone(protos['school'], edu.get('school', ''), edu.get('year', '')))
+            gpa = f" | GPA: {edu.get('gpa')}" if edu.get('gpa') else None
+            add(_clone(protos['degree'], edu.get('degree', ''), gpa))
 
     # Skills
     if data.get('skills'):
-        add_section('Technical Skills')
+        add(_clone(protos['heading'], 'TECHNICAL SKILLS'))
         for skill in data.get('skills', []):
-            p = doc.add_paragraph()
-            p.paragraph_format.space_after = Pt(0)
-            p.add_run(f"{skill.get('category')}: ").bold = True
-            
             items = skill.get('items')
             if isinstance(items, list):
                 items = ", ".join(items)
-            p.add_run(str(items))
+            add(_clone(protos['skill'], f"{skill.get('category')}: ", str(items)))
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    docx_path = os.path.join(output_dir, "Optimized_Resume.docx")
-    doc.save(docx_path)
-    return docx_path
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+@traced("generate_resume_docx")
+def generate_resume_docx(data, output_dir=None):
+    """Writes the Word document to disk and returns its path."""
+    if output_dir is None:
+        output_dir = document_dir(data)
+    key = _artifact_key('docx', data)
+    content = fetch(key, 'artifact_docx')
+    if content is None:
+        content = build_resume_docx(data).getvalue()
+        store(key, content)
+    return _write_artifact(output_dir, "Optimized_Resume.docx", content)
+
+# ─── DRAFT PDF ENGINE ──────────────────────────────────────────
+# Writes a plain PDF straight from the resume data using the base-14
+# Helvetica fonts, so previews don't have to wait for pdflatex.
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter, in points
+DRAFT_MARGIN = 50
+
+# Helvetica advance widths (1/1000 em) for printable ASCII, from the Adobe AFM
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_DRAFT_FONTS = {'regular': 'F1', 'bold': 'F2', 'italic': 'F3'}
+
+def _text_width(text, size, font='regular'):
+    """Approximate rendered width of text in points."""
+    units = 0
+    for c in text:
+        code = ord(c)
+        units += _HELVETICA_WIDTHS[code - 32] if 32 <= code < 127 else 556
+    # Bold faces run roughly 5% wider than the regular metrics
+    if font == 'bold':
+        units *= 1.05
+    return units * size / 1000
+
+def _wrap_text(text, size, width, font='regular', first_width=None):
+    """Greedy word wrap. `first_width` allows a shorter first line."""
+    lines, current = [], ""
+    limit = first_width if first_width is not None else width
+    for word in str(text).split():
+        candidate = f"{current} {word}" if current else word
+        if current and _text_width(candidate, size, font) > limit:
+            lines.append(current)
+            current, limit = word, width
+        else:
+            current = candidate
+    lines.append(current)
+    return lines
+
+def _pdf_string(text):
+    """Encodes text as a PDF literal string (WinAnsi)."""
+    raw = str(text).encode('cp1252', 'replace')
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+class _DraftCanvas:
+    """Collects text operations page by page with a top-down cursor."""
+
+    def __init__(self):
+        self.pages = []
+        self.new_page()
+
+    def new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+        self.y = PAGE_HEIGHT - DRAFT_MARGIN
+
+    def advance(self, height):
+        if self.y - height < DRAFT_MARGIN:
+            self.new_page()
+        self.y -= height
+
+    def text(self, x, text, size, font='regular'):
+        self.ops.append(b"BT /%s %.1f Tf %.2f %.2f Td %s Tj ET" % (
+            _DRAFT_FONTS[font].encode(), size, x, self.y, _pdf_string(text)))
+
+    def text_right(self, text, size, font='regular'):
+        self.text(PAGE_WIDTH - DRAFT_MARGIN - _text_width(text, size, font), text, size, font)
+
+    def text_center(self, text, size, font='regular'):
+        self.text((PAGE_WIDTH - _text_width(text, size, font)) / 2, text, size, font)
+
+    def rule(self):
+        self.ops.append(b"0.5 w %d %.2f m %d %.2f l S" % (
+            DRAFT_MARGIN, self.y - 3, PAGE_WIDTH - DRAFT_MARGIN, self.y - 3))
+
+    def paragraph(self, text, size=10, font='regular', indent=0, bullet=None):
+        x = DRAFT_MARGIN + indent
+        width = PAGE_WIDTH - DRAFT_MARGIN - x
+        for i, line in enumerate(_wrap_text(text, size, width, font)):
+            self.advance(size * 1.35)
+            if bullet and i == 0:
+                self.text(x - 10, bullet, size, font)
+            self.text(x, line, size, font)
+
+    def to_pdf(self):
+        """Serializes the pages into a complete PDF document."""
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            None,  # page tree, filled in once the page ids are known
+        ]
+        font_ids = {}
+        for name, base in (('F1', 'Helvetica'), ('F2', 'Helvetica-Bold'), ('F3', 'Helvetica-Oblique')):
+            objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode())
+            font_ids[name] = len(objects)
+        resources = b"<< /Font << %s >> >>" % b" ".join(
+            b"/%s %d 0 R" % (name.encode(), oid) for name, oid in font_ids.items())
+
+        page_ids = []
+        for ops in self.pages:
+            stream = b"\n".join(ops)
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+            objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>" % (
+                PAGE_WIDTH, PAGE_HEIGHT, resources, len(objects)))
+            page_ids.append(len(objects))
+        objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % pid for pid in page_ids), len(page_ids))
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for num, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+        xref_at = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+        return bytes(out)
+
+def _draft_heading(canvas, title):
+    canvas.advance(22)
+    canvas.text(DRAFT_MARGIN, title.upper(), 11.5, 'bold')
+    canvas.rule()
+    canvas.advance(4)
+
+def _draft_entry(canvas, left, right, left_font='bold'):
+    """Entry header line with an optional right-aligned detail (dates, links)."""
+    canvas.advance(15)
+    canvas.text(DRAFT_MARGIN, left, 10.5, left_font)
+    if right:
+        canvas.text_right(right, 9.5, 'italic')
+
+def _draft_summary(canvas, data):
+    _draft_heading(canvas, 'Professional Summary')
+    canvas.paragraph(data['summary'])
+
+def _draft_experience(canvas, data):
+    _draft_heading(canvas, 'Experience')
+    for job in data['experience']:
+        title = job.get('title', 'Role')
+        if job.get('company'):
+            title = f"{title} | {job['company']}"
+        _draft_entry(canvas, title, job.get('dates', ''))
+        for bullet in job.get('bullets') or []:
+            canvas.paragraph(bullet, indent=14, bullet="\u2022")
+
+def _draft_projects(canvas, data):
+    _draft_heading(canvas, 'Projects')
+    for proj in data['projects']:
+        _draft_entry(canvas, proj.get('name', 'Project'), proj.get('link', ''))
+        if proj.get('description'):
+            canvas.paragraph(proj['description'], indent=14, bullet="\u2022")
+
+def _draft_education(canvas, data):
+    _draft_heading(canvas, 'Education')
+    for edu in data['education']:
+        _draft_entry(canvas, edu.get('school', ''), edu.get('year', ''))
+        degree = edu.get('degree', '')
+        if edu.get('gpa'):
+            degree = f"{degree} | GPA: {edu['gpa']}"
+        canvas.paragraph(degree, font='italic')
+
+def _draft_skills(canvas, data):
+    _draft_heading(canvas, 'Technical Skills')
+    width = PAGE_WIDTH - 2 * DRAFT_MARGIN
+    for skill in data['skills']:
+        label = f"{skill.get('category', '')}: "
+        items = skill.get('items', '')
+        if isinstance(items, list):
+            items = ", ".join(items)
+        label_width = _text_width(label, 10, 'bold')
+        lines = _wrap_text(items, 10, width, first_width=width - label_width)
+        canvas.advance(13.5)
+        canvas.text(DRAFT_MARGIN, label, 10, 'bold')
+        canvas.text(DRAFT_MARGIN + label_width, lines[0], 10)
+        for line in lines[1:]:
+            canvas.advance(13.5)
+            canvas.text(DRAFT_MARGIN, line, 10)
+
+_DRAFT_SECTIONS = {
+    'summary': _draft_summary,
+    'experience': _draft_experience,
+    'projects': _draft_projects,
+    'education': _draft_education,
+    'skills': _draft_skills,
+}
+
+def render_draft_pdf(data):
+    """Renders the resume as PDF bytes without any external tools."""
+    canvas = _DraftCanvas()
+
+    canvas.advance(22)
+    canvas.text_center(data.get('name', 'Name'), 20, 'bold')
+
+    contact = " | ".join(data[f] for f in ['email', 'phone', 'linkedin', 'github', 'website'] if data.get(f))
+    if contact:
+        for line in _wrap_text(contact, 9.5, PAGE_WIDTH - 2 * DRAFT_MARGIN):
+            canvas.advance(14)
+            canvas.text_center(line, 9.5)
+
+    for section in SECTION_ORDER:
+        if data.get(section):
+            _DRAFT_SECTIONS[section](canvas, data)
+
+    return canvas.to_pdf()
+
+@traced("generate_draft_pdf")
+def generate_draft_pdf(data, output_dir=None):
+    """Writes a fast draft PDF (no LaTeX) and returns its path."""
+    if output_dir is None:
+        output_dir = document_dir(data)
+    return _write_artifact(output_dir, "resume_draft.pdf", render_draft_pdf(data))
@@ -0,0 +1,125 @@
+"""
+Local answer engine for the Career Coach.
+Common questions about the optimization run are answered straight from the
+pipeline results in session state; everything else falls through to Gemini.
+"""
+import re
+import threading
+from collections import Counter
+
+# Checked in order; the first pattern that matches wins
+INTENT_PATTERNS = [
+    ('keywords_skipped', re.compile(r"\b(skip|skipped|skipping|left out|leave out|not add|didn'?t add|did not add|why not)\b.*\b(keywords?|skills?|terms?)\b|\b(keywords?|skills?)\b.*\b(skipped|left out)\b")),
+    ('keywords_added', re.compile(r"\b(what|which)\b.*\b(did you|you|were|was|have you)\b.*\b(add|added|include|included|inject|injected|integrate|integrated|insert|inserted)\b")),
+    ('missing_keywords', re.compile(r"\b(missing|lack|lacking|absent|don'?t have|do not have)\b.*\b(keywords?|skills?|terms?)\b|\b(keywords?|skills?|terms?)\b.*\b(missing|lacking|absent)\b")),
+    ('score', re.compile(r"\b(why|what|explain|how (was|is|did))\b.*\b(score|ats)\b")),
+]
+
+# Questions about improving things are open-ended advice, not lookups
+_OPEN_ENDED = re.compile(r"\b(improve|increase|boost|raise|better|rewrite|fix|suggest|tips?|advice)\b")
+
+_stats_lock = threading.Lock()
+_stats = Counter()
+
+def match_intent(query):
+    """Returns the intent name for a question, or None for open-ended ones."""
+    text = query.lower().strip()
+    if not text or _OPEN_ENDED.search(text):
+        return None
+    for intent, pattern in INTENT_PATTERNS:
+        if pattern.search(text):
+            return intent
+    return None
+
+def _format_list(items, limit=15):
+    shown = ", ".join(f"**{k}**" for k in items[:limit])
+    if len(items) > limit:
+        shown += f" and {len(items) - limit} more"
+    return shown
+
+def _keyword_name(item):
+    return item.get('keyword', '') if isinstance(item, dict) else str(item)
+
+def _answer_missing(state):
+    missing = state.get('missing_keywords')
+    if missing is None:
+        return None
+    added = {k.lower() for k in state.get('keywords_added') or []}
+    remaining = sorted(k for k in missing if k.lower() not in added)
+    if not remaining:
+        return "Great news — every keyword from the job description is now covered by your resume."
+    return (f"Your resume is still missing {len(remaining)} keyword(s) from the job description: "
+            f"{_format_list(remaining)}.\n\nOnly add the ones that truthfully reflect your experience.")
+
+def _answer_added(state):
+    added = state.get('keywords_added')
+    if added is None:
+        return None
+    if not added:
+        return "No new keywords were added during optimization — the rewrite focused on phrasing and impact."
+    return f"During optimization I integrated {len(added)} keyword(s) into your resume: {_format_list(list(added))}."
+
+def _answer_skipped(state):
+    skipped = state.get('keywords_skipped')
+    if skipped is None:
+        return None
+    if not skipped:
+        return "No keywords were skipped — every suggested keyword that fit your experience was used."
+    lines = [f"I skipped {len(skipped)} keyword(s) because they didn't fit your experience truthfully:"]
+    for item in skipped[:15]:
+        reason = item.get('reason') if isinstance(item, dict) else None
+        lines.append(f"- **{_keyword_name(item)}**" + (f": {reason}" if reason else ""))
+    return "\n".join(lines)
+
+def _answer_score(state):
+    before, after = state.get('ats_score_before'), state.get('ats_score_after')
+    if before is None or after is None:
+        return None
+    missing = state.get('missing_keywords') or []
+    added = state.get('keywords_added') or []
+    answer = (f"Your initial ATS score was **{before}%** and the optimized resume scores **{after}%**. "
+              "The score is the share of distinct job-description keywords that also appear in your resume.")
+    if missing:
+        answer += f"\n\nThe original resume was missing {len(missing)} of them"
+        answer += f"; {len(added)} were added during optimization." if added else "."
+    return answer
+
+_ANSWERS = {
+    'missing_keywords': _answer_missing,
+    'keywords_added': _answer_added,
+    'keywords_skipped': _answer_skipped,
+    'score': _answer_score,
+}
+
+def answer_locally(query, state):
+    """
+    Answers the query from pipeline results when it matches a known intent.
+
+    Args:
+        query (str): The user's question
+        state (Mapping): Session state holding the pipeline results
+
+    Returns:
+        str or None: The answer, or None when the LLM should handle it
+    """
+    intent = match_intent(query)
+    answer = _ANSWERS[intent](state) if intent else None
+    with _stats_lock:
+        _stats['total'] += 1
+        if answer is not None:
+            _stats[f"local:{intent}"] += 1
+    return answer
+
+def get_hit_stats():
+    """Process-wide counts of locally answered vs. LLM questions."""
+    with _stats_lock:
+        total = _stats['total']
+        by_intent = {k.split(':', 1)[1]: v for k, v in _stats.items() if k.startswith('local:')}
+    local = sum(by_intent.values())
+    return {
+        'total': total,
+        'local': local,
+        'llm': total - local,
+        'hit_rate': round(local / total, 3) if total else 0.0,
+        'by_intent': by_intent,
+    }
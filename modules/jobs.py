@@ -0,0 +1,121 @@
+"""
+Jobs Module
+Background jobs for the HTTP API. A job runs on a shared worker pool, records
+progress events (read by polling or SSE) and keeps its result for JOB_TTL_SECONDS.
+"""
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from modules.metrics import run_context
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+
+class Job:
+    """One submitted unit of work and its progress events."""
+
+    def __init__(self, kind, output_dir):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.output_dir = os.path.join(output_dir, self.id)
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.events = []
+        self._lock = threading.Lock()
+
+    def emit(self, event, **data):
+        """Appends a progress event; events are only ever appended, so readers can poll by index."""
+        with self._lock:
+            self.events.append({'event': event, 'time': round(time.time(), 3), **data})
+
+    def events_since(self, index):
+        with self._lock:
+            return self.events[index:]
+
+    @property
+    def done(self):
+        return self.status in ('done', 'failed')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created': round(self.created, 3),
+            'finished': round(self.finished, 3) if self.finished else None,
+            'error': self.error,
+            'events': len(self.events),
+        }
+
+class JobStore:
+    """In-process job registry backed by a thread pool."""
+
+    def __init__(self, output_dir, workers=JOB_WORKERS, ttl=JOB_TTL_SECONDS):
+        self.output_dir = output_dir
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-job")
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """
+        Queues fn(job, *args, **kwargs); its return value becomes job.result.
+
+        Returns:
+            Job: The queued job
+        """
+        self.prune()
+        job = Job(kind, self.output_dir)
+        with self._lock:
+            self._jobs[job.id] = job
+        job.emit('queued')
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = 'running'
+        job.emit('started')
+        # `finished` is set before the terminal status, which is what prune() keys on
+        try:
+            with run_context(job.id):
+                job.result = fn(job, *args, **kwargs)
+        except Exception as e:
+            job.error = str(e)
+            job.finished = time.time()
+            job.status = 'failed'
+            job.emit('failed', error=job.error)
+        else:
+            job.finished = time.time()
+            job.status = 'done'
+            job.emit('done')
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def prune(self):
+        """Drops finished jobs older than the TTL and stale artifact directories (e.g. from /render)."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for job in [j for j in self._jobs.values() if j.done and j.finished is not None and j.finished < cutoff]:
+                del self._jobs[job.id]
+            live = set(self._jobs)
+        try:
+            entries = os.listdir(self.output_dir)
+        except FileNotFoundError:
+            return
+        for name in entries:
+            path = os.path.join(self.output_dir, name)
+            try:
+                stale = name not in live and os.path.getmtime(path) < cutoff
+            except OSError:
+                # Removed meanwhile by a concurrent prune or job deletion
+                continue
+            if stale:
+                shutil.rmtree(path, ignore_errors=True)
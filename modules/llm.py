@@ -0,0 +1,193 @@
+"""
+LLM Client Module
+Lazy access to the Gemini SDK. `google.generativeai` drags in grpc and
+protobuf, so it is imported and configured on first use instead of at
+app startup.
+
+All Gemini calls go through the process-wide SCHEDULER, which keeps every
+session together under the requests/min and tokens/min quota and admits
+queued calls by priority (enhancement > scoring > chat).
+"""
+import itertools
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from modules.metrics import increment, observe
+
+# Load environment variables
+load_dotenv()
+
+# Provider quota shared by every session in this process
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_RPM", "60"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TPM", "1000000"))
+# Retries after a provider 429; each one pauses all callers with exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "2"))
+
+# Lower runs first
+PRIORITIES = {'enhance': 0, 'score': 1, 'chat': 2}
+
+# Expected response size per task, added to the prompt estimate before the call
+EXPECTED_OUTPUT_TOKENS = {'enhance': 2000, 'score': 100, 'chat': 500}
+
+_genai = None
+_lock = threading.Lock()
+
+def get_genai():
+    """Returns the configured `google.generativeai` module, importing it once."""
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+
+                api_key = os.getenv("GEMINI_API_KEY")
+                if api_key:
+                    genai.configure(api_key=api_key)
+                else:
+                    # Use a logger or silent fail in production, but print is fine for now
+                    print("⚠️ Warning: GEMINI_API_KEY not found.")
+                _genai = genai
+    return _genai
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+# ─── SCHEDULER ─────────────────────────────────────────────────
+class TokenBucket:
+    """Continuously refilled bucket holding up to one minute of quota."""
+
+    def __init__(self, per_minute):
+        self.capacity = max(1, per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` is available (0 when it already is)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Credits (negative) or debits (positive) a correction; may go below zero."""
+        self.level = min(self.capacity, self.level - amount)
+
+def _is_rate_limited(error):
+    return type(error).__name__ == 'ResourceExhausted' or getattr(error, 'code', None) == 429
+
+class LLMScheduler:
+    """
+    Admits LLM calls one at a time in (priority, arrival) order once both
+    token buckets allow it. A provider 429 pauses admissions for everyone
+    instead of letting each caller retry into the same wall.
+    """
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._queue)
+
+    def acquire(self, task, tokens, on_wait=None):
+        """
+        Blocks until the call may run.
+
+        Args:
+            on_wait (callable): Called as on_wait(position, eta_seconds) while queued;
+                position 0 means next in line
+        """
+        entry = (PRIORITIES.get(task, len(PRIORITIES)), next(self._seq))
+        start = time.monotonic()
+        throttled = False
+        with self._cond:
+            self._queue.append(entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    position = sum(1 for other in self._queue if other < entry)
+                    wait = max(self._paused_until - now, 0.0)
+                    if position == 0 and wait <= 0:
+                        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            break
+                    if not throttled:
+                        throttled = True
+                        increment('resume_llm_throttled_total', task=task, reason='quota')
+                    if on_wait:
+                        # UI callbacks must not hold up other callers
+                        self._cond.release()
+                        try:
+                            on_wait(position, round(wait, 1))
+                        finally:
+                            self._cond.acquire()
+                    # Woken early when the queue changes; otherwise re-check once quota has refilled
+                    self._cond.wait(timeout=min(wait, 1.0) if wait > 0 else 1.0)
+            finally:
+                self._queue.remove(entry)
+                self._cond.notify_all()
+        observe('resume_llm_queue_wait_seconds', time.monotonic() - start, task=task)
+
+    def settle(self, estimated, actual):
+        """Corrects the tokens/min bucket once the real usage is known."""
+        if actual:
+            with self._cond:
+                self.tokens.adjust(actual - estimated)
+
+    def backoff(self, seconds):
+        """Pauses all admissions, e.g. after a provider 429."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def budget(self, task, prompt_tokens):
+        """Tokens reserved for a call: the prompt plus the task's expected output."""
+        return prompt_tokens + EXPECTED_OUTPUT_TOKENS.get(task, 0)
+
+    def call(self, task, fn, prompt_tokens, on_wait=None, streamed=False):
+        """
+        Runs fn() under the quota, retrying provider 429s with a shared backoff.
+
+        Args:
+            task (str): 'enhance', 'score' or 'chat' (sets the priority)
+            prompt_tokens (int): Estimated prompt size; the expected output is added
+            streamed (bool): fn() returns a stream; its consumer settles the usage
+
+        Returns:
+            The value returned by fn()
+        """
+        estimated = self.budget(task, prompt_tokens)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            self.acquire(task, estimated, on_wait)
+            try:
+                response = fn()
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt == LLM_MAX_RETRIES:
+                    raise
+                increment('resume_llm_throttled_total', task=task, reason='provider_429')
+                self.backoff(min(LLM_BACKOFF_SECONDS * 2 ** attempt, 60))
+                continue
+            # Streamed responses only carry the full usage once consumed; the caller settles those
+            if not streamed:
+                usage = getattr(response, 'usage_metadata', None)
+                self.settle(estimated, getattr(usage, 'total_token_count', 0) if usage else 0)
+            return response
+
+SCHEDULER = LLMScheduler()
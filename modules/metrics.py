@@ -0,0 +1,225 @@
+"""
+Metrics Module
+In-process tracing and metrics for the optimization pipeline.
+
+Pipeline functions are wrapped in spans (`@traced("stage")`) that carry the
+run ID of the current optimization; span durations feed a latency histogram
+per stage. Counters cover LLM tokens, cache hits and pdflatex outcomes.
+
+Exposed in Prometheus text format on METRICS_PORT (`/metrics`), and spans are
+appended to TRACE_EXPORT_PATH as JSON lines when that is set.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+
+# Seconds; pdflatex and Gemini calls land in the upper buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_HELP = {
+    'resume_stage_duration_seconds': ('histogram', "Latency of pipeline stages."),
+    'resume_stage_errors_total': ('counter', "Pipeline stages that raised."),
+    'resume_llm_tokens_total': ('counter', "Gemini tokens by task and kind (prompt/completion)."),
+    'resume_llm_errors_total': ('counter', "Failed Gemini calls by task."),
+    'resume_llm_throttled_total': ('counter', "Gemini calls held back by reason (quota/provider_429)."),
+    'resume_llm_queue_wait_seconds': ('histogram', "Time Gemini calls spent waiting in the scheduler."),
+    'resume_llm_latency_seconds': ('histogram', "Gemini call latency by task and model (chat: until streaming starts)."),
+    'resume_llm_routed_total': ('counter', "Gemini calls by task and the model they were routed to."),
+    'resume_llm_fallbacks_total': ('counter', "Gemini calls that timed out and moved to the next model."),
+    'resume_cache_requests_total': ('counter', "Cache lookups by cache and result (hit/miss)."),
+    'resume_pdflatex_runs_total': ('counter', "pdflatex runs by result (ok/failed/timeout/missing)."),
+}
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+# (name, labels) -> [bucket counts..., +Inf count, sum]
+_histograms = {}
+
+_run_id = contextvars.ContextVar('run_id', default=None)
+_span_id = contextvars.ContextVar('span_id', default=None)
+_export_lock = threading.Lock()
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+# ─── RECORDING ─────────────────────────────────────────────────
+def increment(name, value=1, **labels):
+    """Adds `value` to a counter."""
+    with _lock:
+        _counters[(name, _labels(labels))] += value
+
+def observe(name, value, **labels):
+    """Records one histogram observation."""
+    key = (name, _labels(labels))
+    with _lock:
+        buckets = _histograms.get(key)
+        if buckets is None:
+            buckets = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                buckets[i] += 1
+        buckets[len(LATENCY_BUCKETS)] += 1
+        buckets[-1] += value
+
+def record_cache(cache, hit):
+    increment('resume_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+def record_llm_usage(task, response):
+    """Counts prompt/completion tokens from a Gemini response's usage metadata."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return
+    prompt = getattr(usage, 'prompt_token_count', 0) or 0
+    completion = getattr(usage, 'candidates_token_count', 0) or 0
+    # Part of the prompt served from a context cache (billed at the cached rate)
+    cached = getattr(usage, 'cached_content_token_count', 0) or 0
+    if prompt:
+        increment('resume_llm_tokens_total', prompt, task=task, kind='prompt')
+    if cached:
+        increment('resume_llm_tokens_total', cached, task=task, kind='cached')
+    if completion:
+        increment('resume_llm_tokens_total', completion, task=task, kind='completion')
+
+# ─── SPANS ─────────────────────────────────────────────────────
+def new_run_id():
+    return uuid.uuid4().hex[:12]
+
+def current_run_id():
+    return _run_id.get()
+
+@contextlib.contextmanager
+def run_context(run_id=None):
+    """Tags every span opened inside the block with `run_id`."""
+    token = _run_id.set(run_id or new_run_id())
+    try:
+        yield _run_id.get()
+    finally:
+        _run_id.reset(token)
+
+def _export(record):
+    try:
+        with _export_lock, open(TRACE_EXPORT_PATH, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"Span export failed: {e}")
+
+@contextlib.contextmanager
+def span(stage, **attrs):
+    """Times the block as `stage`, records it in the histogram and exports the span."""
+    span_id = uuid.uuid4().hex[:16]
+    parent_id = _span_id.get()
+    token = _span_id.set(span_id)
+    started = time.time()
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        yield
+    except Exception:
+        # Streamlit's st.stop/st.rerun are BaseExceptions and don't count as errors
+        status = 'error'
+        increment('resume_stage_errors_total', stage=stage)
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        _span_id.reset(token)
+        observe('resume_stage_duration_seconds', duration, stage=stage)
+        if TRACE_EXPORT_PATH:
+            _export({
+                'run_id': _run_id.get(), 'span_id': span_id, 'parent_id': parent_id, 'name': stage,
+                'start': round(started, 6), 'duration_ms': round(duration * 1000, 3), 'status': status,
+                'thread': threading.current_thread().name, **attrs,
+            })
+
+def traced(stage):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def bind_context(fn):
+    """Carries the caller's run ID and parent span into a pool thread."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+# ─── EXPOSITION ────────────────────────────────────────────────
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+
+    lines = []
+    for name, (kind, help_text) in _HELP.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+        for (metric, labels), buckets in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', repr(bound))])} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {buckets[len(LATENCY_BUCKETS)]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(buckets[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {buckets[len(LATENCY_BUCKETS)]}")
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would flood the server log
+
+_server = None
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serves /metrics on a side port, once per process. A port of 0 disables it."""
+    global _server
+    with _lock:
+        if _server is not None or not port:
+            return _server or None
+        try:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        except OSError as e:
+            # Don't retry on every script run
+            _server = False
+            print(f"Metrics server not started on port {port}: {e}")
+            return None
+    threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
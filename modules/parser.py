@@ -1,12 +1,262 @@
-import pdfplumber
-from docx import Document
 import re
+from modules.document import CONTACT_FIELDS
+from modules.metrics import traced
 
+# pdfplumber (pdfminer) and python-docx (lxml) are imported on first use to
+# keep them off the app's startup path
+
+# Bump when extraction output changes: it is part of the parse cache key
+PARSER_VERSION = "1"
+
+# ─── SECTIONS ──────────────────────────────────────────────────
+# Common resume headings, normalized to lowercase without punctuation
+SECTION_HEADINGS = {
+    'summary': ('summary', 'professional summary', 'profile', 'professional profile', 'about me',
+                'objective', 'career objective', 'overview'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history', 'internships', 'internship'),
+    'projects': ('projects', 'personal projects', 'academic projects', 'key projects', 'selected projects'),
+    'education': ('education', 'academic background', 'academics', 'education and training',
+                  'qualifications', 'academic qualifications'),
+    'skills': ('skills', 'technical skills', 'core competencies', 'competencies', 'key skills',
+               'technologies', 'tools and technologies', 'skills and tools'),
+    'certifications': ('certifications', 'certificates', 'licenses and certifications', 'courses', 'training'),
+    'achievements': ('achievements', 'awards', 'honors', 'honors and awards', 'accomplishments'),
+    'publications': ('publications', 'research', 'papers'),
+    'volunteering': ('volunteering', 'volunteer experience', 'leadership', 'activities',
+                     'extracurricular activities'),
+    'languages': ('languages',),
+    'links': ('extracted links',),
+}
+_HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+def heading_section(line):
+    """The section a line introduces, or None when it isn't a heading."""
+    normalized = re.sub(r"[^a-z ]", "", line.lower().replace("&", " and ")).strip()
+    normalized = re.sub(r"\s+", " ", normalized)
+    if not normalized or len(normalized) > 40:
+        return None
+    return _HEADING_LOOKUP.get(normalized)
+
+def split_sections(text):
+    """
+    Splits resume text at its section headings.
+
+    Returns:
+        list: (section, text) pairs in document order; text before the first
+        heading (name and contact details) is the 'contact' section
+    """
+    sections = [['contact', []]]
+    for line in text.splitlines():
+        section = heading_section(line)
+        if section:
+            sections.append([section, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(section, "\n".join(lines).strip()) for section, lines in sections if "\n".join(lines).strip()]
+
+# ─── PRE-EXTRACTION ────────────────────────────────────────────
+# Contact details and education entries have a fixed shape, so they are read
+# locally instead of being copied through the LLM: the enhancement prompt and
+# its response shrink, and these fields can't be hallucinated.
+
+EMAIL_PATTERN = r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"
+PHONE_PATTERN = r"\+?\(?\d[\d\s().-]{5,}\d"
+URL_PATTERN = r"(?:https?://)?(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}(?:/[^\s|,;]*)?"
+_MONTH = r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?"
+YEAR_PATTERN = rf"\b{_MONTH}\d{{4}}\b(?:\s*[-–—]\s*(?:{_MONTH}\d{{4}}\b|present|current|expected))?"
+GPA_PATTERN = r"\b(?:c?gpa|cgpa|score|grade)\s*[:\-]?\s*(\d+(?:\.\d+)?(?:\s*/\s*\d+(?:\.\d+)?)?%?)"
+DEGREE_PATTERN = (r"\b(?:(?:B\.?\s?S\.?c?|B\.?\s?A\.?|B\.?\s?E\.?|B\.?\s?Tech|B\.?\s?Com|BBA|M\.?\s?S\.?c?|M\.?\s?A\.?|"
+                  r"M\.?\s?E\.?|M\.?\s?Tech|MBA|MCA|BCA|Ph\.?\s?D)(?![A-Za-z])|"
+                  r"(?:Bachelor|Master|Doctor|Associate|Diploma|High School|Secondary|A-Level)\w*)")
+SCHOOL_PATTERN = (r"\b(?:University|College|Institute|School|Academy|Polytechnic|Tech|Universidad|"
+                  r"Universit[äéà]t?|IIT|NIT|MIT|UCLA|Caltech)\b")
+
+# Labels manual entries use in front of a contact value
+_CONTACT_LABEL = r"^\s*(?:name|e-?mail|phone|mobile|tel|linkedin|github|website|portfolio)\s*:\s*"
+
+def _url(value):
+    return re.sub(r"^(?:https?://)?(?:www\.)?", "", value).rstrip("/.")
+
+def _is_profile(url, host):
+    """A profile URL on `host` (github.com/user, linkedin.com/in/user), not a deeper link."""
+    path = _url(url).split("/")
+    if path[0] != host:
+        return False
+    return len(path) == 2 if host == 'github.com' else len(path) <= 3
+
+# A headline ("Senior Software Engineer", "Curriculum Vitae") has the shape of a name too
+_HEADLINE_WORDS = (r"\b(?:resume|r[ée]sum[ée]|curriculum|vitae|cv|profile|engineer|developer|manager|analyst|"
+                   r"designer|scientist|consultant|architect|intern|student|senior|junior|lead|head|software|data)\b")
+
+def _as_name(candidate):
+    candidate = candidate.strip()
+    if re.search(_HEADLINE_WORDS, candidate, re.IGNORECASE):
+        return None
+    if re.fullmatch(r"[^\W\d_][^\W\d_.'-]*(?:[ .'-]+[^\W\d_][^\W\d_.'-]*){1,3}\.?", candidate):
+        return candidate
+    return None
+
+def _name(lines):
+    """
+    The candidate's name, from a `Name:` label or from the first line when it
+    holds only the name or starts with it ahead of the contact details
+    ("Jane Doe | jane@example.com"). None when that is not clear-cut.
+    """
+    for line in lines:
+        labelled = re.match(r"^\s*name\s*:\s*(.+)$", line, re.IGNORECASE)
+        if labelled:
+            return _as_name(labelled.group(1))
+    first = next((line for line in lines if line.strip()), "")
+    head = re.split(rf"[|•·,;]|{EMAIL_PATTERN}", first, maxsplit=1)[0]
+    return _as_name(head)
+
+def extract_contact(contact_text, links_text=""):
+    """
+    Reads the contact fields from the text before the first heading (plus
+    the 'Extracted Links' block for profile URLs).
+
+    Returns:
+        tuple: (fields, leftover) — fields found, keyed as in CONTACT_FIELDS,
+        and the contact lines that are not contact details (e.g. a headline)
+    """
+    lines = contact_text.splitlines()
+    fields = {}
+    name = _name(lines)
+    if name:
+        fields['name'] = name
+
+    email = re.search(EMAIL_PATTERN, contact_text)
+    if email:
+        fields['email'] = email.group(0)
+    without_email = re.sub(EMAIL_PATTERN, " ", contact_text)
+
+    urls = re.findall(URL_PATTERN, without_email, re.IGNORECASE) + re.findall(URL_PATTERN, links_text, re.IGNORECASE)
+    for url in urls:
+        if 'linkedin' not in fields and _is_profile(url, 'linkedin.com'):
+            fields['linkedin'] = _url(url)
+        elif 'github' not in fields and _is_profile(url, 'github.com'):
+            fields['github'] = _url(url)
+    for url in re.findall(URL_PATTERN, without_email, re.IGNORECASE):
+        host = _url(url).split("/")[0].lower()
+        if 'website' not in fields and host not in ('linkedin.com', 'github.com') and re.search(r"[a-z]", host.split(".")[-1]):
+            fields['website'] = _url(url)
+
+    for match in re.finditer(PHONE_PATTERN, re.sub(URL_PATTERN, " ", without_email, flags=re.IGNORECASE)):
+        if 7 <= len(re.sub(r"\D", "", match.group(0))) <= 15:
+            fields['phone'] = match.group(0).strip()
+            break
+
+    leftover = []
+    for line in lines:
+        rest = line
+        for value in fields.values():
+            rest = rest.replace(value, " ")
+        rest = re.sub(r"(?:https?://|www\.)+(?=\s|$)", " ", rest)
+        rest = re.sub(_CONTACT_LABEL, "", rest, flags=re.IGNORECASE)
+        rest = re.sub(r"^[\s|,;•·]+|[\s|,;•·]+$", "", rest)
+        if re.search(r"[^\W\d_]{2,}", rest) and not re.fullmatch(r"(?:[\w-]+\s*:\s*)+", rest):
+            leftover.append(rest)
+    return fields, "\n".join(leftover)
+
+def extract_education(section_text):
+    """
+    Splits an education section into entries of school, degree, year and GPA.
+
+    Returns:
+        list: Entry dicts, or None when some entry lacks a school or a degree
+        (the section is then left to the LLM)
+    """
+    entries = []
+    current = None
+    for line in section_text.splitlines()[1:]:
+        line = line.strip().lstrip("•·-*▪◦ ").strip()
+        if not line:
+            continue
+        year = re.search(YEAR_PATTERN, line, re.IGNORECASE)
+        gpa = re.search(GPA_PATTERN, line, re.IGNORECASE)
+        rest = line
+        for match in (gpa, year):
+            if match:
+                rest = rest.replace(match.group(0), " ")
+        # Coursework, honours and the like carry no entry field
+        if re.match(r"^[^:]{1,30}:", rest) and not (year or gpa):
+            continue
+
+        school = degree = None
+        for segment in re.split(r"\s*(?:\||,|;|\s[-–—]\s|\bfrom\b|\bat\b|\(|\))\s*", rest):
+            segment = segment.strip(" .:–—-")
+            if not segment or not re.search(r"[^\W\d_]", segment):
+                continue
+            if degree is None and re.search(DEGREE_PATTERN, segment):
+                degree = segment
+            elif school is None and re.search(SCHOOL_PATTERN, segment):
+                school = segment
+            elif degree and degree != segment and not school and not re.search(DEGREE_PATTERN, segment):
+                degree = f"{degree}, {segment}"  # e.g. "B.S., Computer Science"
+        if school is None and degree is None and rest.strip(" |,;()-–—"):
+            # Unrecognized name on a line of its own (e.g. "Stanford 2015")
+            school = re.sub(r"[\s|,;()–—-]+", " ", rest).strip()
+
+        if current is None or (school and current['school']) or (degree and current['degree']):
+            current = {'school': '', 'degree': '', 'year': '', 'gpa': ''}
+            entries.append(current)
+        current['school'] = current['school'] or school or ''
+        current['degree'] = current['degree'] or degree or ''
+        current['year'] = current['year'] or (year.group(0) if year else '')
+        current['gpa'] = current['gpa'] or (gpa.group(1).strip() if gpa else '')
+
+    if not entries or any(not entry['school'] or not entry['degree'] for entry in entries):
+        return None
+    return entries
+
+@traced("pre_extract")
+def pre_extract(text):
+    """
+    Reads the fixed-shape fields (contact details and education) locally.
+
+    A group is only taken over when it is read completely: the contact block
+    needs a name plus an email or phone number, and every education entry a
+    school and a degree. Everything else stays in the free text for the LLM.
+
+    Returns:
+        tuple: (fields, free_text) — fields keyed as in the enhancement JSON
+        ('name', ..., 'education'), and the resume text without them
+    """
+    sections = split_sections(text)
+    links = "\n".join(body for section, body in sections if section == 'links')
+    fields = {}
+    free = []
+    for section, body in sections:
+        if section == 'contact' and 'name' not in fields:
+            contact, leftover = extract_contact(body, links)
+            if contact.get('name') and (contact.get('email') or contact.get('phone')):
+                fields.update({field: contact.get(field, '') for field in CONTACT_FIELDS})
+                body = leftover
+        elif section == 'education' and 'education' not in fields:
+            education = extract_education(body)
+            if education:
+                fields['education'] = education
+                continue
+        elif section == 'links' and 'name' in fields:
+            # Profile links were read into the contact fields; project links stay
+            used = {fields['linkedin'], fields['github'], fields['website']} - {''}
+            body = "\n".join(line for line in body.splitlines()
+                             if _url(line.split(":", 1)[-1].strip()) not in used)
+            if not re.search(URL_PATTERN, body, re.IGNORECASE):
+                continue
+        if body:
+            free.append(body)
+    return fields, "\n\n".join(free)
+
+@traced("extract_text_from_pdf")
 def extract_text_from_pdf(uploaded_file):
     """
     Extract text and hyperlinks from PDF using pdfplumber.
     """
     try:
+        import pdfplumber
+
         text = ""
         urls = []
         
@@ -42,11 +292,14 @@ def extract_text_from_pdf(uploaded_file):
     except Exception as e:
         return f"Error reading PDF: {str(e)}"
 
+@traced("extract_text_from_docx")
 def extract_text_from_docx(uploaded_file):
     """
     Extract text and hyperlinks from DOCX.
     """
     try:
+        from docx import Document
+
         doc = Document(uploaded_file)
         text = ""
         urls = []
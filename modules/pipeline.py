@@ -0,0 +1,353 @@
+"""
+Pipeline Module
+The optimization pipeline without any UI: score, enhance, verify, render.
+Used by the HTTP API and the Streamlit app; progress is reported through an
+optional callback.
+"""
+import csv
+import io
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError, wait
+from modules.cache import fetch, fetch_json, make_key, store, store_json
+from modules.document import ResumeDocument
+from modules.metrics import bind_context, span
+from modules.prompts import PROMPT_VERSION
+from modules.scorer import keyword_set, score_keyword_sets, score_keyword_sets_many
+from modules.singleflight import SingleFlight
+
+STEPS = ('analyze', 'enhance', 'verify', 'render')
+
+# Enhancements mostly wait on Gemini, so the pool can be wider than the CPU count
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "16"))
+_ENHANCE_FLIGHTS = SingleFlight(
+    ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="enhance"), 'enhance')
+# Flight key -> (queue position, eta) while the flight waits for Gemini quota
+_queue_positions = {}
+
+# Multi-JD runs: job descriptions per run, and enhancements one run keeps in flight
+MULTI_JD_LIMIT = int(os.getenv("MULTI_JD_LIMIT", "10"))
+MULTI_JD_CONCURRENCY = int(os.getenv("MULTI_JD_CONCURRENCY", "4"))
+
+def _noop(step, **data):
+    pass
+
+def parse_upload(filename, stream):
+    """
+    Extracts text from an uploaded PDF/DOCX file object. Results are cached by
+    file content, so reruns and replicas don't parse the same upload again.
+    """
+    from modules.parser import PARSER_VERSION, extract_text_from_docx, extract_text_from_pdf
+
+    name = (filename or "").lower()
+    if name.endswith(".pdf"):
+        extract = extract_text_from_pdf
+    elif name.endswith(".docx"):
+        extract = extract_text_from_docx
+    else:
+        raise ValueError("Unsupported file type. Upload a .pdf or .docx resume.")
+
+    # Streamlit hands the same file object to every rerun
+    stream.seek(0)
+    data = stream.read()
+    key = make_key('parse', PARSER_VERSION, extract.__name__, data)
+    cached = fetch(key, 'parse')
+    if cached is not None:
+        return cached.decode('utf-8')
+    text = extract(io.BytesIO(data))
+    # Failures are reported as text; those are not worth keeping
+    if not text.startswith(("Error reading PDF", "Error reading DOCX")):
+        store(key, text.encode('utf-8'))
+    return text
+
+# ─── COALESCING ────────────────────────────────────────────────
+def enhancement_key(raw_text, job_desc):
+    """
+    Identity of an enhancement request, for coalescing and the LLM cache. The
+    missing keywords are derived from the texts, so they need not be part of
+    the key; the template only affects rendering, which is coalesced and cached
+    separately (see generator.submit_resume_pdf).
+    """
+    return make_key('llm', 'enhance', PROMPT_VERSION, raw_text, job_desc)
+
+def _enhance(key, raw_text, job_desc, missing_keywords):
+    from modules.enhancer import enhance_resume_content
+
+    def on_wait(position, eta):
+        _queue_positions[key] = (position, eta)
+
+    try:
+        data = enhance_resume_content(raw_text, job_desc, missing_keywords=missing_keywords, on_wait=on_wait)
+    finally:
+        _queue_positions.pop(key, None)
+    if "error" not in data:
+        store_json(key, data)
+    return data
+
+def submit_enhancement(raw_text, job_desc, missing_keywords):
+    """
+    Starts the AI enhancement, or joins an identical one already in flight
+    (double clicks, several recruiters running the same candidate and req).
+    A result cached by any replica is returned without calling Gemini.
+
+    Returns:
+        tuple: (key, ticket Future of the enhancer's dict; treat it as read-only)
+    """
+    key = enhancement_key(raw_text, job_desc)
+    cached = fetch_json(key, 'llm_enhance')
+    if cached is not None:
+        ticket = Future()
+        ticket.set_result(cached)
+        return key, ticket
+    return key, _ENHANCE_FLIGHTS.submit(key, bind_context(_enhance), key, raw_text, job_desc, missing_keywords)
+
+def wait_for_enhancement(key, ticket, on_poll=None, poll_seconds=0.5):
+    """
+    Waits for a ticket from submit_enhancement. `on_poll(queue_state)` runs in
+    the caller's thread every poll, with (position, eta) while the flight is
+    queued for quota or None. If the caller is interrupted (e.g. Streamlit
+    stops the script on a rerun) only its ticket is cancelled.
+    """
+    try:
+        while True:
+            try:
+                return ticket.result(timeout=poll_seconds)
+            except TimeoutError:
+                if on_poll:
+                    on_poll(_queue_positions.get(key))
+    except BaseException:
+        ticket.cancel()
+        raise
+
+def render_artifacts(resume, template_name="modern", output_dir="output", formats=('draft', 'pdf', 'docx')):
+    """
+    Writes the requested artifacts to `output_dir`.
+
+    Returns:
+        tuple: ({format: path}, {format: error message})
+    """
+    from modules.generator import generate_draft_pdf, generate_resume_docx, generate_resume_pdf
+
+    builders = {
+        'draft': lambda: generate_draft_pdf(resume, output_dir),
+        'pdf': lambda: generate_resume_pdf(resume, template_name, output_dir),
+        'docx': lambda: generate_resume_docx(resume, output_dir),
+    }
+    artifacts, errors = {}, {}
+    for fmt in formats:
+        try:
+            artifacts[fmt] = builders[fmt]()
+        except Exception as e:
+            # e.g. no pdflatex: the draft PDF and DOCX are still delivered
+            errors[fmt] = str(e)
+    return artifacts, errors
+
+def run_optimization(raw_text, job_desc, template_name="modern", output_dir="output", progress=_noop,
+                     stage=None, render=None):
+    """
+    Runs the full optimization for one resume and job description.
+
+    Args:
+        progress (callable): Called as progress(step, **data) when a step starts and ends
+        stage (callable): stage(step) context manager around each step (default: a span)
+        render (callable): render(resume) -> (artifacts, errors); by default
+            every format is written to `output_dir` (see render_artifacts)
+
+    Returns:
+        dict: Scores, keywords, the validated resume and artifacts
+
+    Raises:
+        ValueError: When the AI enhancement fails or returns unusable data
+    """
+    if stage is None:
+        stage = lambda step: span(f"pipeline.{step}")
+    if render is None:
+        def render(resume):
+            os.makedirs(output_dir, exist_ok=True)
+            return render_artifacts(resume, template_name, output_dir)
+
+    progress('analyze')
+    with stage("analyze"):
+        jd_keywords = keyword_set(job_desc)
+        score_before, missing = score_keyword_sets(keyword_set(raw_text), jd_keywords)
+    progress('analyze', done=True, score_before=score_before)
+
+    def report_queue(state):
+        if state:
+            progress('enhance', queue_position=state[0], eta_seconds=state[1])
+
+    progress('enhance')
+    with stage("enhance"):
+        key, ticket = submit_enhancement(raw_text, job_desc, missing)
+        ai_data = wait_for_enhancement(key, ticket, on_poll=report_queue)
+    if "error" in ai_data:
+        raise ValueError(f"AI Error: {ai_data['error']}")
+    try:
+        resume = ResumeDocument.from_dict(ai_data)
+    except ValueError as e:
+        raise ValueError(f"AI Error: {e}")
+    progress('enhance', done=True)
+
+    progress('verify')
+    with stage("verify"):
+        score_after, _ = score_keyword_sets(resume.tokens, jd_keywords)
+    progress('verify', done=True, score_after=score_after)
+
+    progress('render')
+    with stage("render"):
+        artifacts, render_errors = render(resume)
+    progress('render', done=True, artifacts=sorted(artifacts))
+
+    return {
+        'score_before': score_before,
+        'score_after': score_after,
+        'missing_keywords': sorted(missing),
+        'keywords_added': resume.keywords_added,
+        'keywords_skipped': resume.keywords_skipped,
+        'resume': resume,
+        'artifacts': artifacts,
+        'render_errors': render_errors,
+    }
+
+# ─── MULTI-JD RUNS ─────────────────────────────────────────────
+# One resume tailored to several roles: parsed and scored once, enhanced per
+# JD with a bounded number of Gemini calls in flight, rendered through the
+# shared LaTeX pool.
+
+REPORT_FIELDS = ('role', 'score_before', 'score_after', 'improvement', 'keywords_added', 'outstanding', 'status')
+
+def split_job_descriptions(text):
+    """Splits pasted text into job descriptions at lines consisting of `---`."""
+    return [part.strip() for part in re.split(r"^\s*-{3,}\s*$", text or "", flags=re.MULTILINE) if part.strip()]
+
+def job_title(job_desc, width=60):
+    """First non-empty line of a JD, shortened for reports."""
+    line = next((l.strip() for l in job_desc.splitlines() if l.strip()), "")
+    return line if len(line) <= width else line[:width - 1].rstrip() + "…"
+
+def enhance_many(raw_text, job_descs, missing_keywords, limit=MULTI_JD_CONCURRENCY, on_poll=None, poll_seconds=0.5):
+    """
+    Enhances the resume for every JD with at most `limit` requests in flight.
+    `on_poll(done, total)` runs in the caller's thread while waiting; an
+    interrupted caller cancels its outstanding tickets.
+
+    Returns:
+        list: The enhancer's dict per JD, in order
+    """
+    results = [None] * len(job_descs)
+    queued = list(range(len(job_descs)))
+    pending = {}
+    try:
+        while queued or pending:
+            while queued and len(pending) < max(1, limit):
+                index = queued.pop(0)
+                _, ticket = submit_enhancement(raw_text, job_descs[index], missing_keywords[index])
+                pending[ticket] = index
+            finished, _ = wait(pending, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+            for ticket in finished:
+                index = pending.pop(ticket)
+                try:
+                    results[index] = ticket.result()
+                except Exception as e:
+                    results[index] = {"error": f"Enhancement failed: {str(e)}"}
+            if on_poll:
+                on_poll(len(job_descs) - len(queued) - len(pending), len(job_descs))
+    except BaseException:
+        for ticket in pending:
+            ticket.cancel()
+        raise
+    return results
+
+def write_comparison_report(variants, path):
+    """Writes the before/after comparison as CSV and returns its path."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=('jd',) + REPORT_FIELDS)
+        writer.writeheader()
+        for variant in variants:
+            writer.writerow({'jd': variant['index'] + 1, **{field: variant[field] for field in REPORT_FIELDS}})
+    return path
+
+def run_multi_optimization(raw_text, job_descs, template_name="modern", output_dir="output",
+                           progress=_noop, limit=MULTI_JD_CONCURRENCY):
+    """
+    Tailors one resume to several job descriptions.
+
+    Args:
+        progress (callable): Called as progress(step, **data) when a step starts and ends
+        limit (int): Enhancements kept in flight at once
+
+    Returns:
+        dict: 'variants' (one dict per JD, in order; failed ones carry 'error')
+              and 'report_path' (CSV comparison of before/after scores)
+    """
+    from modules.generator import submit_resume_pdf
+
+    if not job_descs:
+        raise ValueError("Provide at least one job description.")
+    if len(job_descs) > MULTI_JD_LIMIT:
+        raise ValueError(f"At most {MULTI_JD_LIMIT} job descriptions per run.")
+
+    progress('analyze')
+    with span("pipeline.analyze"):
+        resume_keywords = keyword_set(raw_text)
+        jd_keywords = [keyword_set(jd) for jd in job_descs]
+        before = score_keyword_sets_many(resume_keywords, jd_keywords)
+    progress('analyze', done=True, scores_before=[score for score, _ in before])
+
+    progress('enhance', total=len(job_descs))
+    with span("pipeline.enhance"):
+        enhanced = enhance_many(raw_text, job_descs, [missing for _, missing in before], limit,
+                                on_poll=lambda done, total: progress('enhance', completed=done, total=total))
+    progress('enhance', done=True)
+
+    variants = []
+    progress('verify')
+    with span("pipeline.verify"):
+        for index, (job_desc, ai_data) in enumerate(zip(job_descs, enhanced)):
+            score_before, missing = before[index]
+            variant = {
+                'index': index, 'role': job_title(job_desc), 'job_desc': job_desc,
+                'score_before': score_before, 'score_after': None, 'improvement': None,
+                'missing_keywords': sorted(missing), 'keywords_added': 0, 'outstanding': len(missing),
+                'resume': None, 'artifacts': {}, 'render_errors': {}, 'error': None, 'status': 'ok',
+            }
+            try:
+                if "error" in ai_data:
+                    raise ValueError(ai_data['error'])
+                resume = ResumeDocument.from_dict(ai_data)
+            except ValueError as e:
+                variant.update(error=f"AI Error: {str(e)}", status='failed')
+                variants.append(variant)
+                continue
+            score_after, remaining = score_keyword_sets(resume.tokens, jd_keywords[index])
+            variant.update(resume=resume, score_after=score_after, improvement=round(score_after - score_before, 2),
+                           keywords_added=len(resume.keywords_added), outstanding=len(remaining))
+            variants.append(variant)
+    progress('verify', done=True, scores_after=[v['score_after'] for v in variants])
+
+    progress('render')
+    with span("pipeline.render"):
+        pdf_futures = {}
+        for variant in variants:
+            if variant['resume'] is None:
+                continue
+            variant_dir = os.path.join(output_dir, f"jd_{variant['index'] + 1}")
+            # Every variant's LaTeX compile is queued first, then the cheap formats are built meanwhile
+            pdf_futures[variant['index']] = submit_resume_pdf(variant['resume'], template_name, variant_dir)
+        for variant in variants:
+            if variant['index'] not in pdf_futures:
+                continue
+            variant_dir = os.path.join(output_dir, f"jd_{variant['index'] + 1}")
+            variant['artifacts'], variant['render_errors'] = render_artifacts(
+                variant['resume'], template_name, variant_dir, formats=('draft', 'docx'))
+        for index, future in pdf_futures.items():
+            try:
+                variants[index]['artifacts']['pdf'] = future.result()
+            except Exception as e:
+                # e.g. no pdflatex: the draft PDF and DOCX are still delivered
+                variants[index]['render_errors']['pdf'] = str(e)
+        os.makedirs(output_dir, exist_ok=True)
+        report_path = write_comparison_report(variants, os.path.join(output_dir, "comparison.csv"))
+    progress('render', done=True)
+
+    return {'variants': variants, 'report_path': report_path}
@@ -0,0 +1,139 @@
+"""
+Profiling Module
+Opt-in per-run profiling of the optimization pipeline. Each stage runs under
+cProfile and tracemalloc; reports are written to `PROFILE_DIR/<run_id>/`:
+
+    <n>_<stage>.prof     cProfile stats (snakeviz / flameprof / pstats)
+    allocations.txt      top allocation sites per stage
+    summary.json         wall time and net traced memory per stage
+
+Enable with RESUME_PROFILE=1 or the `?profile=1` query parameter. Only the
+last PROFILE_KEEP runs are kept.
+"""
+import cProfile
+import contextlib
+import json
+import os
+import shutil
+import threading
+import time
+import tracemalloc
+import uuid
+from modules.metrics import span
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("output", "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+# Allocation sites listed per stage in allocations.txt
+PROFILE_TOP_ALLOCATIONS = 25
+
+# tracemalloc is process-wide: it runs while at least one profiled stage does
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+def is_enabled(query_params=None):
+    """Profiling is on for this run via env var or `?profile=1`."""
+    if os.getenv("RESUME_PROFILE") == "1":
+        return True
+    return bool(query_params) and query_params.get("profile") in ("1", "true")
+
+def new_run_id():
+    # Sortable by time so pruning can go by name
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+_tracing_owned = False
+
+def _start_tracing():
+    """First stage in starts tracemalloc (unless something else already traces)."""
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+def _stop_tracing():
+    """Last stage out stops tracemalloc, if profiling started it."""
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+def prune_runs(profile_dir=PROFILE_DIR, keep=PROFILE_KEEP):
+    """Deletes all but the newest `keep` run directories."""
+    try:
+        runs = sorted(d for d in os.listdir(profile_dir) if os.path.isdir(os.path.join(profile_dir, d)))
+    except FileNotFoundError:
+        return
+    for run in runs[:max(0, len(runs) - keep)]:
+        shutil.rmtree(os.path.join(profile_dir, run), ignore_errors=True)
+
+class RunProfiler:
+    """
+    Profiles the stages of one pipeline run. A disabled profiler only times
+    the stages, so callers can wrap stages unconditionally.
+
+    cProfile only sees the calling thread: work handed to the render pool
+    (the final LaTeX compile) is not part of the profile.
+    """
+
+    def __init__(self, enabled=False, run_id=None, profile_dir=PROFILE_DIR, keep=PROFILE_KEEP):
+        self.enabled = enabled
+        self.run_id = run_id or new_run_id()
+        self.run_dir = os.path.join(profile_dir, self.run_id)
+        self.stages = []
+        if enabled:
+            os.makedirs(self.run_dir, exist_ok=True)
+            prune_runs(profile_dir, keep)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Profiles the enclosed block as one stage; reports are written on exit, even on error."""
+        with span(f"process_resume.{name}"):
+            with self._profile(name):
+                yield
+
+    @contextlib.contextmanager
+    def _profile(self, name):
+        start = time.perf_counter()
+        if not self.enabled:
+            try:
+                yield
+            finally:
+                self.stages.append({'stage': name, 'wall_ms': round((time.perf_counter() - start) * 1000, 2)})
+            return
+
+        # Concurrent runs share the tracer, so memory is reported as the change
+        # over the stage instead of resetting the process-wide peak
+        _start_tracing()
+        before = tracemalloc.take_snapshot()
+        traced_before, _ = tracemalloc.get_traced_memory()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            wall_ms = round((time.perf_counter() - start) * 1000, 2)
+            after = tracemalloc.take_snapshot()
+            traced_after, _ = tracemalloc.get_traced_memory()
+            _stop_tracing()
+            self._write_stage(name, profiler, before, after, wall_ms, traced_after - traced_before)
+
+    def _write_stage(self, name, profiler, before, after, wall_ms, net):
+        index = len(self.stages) + 1
+        try:
+            profiler.dump_stats(os.path.join(self.run_dir, f"{index}_{name}.prof"))
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+            with open(os.path.join(self.run_dir, "allocations.txt"), "a") as f:
+                f.write(f"=== {index}_{name}  wall {wall_ms} ms  net {net / 1024:+.1f} KiB ===\n")
+                for stat in diff[:PROFILE_TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+                f.write("\n")
+            self.stages.append({'stage': name, 'wall_ms': wall_ms, 'net_kib': round(net / 1024, 1)})
+            with open(os.path.join(self.run_dir, "summary.json"), "w") as f:
+                json.dump({'run_id': self.run_id, 'stages': self.stages}, f, indent=2)
+        except OSError as e:
+            print(f"Profile report for '{name}' not written: {e}")
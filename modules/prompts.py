@@ -2,6 +2,9 @@
 Centralized prompts for the AI Resume Agent.
 """
 
+# Bump when a prompt changes: it is part of the keys that share LLM results
+PROMPT_VERSION = "2"
+
 def get_score_prompt(resume_text, job_description):
     """Returns the prompt for the keyword scoring (AI Scorer)."""
     return f"""Evaluate the match between the resume and the job description on a scale of 0-100.
@@ -19,8 +22,78 @@ Return ONLY a JSON object (no markdown, no extra text) with this structure:
 }}
 """
 
-def get_enhancement_prompt(original_text, job_description, missing_keywords=None):
-    """Returns the prompt for the resume enhancement task."""
+def get_chunk_score_prompt(resume_excerpt, job_description):
+    """Returns the prompt for scoring a resume, or one chunk of a long one (map step of the AI scorer)."""
+    return f"""You are screening a resume, or one part of a longer resume, against a job description.
+
+JOB DESCRIPTION:
+{job_description}
+
+RESUME EXCERPT:
+{resume_excerpt}
+
+List the job's key requirements (skills, tools, qualifications) that this excerpt clearly demonstrates,
+and the important ones it does not show. Use the job description's wording for each requirement.
+
+Return ONLY a JSON object (no markdown, no extra text) with this structure:
+{{
+    "matched": ["requirements", "shown", "in", "the", "excerpt"],
+    "missing": ["requirements", "not", "shown"]
+}}
+"""
+
+# Output fields of the enhancement JSON, in order; fields read locally from the
+# upload (modules.parser.pre_extract) are left out of the requested structure
+ENHANCEMENT_SCHEMA = (
+    ('name', '"name": "Candidate Name"'),
+    ('email', '"email": "email@example.com"'),
+    ('phone', '"phone": "Phone Number"'),
+    ('linkedin', '"linkedin": "LinkedIn URL (if found)"'),
+    ('github', '"github": "GitHub URL (if found)"'),
+    ('website', '"website": "Website URL (if found)"'),
+    ('summary', '"summary": "A powerful, professional summary optimized for the target role..."'),
+    ('experience', """"experience": [
+        {
+            "title": "Job Title",
+            "company": "Company Name",
+            "dates": "Date Range",
+            "bullets": [
+                "Action-oriented bullet point 1 using keywords...",
+                "Quantifiable achievement 2..."
+            ]
+        }
+    ]"""),
+    ('education', """"education": [
+        {
+            "school": "University Name",
+            "degree": "Degree",
+            "year": "Year",
+            "gpa": "GPA (optional)"
+        }
+    ]"""),
+    ('skills', """"skills": [
+         { "category": "Languages", "items": "Python, Java..." },
+         { "category": "Frameworks", "items": "React, Flask..." }
+    ]"""),
+    ('projects', """"projects": [
+        {
+            "name": "Project Name",
+            "link": "Project URL",
+            "description": "Brief description highlighting tech stack and impact"
+        }
+    ]"""),
+    ('keywords_added', '"keywords_added": ["list", "of", "keywords", "you", "successfully", "integrated"]'),
+    ('keywords_skipped', """"keywords_skipped": [
+        { "keyword": "skipped_keyword", "reason": "Not relevant/truthful" }
+    ]"""),
+)
+
+def get_enhancement_prompt(original_text, job_description, missing_keywords=None, known_fields=()):
+    """Returns the prompt for the resume enhancement task.
+
+    `known_fields` are output fields already read from the resume (contact
+    details, education); they are cut from `original_text` and not requested.
+    """
     
     keywords_instruction = ""
     if missing_keywords:
@@ -36,11 +109,21 @@ Your goal is to NATURALLY incorporate these keywords into the resume content whe
 - DO NOT force them in if they don't fit.
 - DO NOT invent false experiences.
 - Track which ones you added in the 'keywords_added' field.
+"""
+
+    output_schema = "{\n    " + ",\n    ".join(
+        snippet for field, snippet in ENHANCEMENT_SCHEMA if field not in known_fields) + "\n}"
+    known_instruction = ""
+    known_groups = [group for group, field in (("contact details", 'name'), ("education", 'education'))
+                    if field in known_fields]
+    if known_groups:
+        known_instruction = f"""
+NOTE: The candidate's {' and '.join(known_groups)} were extracted separately and are not part of the resume text below. Do not return them.
 """
 
     return f"""You are an expert Resume Optimizer. Your goal is to rewrite the resume to be more impactful and ATS-friendly, targeting the specific job description provided.
 
-{keywords_instruction}
+{keywords_instruction}{known_instruction}
 
 INPUTS:
 1. ORIGINAL RESUME:
@@ -52,47 +135,28 @@ INPUTS:
 OUTPUT FORMAT:
 Return ONLY a valid JSON object with the following structure. Do not include markdown formatting (like ```json).
 
-{{
-    "name": "Candidate Name",
-    "email": "email@example.com",
-    "phone": "Phone Number",
-    "linkedin": "LinkedIn URL (if found)",
-    "github": "GitHub URL (if found)",
-    "website": "Website URL (if found)",
-    "summary": "A powerful, professional summary optimized for the target role...",
-    "experience": [
-        {{
-            "title": "Job Title",
-            "company": "Company Name",
-            "dates": "Date Range",
-            "bullets": [
-                "Action-oriented bullet point 1 using keywords...",
-                "Quantifiable achievement 2..."
-            ]
-        }}
-    ],
-    "education": [
-        {{
-            "school": "University Name",
-            "degree": "Degree",
-            "year": "Year",
-            "gpa": "GPA (optional)"
-        }}
-    ],
-    "skills": [
-         {{ "category": "Languages", "items": "Python, Java..." }},
-         {{ "category": "Frameworks", "items": "React, Flask..." }}
-    ],
-    "projects": [
-        {{
-            "name": "Project Name",
-            "link": "Project URL",
-            "description": "Brief description highlighting tech stack and impact"
-        }}
-    ],
-    "keywords_added": ["list", "of", "keywords", "you", "successfully", "integrated"],
-    "keywords_skipped": [
-        {{ "keyword": "skipped_keyword", "reason": "Not relevant/truthful" }}
-    ]
-}}
+{output_schema}
+"""
+
+def get_coach_system_prompt(context_json, job_description):
+    """Returns the system instruction for the Career Coach chat.
+
+    The resume context is sent once per chat session as a stable prefix,
+    so individual turns only carry the new question.
+    """
+    return f"""You are an expert AI Recruiter and Resume Coach.
+You are helping a candidate improve their resume for a specific job.
+
+CONTEXT:
+OPTIMIZED RESUME (JSON):
+{context_json}
+
+TARGET JOB DESCRIPTION:
+{job_description}
+
+INSTRUCTIONS:
+- Provide specific, actionable advice.
+- Be encouraging but honest.
+- Keep answers concise and relevant to the resume/JD provided.
+- If the user asks about the ATS score, explain how to improve it based on the missing keywords.
 """
@@ -0,0 +1,197 @@
+"""
+Model Routing Module
+Picks the Gemini model, generation config and timeout for each call from the
+task, the prompt size and the task's latency SLO.
+
+Every task has routes in order of preference (by default the fast Flash model
+first, then the lighter Flash-Lite). A call goes to the first route whose
+expected latency fits the SLO; expectations come from latency percentiles of
+recent calls, per task, model and prompt size. A call that times out is
+retried on the next route within what is left of the SLO. Samples age out,
+so a route that was skipped after a slow spell is tried again later.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from modules.llm import EXPECTED_OUTPUT_TOKENS, SCHEDULER, estimate_tokens, get_genai
+from modules.metrics import increment, observe
+
+def _env_list(name, default):
+    return tuple(m.strip() for m in os.getenv(name, default).split(",") if m.strip())
+
+# Preferred model first; later routes are faster fallbacks
+ROUTES = {
+    'enhance': _env_list("LLM_ROUTES_ENHANCE", "gemini-flash-latest,gemini-flash-lite-latest"),
+    'score': _env_list("LLM_ROUTES_SCORE", "gemini-flash-latest,gemini-flash-lite-latest"),
+    'chat': _env_list("LLM_ROUTES_CHAT", "gemini-flash-latest,gemini-flash-lite-latest"),
+}
+
+# End-to-end latency objective per task, in seconds (chat: until the first chunk)
+SLOS = {
+    'enhance': float(os.getenv("LLM_SLO_ENHANCE", "30")),
+    'score': float(os.getenv("LLM_SLO_SCORE", "10")),
+    'chat': float(os.getenv("LLM_SLO_CHAT", "8")),
+}
+
+# Latency expected from a model before it has LATENCY_MIN_SAMPLES observations:
+# fixed overhead, seconds per 1k prompt tokens, seconds per 1k output tokens
+LATENCY_PRIORS = {
+    'gemini-flash-latest': (1.0, 0.3, 5.0),
+    'gemini-flash-lite-latest': (0.7, 0.2, 3.0),
+}
+DEFAULT_PRIOR = (2.0, 0.5, 10.0)
+
+LATENCY_PERCENTILE = float(os.getenv("LLM_ROUTING_PERCENTILE", "0.9"))
+LATENCY_WINDOW = 50
+LATENCY_MIN_SAMPLES = 5
+# Older samples are ignored, so a skipped route falls back to its prior and gets traffic again
+LATENCY_MAX_AGE = float(os.getenv("LLM_LATENCY_MAX_AGE", "600"))
+# Prompt-size buckets (tokens); latencies are only compared within a bucket
+SIZE_BUCKETS = (1000, 4000, 16000)
+
+# A route that may still fall back gets this much headroom over its expected latency
+TIMEOUT_HEADROOM = 1.5
+MIN_TIMEOUT = 5.0
+# Deadline for a whole streamed reply; the SLO only covers its first chunk
+STREAM_TIMEOUT = float(os.getenv("LLM_STREAM_TIMEOUT", "120"))
+
+def _is_timeout(error):
+    return (type(error).__name__ in ('DeadlineExceeded', 'Timeout', 'ReadTimeout', 'TimeoutError')
+            or getattr(error, 'code', None) == 504)
+
+class ModelRouter:
+    """Routing policy with per (task, model, size bucket) latency windows."""
+
+    def __init__(self, routes=ROUTES, slos=SLOS, percentile=LATENCY_PERCENTILE):
+        self.routes = routes
+        self.slos = slos
+        self.percentile = percentile
+        self._latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._lock = threading.Lock()
+
+    def _key(self, task, model, prompt_tokens):
+        return task, model, bisect.bisect_left(SIZE_BUCKETS, prompt_tokens)
+
+    def record(self, task, model, prompt_tokens, seconds):
+        """Adds one observed call latency (a timeout counts as its full timeout)."""
+        with self._lock:
+            self._latencies[self._key(task, model, prompt_tokens)].append((time.monotonic(), seconds))
+        observe('resume_llm_latency_seconds', seconds, task=task, model=model)
+
+    def expected_latency(self, task, model, prompt_tokens):
+        """Learned latency percentile for calls like this one, or the model's prior."""
+        cutoff = time.monotonic() - LATENCY_MAX_AGE
+        with self._lock:
+            samples = sorted(seconds for at, seconds in self._latencies.get(self._key(task, model, prompt_tokens), ())
+                             if at >= cutoff)
+        if len(samples) >= LATENCY_MIN_SAMPLES:
+            return samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+        base, per_1k_prompt, per_1k_output = LATENCY_PRIORS.get(model, DEFAULT_PRIOR)
+        return base + (per_1k_prompt * prompt_tokens + per_1k_output * EXPECTED_OUTPUT_TOKENS.get(task, 0)) / 1000
+
+    def plan(self, task, prompt_tokens):
+        """
+        Routes to try in order: from the first one expected to meet the SLO
+        onwards (or only the fastest, when none is).
+        """
+        routes = self.routes[task]
+        slo = self.slos[task]
+        for i, model in enumerate(routes):
+            if self.expected_latency(task, model, prompt_tokens) <= slo:
+                return list(routes[i:])
+        return [min(routes, key=lambda m: self.expected_latency(task, m, prompt_tokens))]
+
+    def timeout(self, task, model, prompt_tokens, remaining, last):
+        """Per-attempt timeout: the rest of the SLO, minus room for a fallback if there is one."""
+        if last:
+            return max(remaining, MIN_TIMEOUT)
+        expected = self.expected_latency(task, model, prompt_tokens)
+        return max(min(remaining, expected * TIMEOUT_HEADROOM), MIN_TIMEOUT)
+
+    def generation_config(self, task, prompt_tokens, base=None):
+        """Task config; enhancement also gets an output cap sized to the input."""
+        config = dict(base or {})
+        if task == 'enhance':
+            # The rewritten resume is roughly as long as the original
+            config.setdefault('max_output_tokens', min(8192, EXPECTED_OUTPUT_TOKENS['enhance'] + prompt_tokens))
+        # Score and chat stay uncapped: requirement lists and advice vary widely in
+        # length (and thinking tokens count too), and a truncated answer is lost
+        return config
+
+ROUTER = ModelRouter()
+
+def call_routed(task, prompt_tokens, send, on_wait=None, streamed=False):
+    """
+    Runs `send(model_name, timeout)` under the shared quota on the routed
+    models, falling back to the next route when a call times out. A
+    `streamed` response is settled against the quota by its consumer.
+
+    Returns:
+        The value returned by send()
+    """
+    plan = ROUTER.plan(task, prompt_tokens)
+    deadline = None
+    timeout = None
+
+    for i, model_name in enumerate(plan):
+        last = i == len(plan) - 1
+        increment('resume_llm_routed_total', task=task, model=model_name)
+
+        def attempt():
+            nonlocal deadline, timeout
+            # The SLO clock starts once the scheduler admits the call, not while it queues
+            if deadline is None:
+                deadline = time.monotonic() + ROUTER.slos[task]
+            timeout = ROUTER.timeout(task, model_name, prompt_tokens, deadline - time.monotonic(), last)
+            start = time.monotonic()
+            response = send(model_name, timeout)
+            ROUTER.record(task, model_name, prompt_tokens, time.monotonic() - start)
+            return response
+
+        try:
+            return SCHEDULER.call(task, attempt, prompt_tokens, on_wait=on_wait, streamed=streamed)
+        except Exception as e:
+            if not _is_timeout(e):
+                raise
+            ROUTER.record(task, model_name, prompt_tokens, timeout)
+            if last:
+                raise
+            increment('resume_llm_fallbacks_total', task=task, model=model_name)
+            print(f"{model_name} timed out after {timeout:.0f}s on '{task}'; retrying on {plan[i + 1]}")
+
+def open_stream(start, timeout):
+    """
+    Runs `start()`, a streaming call that returns once its first chunk has
+    arrived, and gives up after `timeout` seconds. The transport deadline of
+    the call covers the whole stream, so it is opened with STREAM_TIMEOUT and
+    the SLO is enforced here instead.
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(start())
+        except Exception as e:
+            future.set_exception(e)
+
+    # A stream that opens too late is abandoned unread
+    threading.Thread(target=run, name="llm-stream-open", daemon=True).start()
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        raise TimeoutError(f"No response within {timeout:.0f}s")
+
+def generate(task, prompt, generation_config=None, on_wait=None):
+    """Runs a single-turn prompt on the routed model (see call_routed)."""
+    genai = get_genai()
+    prompt_tokens = estimate_tokens(prompt)
+    config = ROUTER.generation_config(task, prompt_tokens, generation_config)
+
+    def send(model_name, timeout):
+        return genai.GenerativeModel(model_name).generate_content(
+            prompt, generation_config=config, request_options={'timeout': timeout})
+
+    return call_routed(task, prompt_tokens, send, on_wait=on_wait)
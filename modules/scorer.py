@@ -1,21 +1,13 @@
 import re
 import os
 import json
-import time
-import google.generativeai as genai
+import zlib
 from collections import Counter
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Configure Gemini
-api_key = os.getenv("GEMINI_API_KEY")
-if api_key:
-    genai.configure(api_key=api_key)
-else:
-    # Use a logger or silent fail in production, but print is fine for now
-    print("⚠️ Warning: GEMINI_API_KEY not found.")
+from concurrent.futures import ThreadPoolExecutor
+from modules.cache import fetch_json, make_key, store_json
+from modules.metrics import bind_context, increment, record_llm_usage, traced
+from modules.prompts import get_chunk_score_prompt
+from modules.routing import generate
 
 # Standard stopwords for ATS analysis
 STOPWORDS = {
@@ -39,21 +31,28 @@ STOPWORDS = {
     "working", "candidate", "ideal", "opportunity"
 }
 
-def extract_keywords(text):
-    """Extracts keywords from text, removing stopwords and non-alphanumeric chars."""
+def keyword_set(text):
+    """Unordered keyword set of text, for callers that only do set arithmetic."""
     if not text:
-        return []
+        return set()
     text = text.lower()
     text = re.sub(r'[^a-z0-9\s]', '', text)
-    words = text.split()
-    keywords = [w for w in words if w not in STOPWORDS and len(w) > 1]
-    return sorted(list(set(keywords)))
+    return {w for w in text.split() if w not in STOPWORDS and len(w) > 1}
 
+def extract_keywords(text):
+    """Extracts keywords from text, removing stopwords and non-alphanumeric chars."""
+    return sorted(keyword_set(text))
+
+@traced("calculate_ats_score")
 def calculate_ats_score(resume_text, job_desc_text):
     """Calculates a simple keyword match score."""
-    resume_keywords = set(extract_keywords(resume_text))
-    jd_keywords = set(extract_keywords(job_desc_text))
-    
+    resume_keywords = keyword_set(resume_text)
+    jd_keywords = keyword_set(job_desc_text)
+    return score_keyword_sets(resume_keywords, jd_keywords)
+
+@traced("score_keyword_sets")
+def score_keyword_sets(resume_keywords, jd_keywords):
+    """Keyword match score for pre-extracted keyword sets."""
     if not jd_keywords:
         return 0, []
         
@@ -63,44 +62,137 @@ def calculate_ats_score(resume_text, job_desc_text):
     
     return round(score, 2), list(missing)
 
-def calculate_ai_score(resume_text, job_desc):
+@traced("score_keyword_sets_many")
+def score_keyword_sets_many(resume_keywords, jd_keyword_sets):
+    """
+    score_keyword_sets for one resume against several JDs in a single pass:
+    every distinct JD keyword is looked up in the resume once, however many
+    JDs share it.
+
+    Returns:
+        list: (score, missing) per JD, in order
+    """
+    present = {keyword: keyword in resume_keywords for keyword in set().union(*jd_keyword_sets)}
+    results = []
+    for jd_keywords in jd_keyword_sets:
+        if not jd_keywords:
+            results.append((0, []))
+            continue
+        missing = [keyword for keyword in jd_keywords if not present[keyword]]
+        score = (len(jd_keywords) - len(missing)) / len(jd_keywords) * 100
+        results.append((round(score, 2), missing))
+    return results
+
+# ─── AI SCORING ────────────────────────────────────────────────
+# Resumes longer than AI_SCORE_MAX_CHARS are scored in chunks (map-reduce):
+# each section is scored against the JD concurrently and the answers are
+# merged, so long CVs are judged on every page rather than the first. A
+# shorter resume is one chunk, so every length gets the same kind of score.
+
+AI_SCORE_MAX_CHARS = 4000
+AI_SCORE_CHUNK_CHARS = int(os.getenv("AI_SCORE_CHUNK_CHARS", "6000"))
+AI_SCORE_JD_CHARS = int(os.getenv("AI_SCORE_JD_CHARS", "8000"))
+AI_SCORE_CONCURRENCY = int(os.getenv("AI_SCORE_CONCURRENCY", "6"))
+
+_CHUNK_POOL = ThreadPoolExecutor(max_workers=AI_SCORE_CONCURRENCY, thread_name_prefix="score-chunk")
+
+def _ask_json(prompt, cache_name):
+    """Sends a scoring prompt (cached by prompt) and returns the parsed JSON, or None on failure."""
+    # The prompt holds everything the answer depends on, so it is the cache key
+    key = make_key('llm', 'score', prompt)
+    cached = fetch_json(key, cache_name)
+    if cached is not None:
+        return cached
+
+    # Rate limits and slow models are retried by the scheduler and the router
+    try:
+        response = generate('score', prompt, {'temperature': 0.1, 'response_mime_type': 'application/json'})
+        record_llm_usage('score', response)
+        if not response.text:
+            return None
+        data = json.loads(response.text)
+    except Exception as e:
+        print(f"AI Scoring failed: {e}")
+        increment('resume_llm_errors_total', task='score')
+        return None
+    store_json(key, data)
+    return data
+
+def _content_boundary(line):
+    # Content-defined: whether a line may end a chunk depends only on the line
+    # itself, so an edit moves at most the boundaries next to it
+    return zlib.crc32(line.encode('utf-8')) % 4 == 0
+
+def chunk_resume(text, max_chars=AI_SCORE_CHUNK_CHARS):
+    """
+    Splits resume text into scoring chunks: one per section, and a long
+    section is cut at line boundaries chosen by content. Boundaries never
+    depend on neighbouring sections, so an edit only changes the chunks of
+    its own section and the rest hit the cache again.
+    """
+    from modules.parser import split_sections
+
+    chunks = []
+    for _, body in split_sections(text):
+        lines, size = [], 0
+        for line in body.splitlines():
+            lines.append(line)
+            size += len(line) + 1
+            if size >= max_chars or (size >= max_chars // 2 and _content_boundary(line)):
+                chunks.append("\n".join(lines))
+                lines, size = [], 0
+        if lines:
+            chunks.append("\n".join(lines))
+    return chunks
+
+def _normalize_requirement(requirement):
+    return re.sub(r"[^a-z0-9+#]+", " ", str(requirement).lower()).strip()
+
+def reduce_chunk_scores(results):
+    """
+    Merges per-chunk answers: a requirement counts as met if any chunk shows
+    it, and as missing only if no chunk does. The score is the share of all
+    requirements named by the chunks that are met.
+
+    Returns:
+        tuple: (score, deduplicated missing list)
+    """
+    matched = {}
+    missing = {}
+    for data in results:
+        for requirement in data.get("matched") or []:
+            matched.setdefault(_normalize_requirement(requirement), requirement)
+        for requirement in data.get("missing") or []:
+            missing.setdefault(_normalize_requirement(requirement), requirement)
+    matched.pop("", None)
+    missing = [requirement for key, requirement in missing.items() if key and key not in matched]
+    total = len(matched) + len(missing)
+    score = round(len(matched) / total * 100, 2) if total else 0
+    return score, missing
+
+@traced("calculate_chunked_ai_score")
+def calculate_chunked_ai_score(resume_text, job_desc, chunks=None):
+    """Map-reduce AI score over `chunks` of the resume (default: chunk_resume); see reduce_chunk_scores."""
+    job = job_desc[:AI_SCORE_JD_CHARS]
+    if chunks is None:
+        chunks = chunk_resume(resume_text)
+    futures = [
+        _CHUNK_POOL.submit(bind_context(_ask_json), get_chunk_score_prompt(chunk, job), 'llm_score_chunk')
+        for chunk in chunks
+    ]
+    results = [data for data in (future.result() for future in futures) if isinstance(data, dict)]
+    if not results:
+        return 0, []
+    return reduce_chunk_scores(results)
+
+@traced("calculate_ai_score")
+def calculate_ai_score(resume_text, job_desc, chunked=None):
     """
     Calculates ATS score using Gemini AI for context-aware matching.
+    A resume up to AI_SCORE_MAX_CHARS is sent whole and a longer one in
+    chunks (or as `chunked` says); both are scored by reduce_chunk_scores,
+    so the score doesn't jump when a resume crosses the limit.
     """
-    # Truncate inputs if too long
-    max_length = 4000
-    resume_truncated = resume_text[:max_length]
-    job_truncated = job_desc[:max_length]
-    
-    # Simple prompt for scoring, keeping it inline as it's small/specific
-    prompt = f"""Evaluate the resume match to the job description (0-100).
-JOB: {job_truncated}
-RESUME: {resume_truncated}
-Return JSON: {{"score": 85, "missing": ["skill1", "skill2"]}}"""
-
-    for attempt in range(2):
-        try:
-            # Try efficient model first
-            try:
-                model = genai.GenerativeModel('gemini-flash-latest')
-            except:
-                model = genai.GenerativeModel('gemini-pro')
-            
-            response = model.generate_content(
-                prompt,
-                generation_config={'temperature': 0.1, 'response_mime_type': 'application/json'}
-            )
-            
-            if not response.text:
-                continue
-                
-            data = json.loads(response.text)
-            return data.get("score", 0), data.get("missing", [])
-            
-        except Exception as e:
-            if attempt == 0:
-                time.sleep(1)
-                continue
-            print(f"AI Scoring failed: {e}")
-            
-    return 0, []
+    if chunked is None:
+        chunked = len(resume_text) > AI_SCORE_MAX_CHARS
+    return calculate_chunked_ai_score(resume_text, job_desc, None if chunked else [resume_text])
@@ -0,0 +1,83 @@
+"""
+Single-flight Module
+Coalesces identical in-flight work: callers submitting the same key while a
+computation is running attach to it instead of starting their own.
+"""
+import threading
+from concurrent.futures import Future, InvalidStateError
+from modules.metrics import record_cache
+
+class _Flight:
+    __slots__ = ('future', 'waiters')
+
+    def __init__(self):
+        self.future = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Runs at most one computation per key on `executor`.
+
+    Every caller gets its own ticket Future. Cancelling a ticket detaches only
+    that caller; the computation is cancelled when its last waiter leaves
+    before it has started (work already running is left to finish, since an
+    LLM call or pdflatex run can't be interrupted). A key is released as soon
+    as its computation ends, so later callers start a fresh one; results are
+    shared between waiters and must be treated as read-only.
+    """
+
+    def __init__(self, executor, name):
+        self.executor = executor
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._flights)
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Returns a ticket Future for fn(*args, **kwargs), shared with identical in-flight calls."""
+        with self._lock:
+            flight = self._flights.get(key)
+            joined = flight is not None
+            if not joined:
+                flight = self._flights[key] = _Flight()
+                flight.future = self.executor.submit(self._run, key, flight, fn, args, kwargs)
+            flight.waiters += 1
+        record_cache(f"singleflight_{self.name}", joined)
+
+        ticket = Future()
+        ticket.add_done_callback(lambda t: t.cancelled() and self._leave(key, flight))
+        flight.future.add_done_callback(lambda f: _relay(f, ticket))
+        return ticket
+
+    def _run(self, key, flight, fn, args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._release(key, flight)
+
+    def _release(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _leave(self, key, flight):
+        # Under the lock, so nobody can join a flight that is being cancelled
+        with self._lock:
+            flight.waiters -= 1
+            if flight.waiters == 0 and flight.future.cancel() and self._flights.get(key) is flight:
+                del self._flights[key]
+
+def _relay(source, ticket):
+    """Copies the shared outcome into one caller's ticket (unless that caller already left)."""
+    try:
+        if source.cancelled():
+            ticket.cancel()
+        elif source.exception() is not None:
+            ticket.set_exception(source.exception())
+        else:
+            ticket.set_result(source.result())
+    except InvalidStateError:
+        pass  # the ticket was cancelled concurrently
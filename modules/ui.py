@@ -1,15 +1,25 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
 import base64
+import functools
+import hashlib
+import io
+import os
 
-def load_css():
-    """Loads custom CSS if available."""
+@functools.lru_cache(maxsize=1)
+def _css_block():
+    """Reads the stylesheet once per process."""
     try:
         with open("assets/style.css", "r") as f:
-            css = f.read()
-            st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
+            return f'<style>{f.read()}</style>'
     except FileNotFoundError:
-        pass
+        return None
+
+def load_css():
+    """Loads custom CSS if available."""
+    css = _css_block()
+    if css:
+        st.markdown(css, unsafe_allow_html=True)
 
 def setup_page():
     """Configures page settings."""
@@ -78,6 +88,10 @@ def render_upload_form():
     return st.file_uploader("Upload your resume (PDF or DOCX)", type=["pdf", "docx"], label_visibility="collapsed")
 
 # ─── MANUAL ENTRY FORM ────────────────────────────────────────
+# Each card is a fragment: typing or pressing ➕/✖️ reruns only that card.
+# Values live in session state under the widget keys, and the raw text is
+# assembled from there by build_manual_resume_text().
+
 def render_manual_form():
     """Renders the detailed manual entry form with premium styling."""
 
@@ -89,23 +103,35 @@ def render_manual_form():
     <div class="section-accent-line"></div>
     """, unsafe_allow_html=True)
     st.caption("Fill in your professional details below to generate an optimized resume.")
-    
+
+    render_personal_info()
+    render_education_entries()
+    render_experience_entries()
+    render_project_entries()
+    render_skills_entries()
+
+    return build_manual_resume_text()
+
+@st.fragment
+def render_personal_info():
     # ─── 1. Personal Info ───
     st.markdown('<div class="card">', unsafe_allow_html=True)
     with st.expander("👤 Personal Information", expanded=True):
         c1, c2 = st.columns(2)
-        name = c1.text_input("Full Name", placeholder="e.g. John Doe")
-        role = c2.text_input("Target Role", placeholder="e.g. Software Engineer")
+        c1.text_input("Full Name", key="manual_name", placeholder="e.g. John Doe")
+        c2.text_input("Target Role", key="manual_role", placeholder="e.g. Software Engineer")
         
         c3, c4 = st.columns(2)
-        email = c3.text_input("Email", placeholder="john@example.com")
-        phone = c4.text_input("Phone", placeholder="+1 (555) 123-4567")
+        c3.text_input("Email", key="manual_email", placeholder="john@example.com")
+        c4.text_input("Phone", key="manual_phone", placeholder="+1 (555) 123-4567")
         
         c5, c6 = st.columns(2)
-        linkedin = c5.text_input("LinkedIn URL", placeholder="linkedin.com/in/johndoe")
-        github = c6.text_input("GitHub / Portfolio URL", placeholder="github.com/johndoe")
+        c5.text_input("LinkedIn URL", key="manual_linkedin", placeholder="linkedin.com/in/johndoe")
+        c6.text_input("GitHub / Portfolio URL", key="manual_github", placeholder="github.com/johndoe")
     st.markdown('</div><br>', unsafe_allow_html=True)
 
+@st.fragment
+def render_education_entries():
     # ─── 2. Education (Dynamic) ───
     st.markdown('<div class="card">', unsafe_allow_html=True)
     c_h1, c_h2 = st.columns([0.85, 0.15])
@@ -124,28 +150,25 @@ def render_manual_form():
     with c_h2: 
         st.button("➕ Add", key="add_edu_btn", on_click=add_edu)
 
-    edu_items = []
     for i in range(st.session_state.edu_count):
         st.markdown(f'<div class="entry-card">', unsafe_allow_html=True)
         c0_1, c0_2 = st.columns([0.9, 0.1])
         c0_1.markdown(f"**Education #{i+1}**")
         
         if st.session_state.edu_count > 1 and i == st.session_state.edu_count - 1:
-            if c0_2.button("✖️", key="rem_edu_btn", on_click=remove_edu, help="Remove this entry"): 
-                st.rerun()
+            c0_2.button("✖️", key="rem_edu_btn", on_click=remove_edu, help="Remove this entry")
 
         c1, c2 = st.columns(2)
-        inst = c1.text_input("Institution", key=f"edu_inst_{i}", placeholder="e.g. MIT")
-        deg = c2.text_input("Degree", key=f"edu_deg_{i}", placeholder="e.g. B.S. Computer Science")
+        c1.text_input("Institution", key=f"edu_inst_{i}", placeholder="e.g. MIT")
+        c2.text_input("Degree", key=f"edu_deg_{i}", placeholder="e.g. B.S. Computer Science")
         c3, c4 = st.columns(2)
-        year = c3.text_input("Year", key=f"edu_year_{i}", placeholder="e.g. 2020 - 2024")
-        score = c4.text_input("GPA / Score", key=f"edu_score_{i}", placeholder="e.g. 3.8/4.0")
-        
-        if inst:
-            edu_items.append(f"{deg} from {inst} ({year}) | Score: {score}")
+        c3.text_input("Year", key=f"edu_year_{i}", placeholder="e.g. 2020 - 2024")
+        c4.text_input("GPA / Score", key=f"edu_score_{i}", placeholder="e.g. 3.8/4.0")
         st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('</div><br>', unsafe_allow_html=True)
 
+@st.fragment
+def render_experience_entries():
     # ─── 3. Experience (Dynamic) ───
     st.markdown('<div class="card">', unsafe_allow_html=True)
     c_h1, c_h2 = st.columns([0.85, 0.15])
@@ -164,28 +187,25 @@ def render_manual_form():
     with c_h2: 
         st.button("➕ Add", key="add_exp_btn", on_click=add_exp)
 
-    exp_items = []
     for i in range(st.session_state.exp_count):
         st.markdown(f'<div class="entry-card">', unsafe_allow_html=True)
         c0_1, c0_2 = st.columns([0.9, 0.1])
         c0_1.markdown(f"**Role #{i+1}**")
         
         if st.session_state.exp_count > 1 and i == st.session_state.exp_count - 1:
-            if c0_2.button("✖️", key="rem_exp_btn", on_click=remove_exp, help="Remove this entry"):
-                st.rerun()
+            c0_2.button("✖️", key="rem_exp_btn", on_click=remove_exp, help="Remove this entry")
 
         c1, c2 = st.columns(2)
-        role_title = c1.text_input("Job Title", key=f"exp_role_{i}", placeholder="e.g. Software Engineer")
-        company = c2.text_input("Company", key=f"exp_comp_{i}", placeholder="e.g. Google")
-        duration = st.text_input("Duration", key=f"exp_dur_{i}", placeholder="e.g. Jan 2023 – Present")
-        desc = st.text_area("Key Responsibilities & Achievements", key=f"exp_desc_{i}", height=100,
-                            placeholder="Describe your key contributions, metrics, and impact...")
-        
-        if role_title:
-            exp_items.append(f"Role: {role_title} at {company} ({duration})\nDetails: {desc}")
+        c1.text_input("Job Title", key=f"exp_role_{i}", placeholder="e.g. Software Engineer")
+        c2.text_input("Company", key=f"exp_comp_{i}", placeholder="e.g. Google")
+        st.text_input("Duration", key=f"exp_dur_{i}", placeholder="e.g. Jan 2023 – Present")
+        st.text_area("Key Responsibilities & Achievements", key=f"exp_desc_{i}", height=100,
+                     placeholder="Describe your key contributions, metrics, and impact...")
         st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('</div><br>', unsafe_allow_html=True)
 
+@st.fragment
+def render_project_entries():
     # ─── 4. Projects (Dynamic) ───
     st.markdown('<div class="card">', unsafe_allow_html=True)
     c_h1, c_h2 = st.columns([0.85, 0.15])
@@ -204,28 +224,25 @@ def render_manual_form():
     with c_h2: 
         st.button("➕ Add", key="add_proj_btn", on_click=add_proj)
 
-    proj_items = []
     for i in range(st.session_state.proj_count):
         st.markdown(f'<div class="entry-card">', unsafe_allow_html=True)
         c0_1, c0_2 = st.columns([0.9, 0.1])
         c0_1.markdown(f"**Project #{i+1}**")
         
         if st.session_state.proj_count > 1 and i == st.session_state.proj_count - 1:
-            if c0_2.button("✖️", key="rem_proj_btn", on_click=remove_proj, help="Remove this entry"):
-                st.rerun()
+            c0_2.button("✖️", key="rem_proj_btn", on_click=remove_proj, help="Remove this entry")
 
         c1, c2 = st.columns(2)
-        p_name = c1.text_input("Project Name", key=f"proj_name_{i}", placeholder="e.g. AI Chatbot")
-        p_tech = c2.text_input("Tech Stack", key=f"proj_tech_{i}", placeholder="e.g. Python, React, AWS")
-        p_link = st.text_input("Link", key=f"proj_link_{i}", placeholder="e.g. github.com/user/project")
-        p_desc = st.text_area("Description", key=f"proj_desc_{i}", height=80,
-                              placeholder="What does it do? What was your role?")
-        
-        if p_name:
-            proj_items.append(f"Project: {p_name} ({p_tech})\nLink: {p_link}\nDetails: {p_desc}")
+        c1.text_input("Project Name", key=f"proj_name_{i}", placeholder="e.g. AI Chatbot")
+        c2.text_input("Tech Stack", key=f"proj_tech_{i}", placeholder="e.g. Python, React, AWS")
+        st.text_input("Link", key=f"proj_link_{i}", placeholder="e.g. github.com/user/project")
+        st.text_area("Description", key=f"proj_desc_{i}", height=80,
+                     placeholder="What does it do? What was your role?")
         st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('</div><br>', unsafe_allow_html=True)
 
+@st.fragment
+def render_skills_entries():
     # ─── 5. Skills ───
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.markdown("""
@@ -236,22 +253,42 @@ def render_manual_form():
     <div class="section-accent-line"></div>
     """, unsafe_allow_html=True)
     c1, c2 = st.columns(2)
-    langs = c1.text_area("Programming Languages", placeholder="e.g. Python, JavaScript, Java")
-    libs = c2.text_area("Libraries / Frameworks", placeholder="e.g. React, TensorFlow, FastAPI")
+    c1.text_area("Programming Languages", key="manual_langs", placeholder="e.g. Python, JavaScript, Java")
+    c2.text_area("Libraries / Frameworks", key="manual_libs", placeholder="e.g. React, TensorFlow, FastAPI")
     c3, c4 = st.columns(2)
-    tools = c3.text_area("Tools / Platforms", placeholder="e.g. Docker, AWS, Git")
-    soft = c4.text_area("Soft Skills", placeholder="e.g. Leadership, Communication")
+    c3.text_area("Tools / Platforms", key="manual_tools", placeholder="e.g. Docker, AWS, Git")
+    c4.text_area("Soft Skills", key="manual_soft", placeholder="e.g. Leadership, Communication")
     st.markdown('</div>', unsafe_allow_html=True)
 
+def build_manual_resume_text():
+    """Assembles the raw resume text from the manual form's session state."""
+    state = st.session_state
+    get = lambda key: state.get(key) or ""
+
+    edu_items = []
+    for i in range(state.get('edu_count', 1)):
+        if get(f"edu_inst_{i}"):
+            edu_items.append(f"{get(f'edu_deg_{i}')} from {get(f'edu_inst_{i}')} ({get(f'edu_year_{i}')}) | Score: {get(f'edu_score_{i}')}")
+
+    exp_items = []
+    for i in range(state.get('exp_count', 1)):
+        if get(f"exp_role_{i}"):
+            exp_items.append(f"Role: {get(f'exp_role_{i}')} at {get(f'exp_comp_{i}')} ({get(f'exp_dur_{i}')})\nDetails: {get(f'exp_desc_{i}')}")
+
+    proj_items = []
+    for i in range(state.get('proj_count', 1)):
+        if get(f"proj_name_{i}"):
+            proj_items.append(f"Project: {get(f'proj_name_{i}')} ({get(f'proj_tech_{i}')})\nLink: {get(f'proj_link_{i}')}\nDetails: {get(f'proj_desc_{i}')}")
+
     # Construct the raw text
-    if name:
+    if get("manual_name"):
         text_parts = [
-            f"Name: {name}",
-            f"Target Role: {role}",
-            f"Email: {email}",
-            f"Phone: {phone}",
-            f"LinkedIn: {linkedin}",
-            f"GitHub: {github}",
+            f"Name: {get('manual_name')}",
+            f"Target Role: {get('manual_role')}",
+            f"Email: {get('manual_email')}",
+            f"Phone: {get('manual_phone')}",
+            f"LinkedIn: {get('manual_linkedin')}",
+            f"GitHub: {get('manual_github')}",
             "\nEDUCATION:",
             "\n".join(edu_items),
             "\nEXPERIENCE:",
@@ -259,10 +296,10 @@ def render_manual_form():
             "\nPROJECTS:",
             "\n\n".join(proj_items),
             "\nSKILLS:",
-            f"Languages: {langs}",
-            f"Frameworks: {libs}",
-            f"Tools: {tools}",
-            f"Soft Skills: {soft}"
+            f"Languages: {get('manual_langs')}",
+            f"Frameworks: {get('manual_libs')}",
+            f"Tools: {get('manual_tools')}",
+            f"Soft Skills: {get('manual_soft')}"
         ]
         return "\n".join(text_parts)
     
@@ -277,6 +314,14 @@ def render_jd_input():
     </div>
     <div class="section-accent-line"></div>
     """, unsafe_allow_html=True)
+    if st.toggle("Tailor to several roles at once", key="multi_jd",
+                 help="Paste up to 10 job descriptions, separated by a line containing only ---"):
+        return st.text_area(
+            "Paste the job descriptions here...",
+            height=300,
+            label_visibility="collapsed",
+            placeholder="Paste each job description, separated by a line containing only ---\n\nSenior Data Engineer at Acme...\n---\nBackend Engineer at Globex..."
+        )
     return st.text_area(
         "Paste the full job description here...",
         height=200,
@@ -338,6 +383,42 @@ def render_sidebar_settings():
         return template
 
 # ─── PDF PREVIEW ───────────────────────────────────────────────
+# Previews are keyed by the artifact's content hash: the thumbnail and the
+# encoded document are computed once per PDF, and the full document is only
+# pushed to the browser when the user asks for it.
+
+@functools.lru_cache(maxsize=64)
+def _artifact_digest(pdf_path, mtime_ns, size):
+    """SHA-256 of an artifact; the stat fields make rewritten files rehash."""
+    with open(pdf_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def artifact_digest(pdf_path):
+    stat = os.stat(pdf_path)
+    return _artifact_digest(pdf_path, stat.st_mtime_ns, stat.st_size)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _pdf_thumbnail(digest, _pdf_path):
+    """First page rasterized to PNG, or None when rendering isn't possible."""
+    try:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(_pdf_path)
+        try:
+            image = pdf[0].render(scale=1.5).to_pil()
+        finally:
+            pdf.close()
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+    except Exception:
+        return None
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _pdf_base64(digest, _pdf_path):
+    with open(_pdf_path, "rb") as f:
+        return base64.b64encode(f.read()).decode('utf-8')
+
 def display_pdf_preview(pdf_path):
     st.markdown("""
     <div class="section-header">
@@ -347,15 +428,22 @@ def display_pdf_preview(pdf_path):
     <div class="section-accent-line"></div>
     """, unsafe_allow_html=True)
     try:
-        with open(pdf_path, "rb") as f:
-            base64_pdf = base64.b64encode(f.read()).decode('utf-8')
-        pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="800px" type="application/pdf" style="border-radius: 14px; border: 1px solid var(--border-color);"></iframe>'
-        st.markdown(pdf_display, unsafe_allow_html=True)
+        digest = artifact_digest(pdf_path)
+
+        # The thumbnail goes through Streamlit's media store, so reruns only resend its URL
+        thumbnail = _pdf_thumbnail(digest, pdf_path)
+        if thumbnail:
+            st.image(thumbnail, caption="First page")
+
+        if st.toggle("📖 Show full document", key="show_full_pdf", value=thumbnail is None):
+            base64_pdf = _pdf_base64(digest, pdf_path)
+            pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="800px" type="application/pdf" style="border-radius: 14px; border: 1px solid var(--border-color);"></iframe>'
+            st.markdown(pdf_display, unsafe_allow_html=True)
     except Exception as e:
         st.error(f"Preview unavailable: {str(e)}")
 
 # ─── RESULTS DISPLAY ──────────────────────────────────────────
-def display_results(score_before, score_after, missing, added, skipped, pdf_path, docx_path, filename_prefix="Resume"):
+def display_results(score_before, score_after, missing, added, skipped, pdf_path, docx_file, filename_prefix="Resume"):
     st.markdown('<div class="gradient-divider"></div>', unsafe_allow_html=True)
     
     st.markdown("""
@@ -444,9 +532,90 @@ def display_results(score_before, score_after, missing, added, skipped, pdf_path
         with open(pdf_path, "rb") as f:
             c1.download_button("📄 Download PDF Resume", f, f"{filename_prefix}_Optimized.pdf", "application/pdf", use_container_width=True)
             
-    if docx_path:
-        with open(docx_path, "rb") as f:
-            c2.download_button("📝 Download Word Resume", f, f"{filename_prefix}_Optimized.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", use_container_width=True)
+    if docx_file:
+        # In-memory BytesIO from build_resume_docx, no round-trip through disk
+        c2.download_button("📝 Download Word Resume", docx_file, f"{filename_prefix}_Optimized.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", use_container_width=True)
+
+# ─── MULTI-JD COMPARISON ───────────────────────────────────────
+def display_comparison(variants, report_csv, on_select):
+    """Before/after scores per role; picking a role loads its variant into the report below."""
+    st.markdown('<div class="gradient-divider"></div>', unsafe_allow_html=True)
+    st.markdown("""
+    <div class="section-header">
+        <span class="section-icon">🗂️</span>
+        <h3>Role Comparison</h3>
+    </div>
+    <div class="section-accent-line"></div>
+    """, unsafe_allow_html=True)
+
+    st.dataframe(
+        [{
+            "#": v['index'] + 1,
+            "Role": v['role'],
+            "Initial": v['score_before'],
+            "Optimized": v['score_after'],
+            "Δ": v['improvement'],
+            "Added": v['keywords_added'],
+            "Outstanding": v['outstanding'],
+            "Status": "✅" if not v['error'] else f"❌ {v['error']}",
+        } for v in variants],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    c1, c2 = st.columns([0.75, 0.25])
+    ready = [v['index'] for v in variants if not v['error']]
+    if ready:
+        c1.selectbox(
+            "Show the resume tailored for",
+            ready,
+            format_func=lambda i: f"#{i + 1} — {variants[i]['role']}",
+            key="multi_jd_selected",
+            on_change=lambda: on_select(st.session_state.multi_jd_selected),
+        )
+    c2.download_button("📊 Download Comparison (CSV)", report_csv, "role_comparison.csv", "text/csv",
+                       use_container_width=True)
+
+# ─── RESULT EDITOR ─────────────────────────────────────────────
+def render_resume_editor(resume, key, row_ids, on_edit, last_edit=None):
+    """
+    Editable sections of the optimized resume. `on_edit(section)` fires per
+    changed section; list rows are keyed by their `row_ids`, not by position.
+    """
+    with st.expander("✏️ Edit Optimized Content", expanded=last_edit is not None):
+        if last_edit:
+            st.caption(f"⚡ Re-scored **{last_edit[0]}** in {last_edit[1]:.2f} ms")
+
+        st.text_area("Professional Summary", resume.summary, key=f"edit_{key}_summary",
+                     on_change=on_edit, args=("summary",), height=100)
+
+        for row_id, job in zip(row_ids['experience'], resume.experience):
+            st.text_area(f"💼 {job['title']} — {job['company']} (one bullet per line)", "\n".join(job['bullets']),
+                         key=f"edit_{key}_experience_{row_id}", on_change=on_edit, args=("experience",), height=120)
+
+        for row_id, proj in zip(row_ids['projects'], resume.projects):
+            st.text_area(f"🚀 {proj['name']}", proj['description'],
+                         key=f"edit_{key}_projects_{row_id}", on_change=on_edit, args=("projects",), height=80)
+
+        for row_id, skill in zip(row_ids['skills'], resume.skills):
+            st.text_input(f"🛠️ {skill['category'] or 'Skills'}", skill['items'],
+                          key=f"edit_{key}_skills_{row_id}", on_change=on_edit, args=("skills",))
+
+def read_section_edit(resume, key, row_ids, section):
+    """Builds the new value of a section from its editor widgets."""
+    state = st.session_state
+    if section == 'summary':
+        return state[f"edit_{key}_summary"]
+    if section == 'experience':
+        return [dict(job, bullets=state.get(f"edit_{key}_experience_{row_id}", "\n".join(job['bullets'])))
+                for row_id, job in zip(row_ids['experience'], resume.experience)]
+    if section == 'projects':
+        return [dict(proj, description=state.get(f"edit_{key}_projects_{row_id}", proj['description']))
+                for row_id, proj in zip(row_ids['projects'], resume.projects)]
+    if section == 'skills':
+        return [dict(skill, items=state.get(f"edit_{key}_skills_{row_id}", skill['items']))
+                for row_id, skill in zip(row_ids['skills'], resume.skills)]
+    raise KeyError(section)
 
 # ─── FOOTER ────────────────────────────────────────────────────
 def display_footer():
@@ -0,0 +1,168 @@
+"""
+Warm-up Module
+Pays the first-request costs once at container start: Python imports, Jinja
+template compilation, the TeX font map and package loading of the first
+pdflatex run, Gemini client setup and the PDF/DOCX parsers.
+
+Readiness is written to a small JSON file so container health checks only
+pass once the process is warm:
+    python -m modules.warmup --check
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+READY_FILE = os.getenv("WARMUP_READY_FILE", os.path.join(tempfile.gettempdir(), "ai-resume-architect.ready"))
+
+# Small but complete resume: every template section renders at least once
+_SAMPLE_RESUME = {
+    "name": "Warm Up",
+    "email": "warmup@example.com",
+    "phone": "+1 555 0100",
+    "linkedin": "linkedin.com/in/warmup",
+    "github": "github.com/warmup",
+    "summary": "Software engineer building reliable data platforms.",
+    "experience": [{"title": "Engineer", "company": "Example Corp", "dates": "2020 – Present",
+                    "bullets": ["Built streaming pipelines in Python & SQL.", "Cut cloud costs by 20%."]}],
+    "projects": [{"name": "Sample", "link": "github.com/warmup/sample", "description": "A sample project."}],
+    "education": [{"school": "Example University", "degree": "B.S. Computer Science", "year": "2020", "gpa": "3.8"}],
+    "skills": [{"category": "Languages", "items": "Python, Go, SQL"}],
+}
+
+_SAMPLE_CHAT = [
+    {"role": "user", "content": "How can I improve my summary?"},
+    {"role": "assistant", "content": "Lead with your strongest, quantified result."},
+]
+
+_state = {'status': 'pending', 'steps': {}}
+_lock = threading.Lock()
+_thread = None
+
+# ─── STEPS ─────────────────────────────────────────────────────
+def _warm_imports():
+    import modules.chat  # noqa: F401  (streamlit chat UI)
+    import modules.enhancer  # noqa: F401
+    import modules.generator  # noqa: F401  (compiles every Jinja template on import)
+
+def _warm_latex():
+    """Throwaway compile of every template, so TeX loads its fonts and packages once."""
+    if not shutil.which("pdflatex"):
+        return "skipped: pdflatex not found on PATH"
+    from modules.generator import LATEX_ENV, compile_latex, generate_chat_pdf, render_resume_tex
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name in LATEX_ENV.list_templates(extensions=["tex"]):
+            template_name = name[:-len(".tex")]
+            # chat_message.tex is a fragment of chat.tex
+            if template_name.startswith("chat"):
+                continue
+            compile_latex(render_resume_tex(_SAMPLE_RESUME, template_name), out_dir, template_name)
+        generate_chat_pdf(_SAMPLE_CHAT, output_dir=out_dir)
+
+def _warm_llm():
+    from modules.llm import get_genai
+    from modules.routing import ROUTES
+
+    # Constructing the model loads the client stack; no request is sent
+    get_genai().GenerativeModel(ROUTES['enhance'][0])
+
+def _warm_cache():
+    from modules.cache import get_cache
+
+    # Opens the SQLite file / Redis connection, or reports the fallback
+    return type(get_cache()).__name__
+
+def _warm_parser():
+    from modules.generator import build_resume_docx, render_draft_pdf
+    from modules.parser import extract_text_from_docx, extract_text_from_pdf
+
+    extract_text_from_pdf(io.BytesIO(render_draft_pdf(_SAMPLE_RESUME)))
+    extract_text_from_docx(build_resume_docx(_SAMPLE_RESUME))
+
+_STEPS = (
+    ('imports', _warm_imports),
+    ('latex', _warm_latex),
+    ('llm', _warm_llm),
+    ('cache', _warm_cache),
+    ('parser', _warm_parser),
+)
+
+# ─── READINESS ─────────────────────────────────────────────────
+def _write_ready_file(state):
+    tmp_path = f"{READY_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, READY_FILE)
+
+def run_warmup():
+    """
+    Runs every warm-up step in order. A failing step is recorded but doesn't
+    block readiness: the app already degrades gracefully (e.g. draft PDF
+    without pdflatex), so warm-up only needs to have been attempted.
+
+    Returns:
+        dict: {'status': 'ready', 'steps': {step: ms or error}, 'total_ms': float}
+    """
+    with _lock:
+        _state['status'] = 'warming'
+    start = time.perf_counter()
+    steps = {}
+    for name, step in _STEPS:
+        step_start = time.perf_counter()
+        try:
+            note = step()
+            steps[name] = note or round((time.perf_counter() - step_start) * 1000, 1)
+        except Exception as e:
+            print(f"Warm-up step '{name}' failed: {e}")
+            steps[name] = f"error: {e}"
+    with _lock:
+        _state.update(status='ready', steps=steps, total_ms=round((time.perf_counter() - start) * 1000, 1))
+        state = dict(_state)
+    try:
+        _write_ready_file(state)
+    except OSError as e:
+        print(f"Could not write readiness file: {e}")
+    return state
+
+def start_warmup():
+    """Starts the warm-up once per process in a background thread (off with WARMUP_DISABLED=1)."""
+    global _thread
+    if os.getenv("WARMUP_DISABLED") == "1":
+        # Nothing to wait for, so in-process readiness checks pass right away
+        with _lock:
+            _state['status'] = 'ready'
+        return
+    with _lock:
+        if _thread is not None:
+            return
+        # A file left over from a previous run must not report this process as ready
+        try:
+            os.remove(READY_FILE)
+        except OSError:
+            pass
+        _thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+        _thread.start()
+
+def get_readiness():
+    """Warm-up state of this process."""
+    with _lock:
+        return dict(_state)
+
+def is_ready():
+    """Whether a warmed-up process has reported readiness (usable from another process)."""
+    try:
+        with open(READY_FILE) as f:
+            return json.load(f).get('status') == 'ready'
+    except (OSError, ValueError):
+        return False
+
+if __name__ == "__main__":
+    # `--check` exits 0 once the server process is warm; otherwise warm up in the foreground
+    if "--check" in sys.argv:
+        sys.exit(0 if is_ready() else 1)
+    print(json.dumps(run_warmup(), indent=2))
@@ -0,0 +1,22 @@
+"""
+Production entrypoint.
+Starts the warm-up and the metrics endpoint (METRICS_PORT) in the background,
+then the Streamlit server in the same process, so the imports and compiled
+templates it warms are the ones the app uses. Extra arguments are passed
+through to `streamlit run`.
+
+Usage:
+    python serve.py --server.port=8501 --server.address=0.0.0.0
+"""
+import sys
+
+from streamlit.web import cli as stcli
+
+from modules.metrics import start_metrics_server
+from modules.warmup import start_warmup
+
+if __name__ == "__main__":
+    start_warmup()
+    start_metrics_server()
+    sys.argv = ["streamlit", "run", "app.py", *sys.argv[1:]]
+    sys.exit(stcli.main())